@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Query, Response, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.pagination import paginate, paginate_by_position, parse_sort, set_next_cursor
+from app.core.search import apply_search
 from app.models.agent import Agent
 
 router = APIRouter()
 
+# Columns lists can be sorted by; each has an index on (column, id)
+SORT_COLUMNS = {"id": Agent.id, "name": Agent.name, "created_at": Agent.created_at}
+
 # Pydantic models for request/response
 class AgentBase(BaseModel):
     name: str
@@ -41,23 +46,29 @@ class AgentResponse(AgentBase):
 
 @router.get("/", response_model=List[AgentResponse])
 def get_agents(
-    skip: int = 0, 
-    limit: int = 100, 
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    sort: str = "id",
     search: str = None,
     db: Session = Depends(get_db)
 ):
-    """Get all agents with pagination and search"""
+    """Get agents page by page, with search.
+
+    Pass the X-Next-Cursor response header as ``cursor`` to get the next
+    page. ``sort`` is one of id, name or created_at, prefixed with ``-`` for
+    descending order. ``search`` matches word prefixes and lists the best
+    matches first.
+    """
     query = db.query(Agent)
     
+    sort_column, descending = parse_sort(sort, SORT_COLUMNS)
     if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            (Agent.name.ilike(search_filter)) |
-            (Agent.role.ilike(search_filter)) |
-            (Agent.goal.ilike(search_filter))
-        )
-    
-    agents = query.offset(skip).limit(limit).all()
+        # Search results come best match first, whatever the sort
+        agents, next_cursor = paginate_by_position(apply_search(query, Agent, search), limit, cursor)
+    else:
+        agents, next_cursor = paginate(query, sort_column, Agent.id, limit, cursor, descending)
+    set_next_cursor(response, next_cursor)
     return agents
 
 @router.post("/", response_model=AgentResponse, status_code=status.HTTP_201_CREATED)
@@ -1,15 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query as SQLQuery, Session, joinedload, load_only
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import database_pool_metrics, get_async_db, get_db
 from app.models.execution import Execution
 from app.models.process import Process
 from app.models.agent import Agent as AgentModel
 from app.models.task import Task as TaskModel
 from app.models.tool import Tool as ToolModel
+from app.core.crewai_service import crewai_service
+from app.api.v1.endpoints.websockets import manager as websocket_manager
+from app.core.pagination import NEXT_CURSOR_HEADER, paginate, set_next_cursor
+from app.core.execution_control import STOPPABLE_STATUSES, stop_execution as stop_running_execution
+from app.core.process_resolver import process_steps, resolve_steps
+from app.core.execution_plans import plan_cache
+from app.core.execution_logs import (
+    archive_file_path,
+    assemble_console_log,
+    assemble_console_logs,
+    delete_log,
+    get_log_archive,
+    iter_log_bytes,
+    log_size,
+    log_storage_stats,
+    log_writer_metrics,
+    parse_byte_range,
+    read_log_range,
+    read_log_text,
+    tail_log,
+)
 
 router = APIRouter()
 
@@ -39,54 +63,262 @@ class ExecutionResponse(ExecutionBase):
 
 class ExecutionWithProcess(ExecutionResponse):
     process: dict
+    queue_position: int | None = None  # set while the execution is queued
 
-@router.get("/", response_model=List[ExecutionWithProcess])
-def get_executions(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all executions with pagination and process details"""
-    executions = db.query(Execution).order_by(Execution.started_at.desc()).offset(skip).limit(limit).all()
-    
-    # Add process details to each execution
+class ExecutionLogPage(BaseModel):
+    execution_id: int
+    offset: int  # byte offset where content starts
+    next_offset: int  # cursor for the next page
+    total_size: int
+    content: str
+    complete: bool  # the execution has finished and the end of its log was reached
+
+class ExecutionLogTail(BaseModel):
+    execution_id: int
+    offset: int
+    next_offset: int  # pass to /log?offset= to follow new output
+    total_size: int
+    lines: List[str]
+
+class ExecutionLogInfo(BaseModel):
+    execution_id: int
+    total_size: int
+    archived: bool
+    encoding: str | None = None  # compression of the archived part, e.g. 'gzip'
+    archived_size: int = 0  # uncompressed bytes held in the archive
+    compressed_size: int | None = None
+    compression_ratio: float | None = None
+
+# Statuses after which an execution's log no longer grows
+FINISHED_STATUSES = {"completed", "failed", "stopped"}
+
+# Fields execution lists can be narrowed to with ?fields=
+EXECUTION_LIST_FIELDS = ("id", "process_id", "status", "output_path", "console_log", "started_at", "completed_at", "process")
+
+def _process_summary(process: Optional[Process]) -> dict:
+    return {
+        "id": process.id,
+        "name": process.name,
+        "description": process.description,
+        "process_type": process.process_type,
+        "configuration": process.configuration,
+    } if process else {}
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if fields is None:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = sorted(set(requested) - set(EXECUTION_LIST_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+def _list_executions(
+    db: Session,
+    query: SQLQuery,
+    response: Response,
+    limit: int,
+    cursor: Optional[str],
+    include_log: bool,
+    fields: Optional[str]
+):
+    """One page of executions, newest first, with their processes loaded in the same query.
+
+    With ``fields`` only those columns are loaded and returned; asking for
+    ``console_log`` implies include_log.
+    """
+    requested = _parse_fields(fields)
+    with_process = requested is None or "process" in requested
+    with_log = include_log or (requested is not None and "console_log" in requested)
+    if with_process:
+        query = query.options(joinedload(Execution.process))
+    if requested is not None:
+        # The sort key and id are needed for the cursor, the legacy log column for logs
+        columns = {"id", "started_at", *requested} - {"process", "console_log"}
+        if with_log:
+            columns.add("console_log")
+        query = query.options(load_only(*(getattr(Execution, column) for column in columns)))
+
+    executions, next_cursor = paginate(query, Execution.started_at, Execution.id, limit, cursor)
+    logs = assemble_console_logs(db, executions) if with_log else {}
     result = []
     for execution in executions:
-        # Get process details
-        process = db.query(Process).filter(Process.id == execution.process_id).first()
-        process_data = {
-            "id": process.id,
-            "name": process.name,
-            "description": process.description,
-            "process_type": process.process_type,
-            "configuration": process.configuration,
-        } if process else {}
-        
-        result.append({
-            **execution.__dict__,
-            "process": process_data
-        })
-    
-    return result
+        item = {**execution.__dict__, "console_log": logs.get(execution.id)}
+        if with_process:
+            item["process"] = _process_summary(execution.process)
+        result.append(item)
+
+    if requested is None:
+        set_next_cursor(response, next_cursor)
+        return result
+    # Partial rows don't fit the response model
+    return JSONResponse(
+        jsonable_encoder([{field: item.get(field) for field in requested} for item in result]),
+        headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    )
+
+@router.get("/", response_model=List[ExecutionWithProcess])
+def get_executions(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_log: bool = False,
+    fields: Optional[str] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    db: Session = Depends(get_db)
+):
+    """Get all executions with pagination and process details.
+
+    Pass the X-Next-Cursor response header as ``cursor`` to get the next page.
+    ``status`` limits the list to executions in that status. ``fields`` is a
+    comma-separated subset of fields to return. Console logs are left out
+    unless include_log is set; use the /log endpoints instead.
+    """
+    query = db.query(Execution)
+    if status_filter:
+        query = query.filter(Execution.status == status_filter)
+    return _list_executions(db, query, response, limit, cursor, include_log, fields)
+
+@router.get("/metrics")
+def get_execution_metrics(db: Session = Depends(get_db)):
+    """Get execution pool, database pool, plan cache, log writer, log storage and WebSocket metrics"""
+    return {
+        "pool": crewai_service.pool.metrics(),
+        "database": database_pool_metrics(),
+        "plan_cache": plan_cache.metrics(),
+        "log_writer": log_writer_metrics.snapshot(),
+        "log_storage": log_storage_stats(db),
+        "websockets": websocket_manager.metrics()
+    }
 
 @router.get("/{execution_id}", response_model=ExecutionWithProcess)
-def get_execution(execution_id: int, db: Session = Depends(get_db)):
+def get_execution(execution_id: int, include_log: bool = True, db: Session = Depends(get_db)):
     """Get a specific execution by ID with process details"""
     execution = db.query(Execution).filter(Execution.id == execution_id).first()
     if execution is None:
         raise HTTPException(status_code=404, detail="Execution not found")
     
-    # Get process details
-    process = db.query(Process).filter(Process.id == execution.process_id).first()
-    process_data = {
-        "id": process.id,
-        "name": process.name,
-        "description": process.description,
-        "process_type": process.process_type,
-        "configuration": process.configuration,
-    } if process else {}
-    
     return {
         **execution.__dict__,
-        "process": process_data
+        "console_log": assemble_console_log(db, execution) if include_log else None,
+        "process": _process_summary(execution.process),
+        "queue_position": crewai_service.pool.queue_position(execution.id)
+    }
+
+def _get_execution_or_404(db: Session, execution_id: int) -> Execution:
+    execution = db.query(Execution).filter(Execution.id == execution_id).first()
+    if execution is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    return execution
+
+@router.get("/{execution_id}/log", response_model=ExecutionLogPage)
+def get_execution_log(
+    execution_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(65536, ge=4, le=1048576),
+    db: Session = Depends(get_db)
+):
+    """Get a page of an execution's console log by byte offset.
+
+    Poll with next_offset as the new offset to follow a running execution.
+    """
+    execution = _get_execution_or_404(db, execution_id)
+    start, end, total, content = read_log_text(db, execution, offset, limit)
+    return {
+        "execution_id": execution_id,
+        "offset": start,
+        "next_offset": end,
+        "total_size": total,
+        "content": content,
+        "complete": execution.status in FINISHED_STATUSES and end >= total
+    }
+
+@router.get("/{execution_id}/log/tail", response_model=ExecutionLogTail)
+def get_execution_log_tail(
+    execution_id: int,
+    lines: int = Query(100, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """Get the last lines of an execution's console log"""
+    execution = _get_execution_or_404(db, execution_id)
+    offset, content = tail_log(db, execution, lines)
+    total = offset + len(content.encode("utf-8"))
+    return {
+        "execution_id": execution_id,
+        "offset": offset,
+        "next_offset": total,
+        "total_size": total,
+        "lines": content.splitlines()
     }
 
+@router.get("/{execution_id}/log/info", response_model=ExecutionLogInfo)
+def get_execution_log_info(execution_id: int, db: Session = Depends(get_db)):
+    """Get the size of an execution's console log and how it is stored"""
+    _get_execution_or_404(db, execution_id)
+    archive = get_log_archive(db, execution_id)
+    info = {
+        "execution_id": execution_id,
+        "total_size": log_size(db, execution_id),
+        "archived": archive is not None
+    }
+    if archive is not None:
+        info.update(
+            encoding=archive.encoding,
+            archived_size=archive.original_size,
+            compressed_size=archive.compressed_size,
+            compression_ratio=archive.compression_ratio
+        )
+    return info
+
+@router.get("/{execution_id}/log/raw")
+def get_execution_log_raw(
+    execution_id: int,
+    range_header: str | None = Header(None, alias="Range"),
+    accept_encoding: str | None = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Download an execution's console log as plain text.
+
+    Supports single HTTP byte ranges (``Range: bytes=start-end`` or
+    ``bytes=-N``), answered with 206 Partial Content. An archived log is sent
+    as its gzip file as-is to clients that accept gzip.
+    """
+    execution = _get_execution_or_404(db, execution_id)
+    total = log_size(db, execution_id)
+    headers = {"Accept-Ranges": "bytes"}
+
+    archive = get_log_archive(db, execution_id)
+    if (
+        archive is not None
+        and archive.encoding == "gzip"
+        and archive.original_size == total
+        and not range_header
+        and "gzip" in (accept_encoding or "")
+    ):
+        return FileResponse(
+            archive_file_path(archive),
+            media_type="text/plain",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+        )
+
+    byte_range = parse_byte_range(range_header, total) if range_header and total else None
+    if byte_range is not None:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+        return Response(
+            content=read_log_range(db, execution, start, end + 1),
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type="text/plain",
+            headers=headers
+        )
+
+    # No Content-Length: a running execution's log may grow while streaming
+    return StreamingResponse(
+        iter_log_bytes(execution_id),
+        media_type="text/plain",
+        headers=headers
+    )
+
 @router.get("/{execution_id}/resolved")
 def get_execution_resolved(execution_id: int, db: Session = Depends(get_db)):
     """Get an execution with resolved process configuration, agents, tasks, and tools.
@@ -102,30 +334,10 @@ def get_execution_resolved(execution_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Process not found")
 
     configuration = process.configuration or {}
-    steps = configuration.get("steps", configuration.get("tasks", [])) or []
-
-    # Collect referenced IDs
-    agent_ids = sorted({step.get("agent_id") for step in steps if step.get("agent_id") is not None})
-    task_ids = sorted({step.get("task_id") for step in steps if step.get("task_id") is not None})
-
-    step_tool_ids = []
-    for step in steps:
-        tools = step.get("tools") or []
-        if isinstance(tools, list):
-            step_tool_ids.extend([tool_id for tool_id in tools if isinstance(tool_id, int)])
-
-    # Load entities
-    agents = db.query(AgentModel).filter(AgentModel.id.in_(agent_ids)).all() if agent_ids else []
-    tasks = db.query(TaskModel).filter(TaskModel.id.in_(task_ids)).all() if task_ids else []
-
-    # Collect tool ids referenced by tasks (if task.tools contains ids)
-    task_tool_ids = []
-    for task in tasks:
-        if isinstance(task.tools, list):
-            task_tool_ids.extend([tool_id for tool_id in task.tools if isinstance(tool_id, int)])
-
-    tool_ids = sorted({*step_tool_ids, *task_tool_ids})
-    tools = db.query(ToolModel).filter(ToolModel.id.in_(tool_ids)).all() if tool_ids else []
+    resolved_steps = resolve_steps(db, process_steps(configuration))
+    agents = [resolved_steps.agents[agent_id] for agent_id in sorted(resolved_steps.agents)]
+    tasks = [resolved_steps.tasks[task_id] for task_id in sorted(resolved_steps.tasks)]
+    tools = [resolved_steps.tools[tool_id] for tool_id in sorted(resolved_steps.tools)]
 
     # Serialize entities minimally
     def serialize_agent(a: AgentModel) -> dict:
@@ -174,11 +386,11 @@ def get_execution_resolved(execution_id: int, db: Session = Depends(get_db)):
         "execution": {
             "id": execution.id,
             "status": execution.status,
-            "console_log": execution.console_log,
+            "console_log": assemble_console_log(db, execution),
             "started_at": execution.started_at,
             "completed_at": execution.completed_at,
         },
-        "steps": steps,
+        "steps": resolved_steps.steps,
         "agents": [serialize_agent(a) for a in agents],
         "tasks": [serialize_task(t) for t in tasks],
         "tools": [serialize_tool(t) for t in tools],
@@ -194,12 +406,18 @@ def update_execution(execution_id: int, execution: ExecutionUpdate, db: Session
         raise HTTPException(status_code=404, detail="Execution not found")
     
     update_data = execution.dict(exclude_unset=True)
+    if "console_log" in update_data:
+        # Replacing the log: drop the appended chunks so the column is the whole log
+        delete_log(db, execution_id)
     for field, value in update_data.items():
         setattr(db_execution, field, value)
     
     db.commit()
     db.refresh(db_execution)
-    return db_execution
+    return {
+        **db_execution.__dict__,
+        "console_log": assemble_console_log(db, db_execution)
+    }
 
 @router.delete("/{execution_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_execution(execution_id: int, db: Session = Depends(get_db)):
@@ -208,52 +426,43 @@ def delete_execution(execution_id: int, db: Session = Depends(get_db)):
     if execution is None:
         raise HTTPException(status_code=404, detail="Execution not found")
     
+    delete_log(db, execution_id)
     db.delete(execution)
     db.commit()
     return None
 
 @router.post("/{execution_id}/stop", response_model=ExecutionResponse)
-def stop_execution(execution_id: int, db: Session = Depends(get_db)):
-    """Stop a running execution"""
-    execution = db.query(Execution).filter(Execution.id == execution_id).first()
+async def stop_execution(execution_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Stop a running execution, freeing its slot for queued ones"""
+    execution = await db.get(Execution, execution_id)
     if execution is None:
         raise HTTPException(status_code=404, detail="Execution not found")
     
-    if execution.status not in ["running", "pending"]:
+    if execution.status not in STOPPABLE_STATUSES:
         raise HTTPException(status_code=400, detail="Execution is not running")
     
-    execution.status = "stopped"
-    execution.completed_at = datetime.utcnow()
-    if execution.console_log is None:
-        execution.console_log = "Execution stopped by user.\n"
-    else:
-        execution.console_log += "\nExecution stopped by user.\n"
-    db.commit()
-    db.refresh(execution)
+    await stop_running_execution(db, execution)
+    await db.refresh(execution)
     
-    return execution
+    return {
+        **execution.__dict__,
+        "console_log": await db.run_sync(assemble_console_log, execution)
+    }
 
 @router.get("/process/{process_id}", response_model=List[ExecutionWithProcess])
-def get_process_executions(process_id: int, db: Session = Depends(get_db)):
-    """Get all executions for a specific process with process details"""
-    executions = db.query(Execution).filter(Execution.process_id == process_id).order_by(Execution.started_at.desc()).all()
-    
-    # Add process details to each execution
-    result = []
-    for execution in executions:
-        # Get process details
-        process = db.query(Process).filter(Process.id == execution.process_id).first()
-        process_data = {
-            "id": process.id,
-            "name": process.name,
-            "description": process.description,
-            "process_type": process.process_type,
-            "configuration": process.configuration,
-        } if process else {}
-        
-        result.append({
-            **execution.__dict__,
-            "process": process_data
-        })
-    
-    return result 
\ No newline at end of file
+def get_process_executions(
+    process_id: int,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_log: bool = False,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Get a page of a process's executions with process details.
+
+    Paginated and projected like the execution list. Console logs are left
+    out unless include_log is set.
+    """
+    query = db.query(Execution).filter(Execution.process_id == process_id)
+    return _list_executions(db, query, response, limit, cursor, include_log, fields) 
\ No newline at end of file
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, Query, Response, HTTPException, status, BackgroundTasks
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from datetime import datetime
 import re
@@ -9,7 +9,9 @@ import asyncio
 # from crewai import Crew, Agent, Task
 # from langchain_openai import ChatOpenAI
 
-from app.core.database import get_db
+from app.core.database import get_db, unit_of_work
+from app.core.pagination import paginate, paginate_by_position, parse_sort, set_next_cursor
+from app.core.search import apply_search
 from app.models.process import Process
 from app.models.execution import Execution
 from app.models.agent import Agent as AgentModel
@@ -19,6 +21,9 @@ from app.models.tool import Tool
 
 router = APIRouter()
 
+# Columns lists can be sorted by; each has an index on (column, id)
+SORT_COLUMNS = {"id": Process.id, "name": Process.name, "created_at": Process.created_at}
+
 # Pydantic models for request/response
 class ProcessBase(BaseModel):
     name: str
@@ -45,6 +50,7 @@ class ProcessResponse(ProcessBase):
 
 class ExecutionRequest(BaseModel):
     variables: Dict[str, str] = {}
+    priority: int = 0  # higher values are admitted first when executions are queued
 
 class ExecutionResponse(BaseModel):
     execution_id: int
@@ -53,23 +59,29 @@ class ExecutionResponse(BaseModel):
 
 @router.get("/", response_model=List[ProcessResponse])
 def get_processes(
-    skip: int = 0, 
-    limit: int = 100, 
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    sort: str = "id",
     search: str = None,
     db: Session = Depends(get_db)
 ):
-    """Get all processes with pagination and search"""
+    """Get processes page by page, with search.
+
+    Pass the X-Next-Cursor response header as ``cursor`` to get the next
+    page. ``sort`` is one of id, name or created_at, prefixed with ``-`` for
+    descending order. ``search`` matches word prefixes and lists the best
+    matches first.
+    """
     query = db.query(Process)
     
+    sort_column, descending = parse_sort(sort, SORT_COLUMNS)
     if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            (Process.name.ilike(search_filter)) |
-            (Process.description.ilike(search_filter)) |
-            (Process.process_type.ilike(search_filter))
-        )
-    
-    processes = query.offset(skip).limit(limit).all()
+        # Search results come best match first, whatever the sort
+        processes, next_cursor = paginate_by_position(apply_search(query, Process, search), limit, cursor)
+    else:
+        processes, next_cursor = paginate(query, sort_column, Process.id, limit, cursor, descending)
+    set_next_cursor(response, next_cursor)
     return processes
 
 @router.post("/", response_model=ProcessResponse, status_code=status.HTTP_201_CREATED)
@@ -123,35 +135,54 @@ def delete_process(process_id: int, db: Session = Depends(get_db)):
 
 from fastapi.responses import StreamingResponse
 from app.core.crewai_service import crewai_service
+from app.core.execution_logs import append_log
+from app.core.output_batching import batch_chunks
+from app.core.config import settings
+
+def sse_event(text: str) -> str:
+    """Format text as one SSE event; each line needs its own ``data:`` field."""
+    return "".join(f"data: {line}\n" for line in text.rstrip("\n").split("\n")) + "\n"
 
 @router.post("/{process_id}/execute")
 async def execute_process(
     process_id: int, 
     execution_request: ExecutionRequest,
-    db: Session = Depends(get_db)
+    batch_ms: int | None = None,
+    batch_bytes: int | None = None
 ):
-    """Execute a process with variable substitution and CrewAI integration"""
+    """Execute a process with variable substitution and CrewAI integration.
+
+    Output is streamed as SSE events, with chunks arriving within ``batch_ms``
+    merged into one event (``batch_ms=0`` sends one event per chunk).
+    The stream outlives the request, so database work goes through short
+    ``unit_of_work`` sessions instead of a request-scoped one.
+    """
     print(f"🚀 DEBUG: Starting process execution for process_id: {process_id}")
     print(f"🚀 DEBUG: Variables: {execution_request.variables}")
     
-    process = db.query(Process).filter(Process.id == process_id).first()
-    if process is None:
-        print(f"❌ DEBUG: Process {process_id} not found")
-        raise HTTPException(status_code=404, detail="Process not found")
-    
-    print(f"✅ DEBUG: Found process: {process.name}")
-    print(f"✅ DEBUG: Process configuration: {process.configuration}")
+    async with unit_of_work() as db:
+        process = await db.get(Process, process_id)
+        if process is None:
+            print(f"❌ DEBUG: Process {process_id} not found")
+            raise HTTPException(status_code=404, detail="Process not found")
+        
+        print(f"✅ DEBUG: Found process: {process.name}")
+        print(f"✅ DEBUG: Process configuration: {process.configuration}")
 
-    # Create execution record
-    execution = Execution(
-        process_id=process_id,
-        status="running",
-        started_at=datetime.utcnow(),
-        console_log="🚀 Starting process execution...\n"
-    )
-    db.add(execution)
-    db.commit()
-    db.refresh(execution)
+        if not crewai_service.pool.can_admit():
+            raise HTTPException(status_code=503, detail="Execution queue is full, try again later")
+
+        # Create execution record
+        execution = Execution(
+            process_id=process_id,
+            status="running",
+            started_at=datetime.utcnow()
+        )
+        db.add(execution)
+        await db.flush()
+    
+    async with unit_of_work() as db:
+        await db.run_sync(append_log, execution.id, "🚀 Starting process execution...\n")
     
     print(f"✅ DEBUG: Created execution record with ID: {execution.id}")
 
@@ -174,17 +205,20 @@ async def execute_process(
                 process=process,
                 execution_id=execution.id,
                 variables=execution_request.variables,
-                db=db
+                priority=execution_request.priority
             )
             yield f"data: 🔍 Generator created successfully\n\n"
             
-            chunk_count = 0
-            async for chunk in generator:
-                chunk_count += 1
-                yield f"data: 🔍 Received chunk {chunk_count}: {chunk[:50]}...\n\n"
-                yield f"data: {chunk}\n\n"
+            event_count = 0
+            async for batch in batch_chunks(
+                generator,
+                settings.OUTPUT_BATCH_WINDOW_MS if batch_ms is None else batch_ms,
+                settings.OUTPUT_BATCH_MAX_BYTES if batch_bytes is None else batch_bytes
+            ):
+                event_count += 1
+                yield sse_event(batch)
                 
-            yield f"data: ✅ CrewAI service completed normally (received {chunk_count} chunks)\n\n"
+            yield f"data: ✅ CrewAI service completed normally ({event_count} output events)\n\n"
         except Exception as e:
             import traceback
             error_details = traceback.format_exc()
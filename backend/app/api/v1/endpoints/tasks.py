@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Query, Response, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
 from app.core.database import get_db
+from app.core.pagination import paginate, paginate_by_position, parse_sort, set_next_cursor
+from app.core.search import apply_search
 from app.models.task import Task
 
 router = APIRouter()
 
+# Columns lists can be sorted by; each has an index on (column, id)
+SORT_COLUMNS = {"id": Task.id, "name": Task.name, "created_at": Task.created_at}
+
 # Pydantic models for request/response
 class TaskBase(BaseModel):
     name: str
@@ -39,23 +44,29 @@ class TaskResponse(TaskBase):
 
 @router.get("/", response_model=List[TaskResponse])
 def get_tasks(
-    skip: int = 0, 
-    limit: int = 100, 
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    sort: str = "id",
     search: str = None,
     db: Session = Depends(get_db)
 ):
-    """Get all tasks with pagination and search"""
+    """Get tasks page by page, with search.
+
+    Pass the X-Next-Cursor response header as ``cursor`` to get the next
+    page. ``sort`` is one of id, name or created_at, prefixed with ``-`` for
+    descending order. ``search`` matches word prefixes and lists the best
+    matches first.
+    """
     query = db.query(Task)
     
+    sort_column, descending = parse_sort(sort, SORT_COLUMNS)
     if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            (Task.name.ilike(search_filter)) |
-            (Task.description.ilike(search_filter)) |
-            (Task.expected_output.ilike(search_filter))
-        )
-    
-    tasks = query.offset(skip).limit(limit).all()
+        # Search results come best match first, whatever the sort
+        tasks, next_cursor = paginate_by_position(apply_search(query, Task, search), limit, cursor)
+    else:
+        tasks, next_cursor = paginate(query, sort_column, Task.id, limit, cursor, descending)
+    set_next_cursor(response, next_cursor)
     return tasks
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import json
 import importlib.util
@@ -7,13 +8,18 @@ import sys
 from io import StringIO
 import contextlib
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.pagination import paginate_async, paginate_by_position_async, parse_sort, set_next_cursor
+from app.core.search import apply_search
 from app.models.tool import Tool
 from app.schemas.tool import ToolCreate, ToolUpdate, ToolResponse, ToolList
 from app.core.crewai_tools import get_crewai_tools, get_crewai_tool_categories
 
 router = APIRouter()
 
+# Columns lists can be sorted by; each has an index on (column, id)
+SORT_COLUMNS = {"id": Tool.id, "name": Tool.name, "created_at": Tool.created_at}
+
 # Pre-built LangChain tools library
 LANGCHAIN_TOOLS = {
     "web_search": {
@@ -104,37 +110,49 @@ CREWAI_TOOLS = get_crewai_tools()
 
 @router.get("/", response_model=List[ToolResponse])
 async def get_tools(
-    db: Session = Depends(get_db),
-    skip: int = Query(0, ge=0),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    sort: str = Query("id"),
     category: Optional[str] = Query(None),
     tool_type: Optional[str] = Query(None),
     search: Optional[str] = Query(None)
 ):
-    """Get all tools with optional filtering"""
-    query = db.query(Tool)
+    """Get tools page by page, with optional filtering.
+
+    Pass the X-Next-Cursor response header as ``cursor`` to get the next
+    page. ``sort`` is one of id, name or created_at, prefixed with ``-`` for
+    descending order. ``search`` matches word prefixes and lists the best
+    matches first.
+    """
+    statement = select(Tool)
     
     if category:
-        query = query.filter(Tool.category == category)
+        statement = statement.filter(Tool.category == category)
     if tool_type:
-        query = query.filter(Tool.tool_type == tool_type)
-    if search:
-        query = query.filter(Tool.name.contains(search) | Tool.description.contains(search))
+        statement = statement.filter(Tool.tool_type == tool_type)
     
-    tools = query.offset(skip).limit(limit).all()
+    sort_column, descending = parse_sort(sort, SORT_COLUMNS)
+    if search:
+        # Search results come best match first, whatever the sort
+        tools, next_cursor = await paginate_by_position_async(db, apply_search(statement, Tool, search), limit, cursor)
+    else:
+        tools, next_cursor = await paginate_async(db, statement, sort_column, Tool.id, limit, cursor, descending)
+    set_next_cursor(response, next_cursor)
     return tools
 
 @router.get("/categories")
-async def get_tool_categories(db: Session = Depends(get_db)):
+async def get_tool_categories(db: AsyncSession = Depends(get_async_db)):
     """Get all available tool categories"""
-    categories = db.query(Tool.category).distinct().all()
-    return [category[0] for category in categories]
+    categories = await db.scalars(select(Tool.category).distinct())
+    return list(categories)
 
 @router.get("/types")
-async def get_tool_types(db: Session = Depends(get_db)):
+async def get_tool_types(db: AsyncSession = Depends(get_async_db)):
     """Get all available tool types"""
-    types = db.query(Tool.tool_type).distinct().all()
-    return [type[0] for type in types]
+    types = await db.scalars(select(Tool.tool_type).distinct())
+    return list(types)
 
 @router.get("/langchain-library")
 async def get_langchain_library():
@@ -149,7 +167,7 @@ async def get_crewai_library():
 @router.post("/langchain/{tool_key}")
 async def add_langchain_tool(
     tool_key: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add a pre-built LangChain tool to the database"""
     if tool_key not in LANGCHAIN_TOOLS:
@@ -158,7 +176,7 @@ async def add_langchain_tool(
     tool_data = LANGCHAIN_TOOLS[tool_key]
     
     # Check if tool already exists
-    existing_tool = db.query(Tool).filter(Tool.name == tool_data["name"]).first()
+    existing_tool = await db.scalar(select(Tool).filter(Tool.name == tool_data["name"]))
     if existing_tool:
         raise HTTPException(status_code=400, detail="Tool already exists")
     
@@ -176,14 +194,14 @@ async def add_langchain_tool(
     )
     
     db.add(tool)
-    db.commit()
-    db.refresh(tool)
+    await db.commit()
+    await db.refresh(tool)
     return tool
 
 @router.post("/crewai/{tool_key}")
 async def add_crewai_tool(
     tool_key: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add a pre-built CrewAI tool to the database"""
     if tool_key not in CREWAI_TOOLS:
@@ -192,7 +210,7 @@ async def add_crewai_tool(
     tool_data = CREWAI_TOOLS[tool_key]
     
     # Check if tool already exists
-    existing_tool = db.query(Tool).filter(Tool.name == tool_data["name"]).first()
+    existing_tool = await db.scalar(select(Tool).filter(Tool.name == tool_data["name"]))
     if existing_tool:
         raise HTTPException(status_code=400, detail="Tool already exists")
     
@@ -210,18 +228,18 @@ async def add_crewai_tool(
     )
     
     db.add(tool)
-    db.commit()
-    db.refresh(tool)
+    await db.commit()
+    await db.refresh(tool)
     return tool
 
 @router.post("/", response_model=ToolResponse)
 async def create_tool(
     tool: ToolCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new custom tool"""
     # Check if tool name already exists
-    existing_tool = db.query(Tool).filter(Tool.name == tool.name).first()
+    existing_tool = await db.scalar(select(Tool).filter(Tool.name == tool.name))
     if existing_tool:
         raise HTTPException(status_code=400, detail="Tool name already exists")
     
@@ -235,14 +253,14 @@ async def create_tool(
     
     db_tool = Tool(**tool.dict())
     db.add(db_tool)
-    db.commit()
-    db.refresh(db_tool)
+    await db.commit()
+    await db.refresh(db_tool)
     return db_tool
 
 @router.get("/{tool_id}", response_model=ToolResponse)
-async def get_tool(tool_id: int, db: Session = Depends(get_db)):
+async def get_tool(tool_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific tool by ID"""
-    tool = db.query(Tool).filter(Tool.id == tool_id).first()
+    tool = await db.get(Tool, tool_id)
     if not tool:
         raise HTTPException(status_code=404, detail="Tool not found")
     return tool
@@ -251,10 +269,10 @@ async def get_tool(tool_id: int, db: Session = Depends(get_db)):
 async def update_tool(
     tool_id: int,
     tool_update: ToolUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a tool"""
-    db_tool = db.query(Tool).filter(Tool.id == tool_id).first()
+    db_tool = await db.get(Tool, tool_id)
     if not db_tool:
         raise HTTPException(status_code=404, detail="Tool not found")
     
@@ -268,29 +286,29 @@ async def update_tool(
     for field, value in tool_update.dict(exclude_unset=True).items():
         setattr(db_tool, field, value)
     
-    db.commit()
-    db.refresh(db_tool)
+    await db.commit()
+    await db.refresh(db_tool)
     return db_tool
 
 @router.delete("/{tool_id}")
-async def delete_tool(tool_id: int, db: Session = Depends(get_db)):
+async def delete_tool(tool_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a tool"""
-    tool = db.query(Tool).filter(Tool.id == tool_id).first()
+    tool = await db.get(Tool, tool_id)
     if not tool:
         raise HTTPException(status_code=404, detail="Tool not found")
     
-    db.delete(tool)
-    db.commit()
+    await db.delete(tool)
+    await db.commit()
     return {"message": "Tool deleted successfully"}
 
 @router.post("/{tool_id}/test")
 async def test_tool(
     tool_id: int,
     test_input: dict,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Test a custom tool with sample input"""
-    tool = db.query(Tool).filter(Tool.id == tool_id).first()
+    tool = await db.get(Tool, tool_id)
     if not tool:
         raise HTTPException(status_code=404, detail="Tool not found")
     
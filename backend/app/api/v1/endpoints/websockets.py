@@ -1,24 +1,55 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from sqlalchemy.orm import Session
-from typing import Dict, Set
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
 import asyncio
+import itertools
 import json
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db, unit_of_work
+from app.core.execution_events import (
+    broadcast_backend_name,
+    get_broadcast,
+    publish_execution_event,
+)
+from app.core.connection_sender import ConnectionSender
+from app.core.output_batching import OutputBatcher, merge_output_messages
+from app.core.execution_logs import ExecutionLogWriter, append_log, archive_finished_log, read_log_page
 from app.models.execution import Execution
 from app.models.process import Process
 from app.core.crewai_service import crewai_service
+from app.core.execution_control import stop_execution_by_id
 
 router = APIRouter()
 
+# Bytes of stored log sent per message when replaying from the database
+SNAPSHOT_PAGE_SIZE = 65536
+
 class ConnectionManager:
     def __init__(self):
         # Map execution_id -> set of websocket connections
         self.execution_connections: Dict[int, Set[WebSocket]] = {}
         # Map websocket -> execution_id for cleanup
         self.websocket_executions: Dict[WebSocket, int] = {}
+        # Map execution_id -> (task relaying its broadcast messages, set once the backlog is in)
+        self.relays: Dict[int, Tuple[asyncio.Task, asyncio.Event]] = {}
+        # Map execution_id -> seq of the last message relayed to its connections
+        self.relayed_seq: Dict[int, int] = {}
+        # Connections still being sent their backlog; live messages skip them
+        self.catching_up: Set[WebSocket] = set()
+        # Map websocket -> log offset up to which output was sent from the stored log
+        self.replay_floors: Dict[WebSocket, int] = {}
+        # Map websocket -> its send queue and writer task
+        self.senders: Dict[WebSocket, ConnectionSender] = {}
+        self.slow_consumer_disconnects_total = 0
 
-    async def connect(self, websocket: WebSocket, execution_id: int):
+    async def connect(
+        self,
+        websocket: WebSocket,
+        execution_id: int,
+        batch_ms: Optional[int] = None,
+        batch_bytes: Optional[int] = None
+    ):
         await websocket.accept()
         
         if execution_id not in self.execution_connections:
@@ -26,10 +57,30 @@ class ConnectionManager:
         
         self.execution_connections[execution_id].add(websocket)
         self.websocket_executions[websocket] = execution_id
+        self.senders[websocket] = ConnectionSender(
+            websocket,
+            settings.WS_SEND_QUEUE_SIZE,
+            settings.WS_SLOW_CONSUMER_POLICY,
+            on_failure=self.disconnect,
+            batcher=OutputBatcher(
+                settings.OUTPUT_BATCH_WINDOW_MS if batch_ms is None else batch_ms,
+                settings.OUTPUT_BATCH_MAX_BYTES if batch_bytes is None else batch_bytes
+            )
+        )
+        # Hold live messages back until replay() has sent the backlog
+        self.catching_up.add(websocket)
+        
+        # Messages reach this worker through the broadcast backend, wherever the crew runs
+        await self._ensure_relay(execution_id)
         
         print(f"🔌 WebSocket connected for execution {execution_id}")
 
     def disconnect(self, websocket: WebSocket):
+        self.catching_up.discard(websocket)
+        self.replay_floors.pop(websocket, None)
+        sender = self.senders.pop(websocket, None)
+        if sender:
+            sender.close()
         if websocket in self.websocket_executions:
             execution_id = self.websocket_executions[websocket]
             
@@ -38,25 +89,170 @@ class ConnectionManager:
                 self.execution_connections[execution_id].discard(websocket)
                 if not self.execution_connections[execution_id]:
                     del self.execution_connections[execution_id]
+                    relay = self.relays.pop(execution_id, None)
+                    if relay:
+                        relay[0].cancel()
+                    # The broadcast backend keeps the backlog for the next viewer
+                    self.relayed_seq.pop(execution_id, None)
             
             # Remove from websocket tracking
             del self.websocket_executions[websocket]
             
             print(f"🔌 WebSocket disconnected for execution {execution_id}")
 
+    async def replay(self, websocket: WebSocket, execution_id: int, since: int = 0):
+        """Send a connection every message after ``since``, then switch it to live.
+
+        Messages come from the broadcast backlog when it reaches back far
+        enough; otherwise the stored log is sent first as ``output_snapshot``
+        messages, followed by the backlog messages it doesn't cover.
+        """
+        broadcast = get_broadcast()
+        backlog = [message for message in await broadcast.recent_messages(execution_id) if "seq" in message]
+        if not backlog or backlog[0]["seq"] > since + 1:
+            self.replay_floors[websocket] = await self._send_log_snapshot(websocket, execution_id)
+
+        last_seq = since
+        max_bytes = settings.OUTPUT_BATCH_MAX_BYTES
+        while last_seq < self.relayed_seq.get(execution_id, 0):
+            # Newer messages haven't reached the other connections yet; they come live
+            relayed = self.relayed_seq[execution_id]
+            pending = [message for message in backlog if last_seq < message["seq"] <= relayed]
+            if not pending:
+                # Expired from the backlog before this connection got to them
+                break
+            last_seq = pending[-1]["seq"]
+            outgoing = [self._for_connection(websocket, message) for message in pending]
+            for message in merge_output_messages(outgoing, max_bytes):
+                await websocket.send_text(json.dumps(message))
+            if last_seq < self.relayed_seq.get(execution_id, 0):
+                backlog = [message for message in await broadcast.recent_messages(execution_id) if "seq" in message]
+        # Caught up with what was relayed, so live messages continue right after last_seq
+        self.catching_up.discard(websocket)
+
     async def send_to_execution(self, execution_id: int, message: dict):
+        """Queue a message for every live connection of an execution.
+
+        The message is serialized once; each connection's writer task sends
+        it, so a slow client never holds up the others or the caller.
+        """
+        if "seq" in message:
+            if message["seq"] <= self.relayed_seq.get(execution_id, 0):
+                # Already relayed, e.g. once more as part of a backlog
+                return
+            self.relayed_seq[execution_id] = message["seq"]
+        
         if execution_id in self.execution_connections:
-            connections_to_remove = set()
+            slow_connections = set()
+            payload = json.dumps(message)
             
             for websocket in self.execution_connections[execution_id]:
-                try:
-                    await websocket.send_text(json.dumps(message))
-                except:
-                    connections_to_remove.add(websocket)
+                if websocket in self.catching_up:
+                    continue
+                outgoing = self._for_connection(websocket, message)
+                sender = self.senders.get(websocket)
+                if sender and not sender.enqueue(outgoing, payload if outgoing is message else None):
+                    slow_connections.add(websocket)
             
-            # Clean up broken connections
-            for websocket in connections_to_remove:
+            # Drop clients that can't keep up; they can resume with ?since=
+            for websocket in slow_connections:
+                print(f"🐢 Disconnecting slow WebSocket client for execution {execution_id}")
+                self.slow_consumer_disconnects_total += 1
                 self.disconnect(websocket)
+                asyncio.create_task(self._close(websocket))
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)  # try again later
+        except Exception:
+            pass
+
+    def metrics(self) -> Dict[str, Any]:
+        connections = [
+            {"execution_id": self.websocket_executions.get(websocket), **sender.metrics()}
+            for websocket, sender in self.senders.items()
+        ]
+        return {
+            "broadcast_backend": broadcast_backend_name(),
+            "relays": len(self.relays),
+            "connections": len(connections),
+            "catching_up": len(self.catching_up),
+            "slow_consumer_policy": settings.WS_SLOW_CONSUMER_POLICY,
+            "max_queue_size": settings.WS_SEND_QUEUE_SIZE,
+            "queue_depth_total": sum(c["queue_depth"] for c in connections),
+            "max_queue_depth": max((c["max_queue_depth"] for c in connections), default=0),
+            "slow_consumer_disconnects_total": self.slow_consumer_disconnects_total,
+            "per_connection": connections,
+        }
+
+    def _already_sent(self, websocket: WebSocket, message: dict) -> bool:
+        """Whether an output message was part of the stored log sent to this connection."""
+        floor = self.replay_floors.get(websocket)
+        return (
+            floor is not None
+            and message.get("type") == "output"
+            and message.get("log_offset", floor) < floor
+        )
+
+    def _for_connection(self, websocket: WebSocket, message: dict) -> dict:
+        """The message as sent to a connection.
+
+        Output it already got from the stored log goes out without content,
+        so its seq still reaches the client and no gap shows.
+        """
+        if self._already_sent(websocket, message):
+            return {**message, "content": ""}
+        return message
+
+    async def _send_log_snapshot(self, websocket: WebSocket, execution_id: int) -> int:
+        """Send the stored log in pages; returns the offset it was sent up to."""
+        offset = 0
+        while True:
+            start, end, total, content = await asyncio.to_thread(
+                read_log_page, execution_id, offset, SNAPSHOT_PAGE_SIZE
+            )
+            if content or offset == 0:
+                await websocket.send_text(json.dumps({
+                    "type": "output_snapshot",
+                    "execution_id": execution_id,
+                    "content": content,
+                    "log_offset": start,
+                    # The first page replaces whatever output the client already shows
+                    "reset": offset == 0
+                }))
+            if end >= total or end == offset:
+                return end
+            offset = end
+
+    async def _ensure_relay(self, execution_id: int):
+        """Start relaying an execution's messages unless already running; waits for its backlog."""
+        relay = self.relays.get(execution_id)
+        if relay is None:
+            ready = asyncio.Event()
+            task = asyncio.create_task(self._relay_execution_events(execution_id, ready))
+            relay = self.relays[execution_id] = (task, ready)
+        await relay[1].wait()
+
+    async def _relay_execution_events(self, execution_id: int, ready: asyncio.Event):
+        """Forward an execution's broadcast messages to local connections."""
+        subscription = get_broadcast().subscribe(execution_id)
+        try:
+            try:
+                for message in await subscription.backlog():
+                    await self.send_to_execution(execution_id, message)
+            finally:
+                ready.set()
+            async for message in subscription:
+                await self.send_to_execution(execution_id, message)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"❌ Relay for execution {execution_id} failed: {str(e)}")
+        finally:
+            await subscription.close()
+            relay = self.relays.get(execution_id)
+            if relay and relay[0] is asyncio.current_task():
+                del self.relays[execution_id]
 
     def get_execution_connection_count(self, execution_id: int) -> int:
         return len(self.execution_connections.get(execution_id, set()))
@@ -65,59 +261,78 @@ class ConnectionManager:
 manager = ConnectionManager()
 
 @router.websocket("/ws/execution/{execution_id}")
-async def websocket_execution_endpoint(websocket: WebSocket, execution_id: int):
-    """WebSocket endpoint for streaming execution output"""
-    await manager.connect(websocket, execution_id)
-    
+async def websocket_execution_endpoint(
+    websocket: WebSocket,
+    execution_id: int,
+    since: int = 0,
+    batch_ms: Optional[int] = None,
+    batch_bytes: Optional[int] = None
+):
+    """WebSocket endpoint for streaming execution output.
+
+    Every execution message carries a ``seq``; reconnect with ``?since=<seq>``
+    of the last message received to resume without gaps or repeats.
+    ``batch_ms``/``batch_bytes`` tune how output is merged into frames for this
+    connection (``batch_ms=0`` sends every chunk as its own frame).
+    """
     try:
+        await manager.connect(websocket, execution_id, batch_ms, batch_bytes)
+        
         # Send initial connection confirmation
         await websocket.send_text(json.dumps({
             "type": "connection_established",
             "execution_id": execution_id,
+            "since": since,
             "timestamp": asyncio.get_event_loop().time()
         }))
+        await manager.replay(websocket, execution_id, since)
         
-        # Keep connection alive and listen for client messages
+        # Wait for client messages (like stop commands); idle connections are
+        # kept alive by the server's WebSocket ping frames
         while True:
+            data = await websocket.receive_text()
             try:
-                # Wait for client messages (like stop commands)
-                data = await asyncio.wait_for(websocket.receive_text(), timeout=1.0)
                 message = json.loads(data)
-                
-                if message.get("type") == "stop_execution":
-                    print(f"🛑 Received stop command for execution {execution_id}")
-                    # Handle stop execution logic here
-                    await manager.send_to_execution(execution_id, {
-                        "type": "execution_stopped",
-                        "execution_id": execution_id,
-                        "message": "Execution stop requested"
-                    })
-                    
-            except asyncio.TimeoutError:
-                # No message received, continue listening
-                continue
             except json.JSONDecodeError:
                 await websocket.send_text(json.dumps({
                     "type": "error",
                     "message": "Invalid JSON message"
                 }))
+                continue
+            
+            if message.get("type") == "stop_execution":
+                print(f"🛑 Received stop command for execution {execution_id}")
+                # The execution's stream reports execution_stopped once it has halted
+                if not await stop_execution_by_id(execution_id):
+                    await websocket.send_text(json.dumps({
+                        "type": "error",
+                        "execution_id": execution_id,
+                        "message": "Execution is not running"
+                    }))
+            elif message.get("type") == "ping":
+                # For clients that can't send protocol-level pings
+                await websocket.send_text(json.dumps({"type": "pong"}))
                 
     except WebSocketDisconnect:
+        pass
+    finally:
+        # Whatever ended the connection, its writer task and relay go with it
         manager.disconnect(websocket)
 
 @router.post("/{process_id}/execute/stream")
 async def execute_process_with_websocket(
     process_id: int,
     execution_request: dict,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Start process execution and return execution_id for WebSocket connection"""
     from datetime import datetime
     
     # Create a simple schema for validation
     class ExecutionRequest:
-        def __init__(self, variables: dict = None):
+        def __init__(self, variables: dict = None, priority: int = 0):
             self.variables = variables or {}
+            self.priority = int(priority)
     
     # Validate the request
     try:
@@ -126,28 +341,46 @@ async def execute_process_with_websocket(
         return {"error": f"Invalid request: {str(e)}"}, 400
     
     # Get the process
-    process = db.query(Process).filter(Process.id == process_id).first()
+    process = await db.get(Process, process_id)
     if process is None:
         return {"error": "Process not found"}, 404
     
+    dispatch_to_celery = settings.EXECUTION_DISPATCH == "celery"
+    if not dispatch_to_celery and not crewai_service.pool.can_admit():
+        raise HTTPException(status_code=503, detail="Execution queue is full, try again later")
+    
     # Create execution record
     execution = Execution(
         process_id=process_id,
-        status="running",
-        started_at=datetime.utcnow(),
-        console_log="🚀 Starting process execution...\n"
+        status="queued" if dispatch_to_celery else "running",
+        started_at=datetime.utcnow()
     )
     db.add(execution)
-    db.commit()
-    db.refresh(execution)
+    await db.commit()
+    await db.refresh(execution)
+    await db.run_sync(append_log, execution.id, "🚀 Starting process execution...\n")
     
-    # Start the execution in background
+    if dispatch_to_celery:
+        # A Celery worker runs the crew; its output reaches viewers through Redis
+        from app.celery import execution_task_id, run_execution
+        run_execution.apply_async(
+            (execution.id, validated_request.variables, validated_request.priority),
+            task_id=execution_task_id(execution.id)
+        )
+        return {
+            "execution_id": execution.id,
+            "message": "Execution queued",
+            "websocket_url": f"/api/v1/ws/execution/{execution.id}"
+        }
+    
+    # Start the execution in background; it opens its own short sessions, this
+    # request's session is closed as soon as the response is sent
     asyncio.create_task(
         execute_with_websocket_streaming(
             execution.id, 
             process, 
             validated_request.variables, 
-            db
+            validated_request.priority
         )
     )
     
@@ -161,20 +394,32 @@ async def execute_with_websocket_streaming(
     execution_id: int, 
     process: Process, 
     variables: Dict[str, str], 
-    db: Session
+    priority: int = 0,
+    publish: Optional[Callable[[int, Dict[str, Any]], Awaitable[Any]]] = None
 ):
-    """Execute process and stream output via WebSocket"""
-    from datetime import datetime
+    """Execute process and stream output via WebSocket.
+
+    Messages are published to the broadcast backend, from where every worker
+    with viewers for the execution relays them to its connections. ``process``
+    must have its columns loaded; no database session is held for the run.
+    """
+    publish = publish or publish_execution_event
+    
+    # Number messages so viewers can resume from the last one they saw
+    sequence = itertools.count(1)
+    
+    async def emit(message: Dict[str, Any]):
+        message["seq"] = next(sequence)
+        await publish(execution_id, message)
     
-    # Initialize accumulated console log with existing content
-    execution = db.query(Execution).filter(Execution.id == execution_id).first()
-    accumulated_log = execution.console_log if execution and execution.console_log else "🚀 Starting process execution...\n"
+    # A background writer appends output to the execution's log in timed/sized batches
+    log = await ExecutionLogWriter.start(execution_id)
     
     try:
         print(f"🚀 Starting WebSocket streaming execution {execution_id}")
         
         # Send initial status
-        await manager.send_to_execution(execution_id, {
+        await emit({
             "type": "execution_started",
             "execution_id": execution_id,
             "process_name": process.name,
@@ -186,42 +431,55 @@ async def execute_with_websocket_streaming(
             process=process,
             execution_id=execution_id,
             variables=variables,
-            db=db
+            priority=priority
         ):
-            # Accumulate the output for database storage
-            accumulated_log += output_chunk
+            log_offset = log.total_bytes
+            log.write(output_chunk)
             
             # Send each chunk via WebSocket
-            await manager.send_to_execution(execution_id, {
+            await emit({
                 "type": "output",
                 "execution_id": execution_id,
                 "content": output_chunk,
+                "log_offset": log_offset,  # where the chunk starts in the stored log
                 "timestamp": asyncio.get_event_loop().time()
             })
-            
-            # Periodically save to database (every 50 chunks or so to avoid too many DB calls)
-            if len(accumulated_log) % 2000 == 0:  # Every ~2KB of output
-                execution = db.query(Execution).filter(Execution.id == execution_id).first()
-                if execution:
-                    execution.console_log = accumulated_log
-                    db.commit()
         
         # Send completion status
-        await manager.send_to_execution(execution_id, {
-            "type": "execution_completed",
-            "execution_id": execution_id,
-            "message": "Process execution completed successfully"
-        })
+        stop_reason = crewai_service.was_cancelled(execution_id)
+        if stop_reason == "timeout":
+            final_status = "failed"
+            await emit({
+                "type": "execution_error",
+                "execution_id": execution_id,
+                "error": f"Execution timed out after {settings.CREW_EXECUTION_TIMEOUT_SECONDS} seconds"
+            })
+        elif stop_reason:
+            final_status = "stopped"
+            await emit({
+                "type": "execution_stopped",
+                "execution_id": execution_id,
+                "message": "Execution stopped by user"
+            })
+        else:
+            final_status = "completed"
+            await emit({
+                "type": "execution_completed",
+                "execution_id": execution_id,
+                "message": "Process execution completed successfully"
+            })
         
-        # Final update to execution status and save all accumulated logs
-        execution = db.query(Execution).filter(Execution.id == execution_id).first()
-        if execution:
-            execution.status = "completed"
-            execution.completed_at = datetime.utcnow()
-            execution.console_log = accumulated_log  # Save all accumulated output
-            db.commit()
+        # Save the remaining output and the final execution status
+        await log.close()
+        final_status = await _finish_execution(execution_id, final_status)
             
-        print(f"✅ Completed execution {execution_id} with {len(accumulated_log)} characters of log data")
+        if final_status == "completed":
+            print(f"✅ Completed execution {execution_id} with {log.total_bytes} bytes of log data")
+        elif final_status == "stopped":
+            print(f"🛑 Stopped execution {execution_id} with {log.total_bytes} bytes of log data")
+        else:
+            print(f"❌ Failed execution {execution_id} with {log.total_bytes} bytes of log data")
+        await archive_finished_log(execution_id)
         
     except Exception as e:
         import traceback
@@ -230,26 +488,35 @@ async def execute_with_websocket_streaming(
         print(f"❌ Error in WebSocket execution {execution_id}: {str(e)}")
         print(f"❌ Traceback: {error_details}")
         
-        # Add error to accumulated log
-        accumulated_log += f"\n❌ Error: {str(e)}\n{error_details}"
+        # Add error to the log
+        log.write(f"\n❌ Error: {str(e)}\n{error_details}")
         
         # Send error via WebSocket
-        await manager.send_to_execution(execution_id, {
+        await emit({
             "type": "execution_error",
             "execution_id": execution_id,
             "error": str(e),
             "traceback": error_details
         })
         
-        # Update execution status in database with all accumulated output
-        execution = db.query(Execution).filter(Execution.id == execution_id).first()
-        if execution:
-            execution.status = "failed"
-            execution.completed_at = datetime.utcnow()
-            execution.console_log = accumulated_log  # Save all accumulated output including error
-            db.commit()
+        # Save the remaining output (including the error) and the failed status
+        await log.close()
+        await _finish_execution(execution_id, "failed")
             
-        print(f"❌ Failed execution {execution_id} with {len(accumulated_log)} characters of log data")
+        print(f"❌ Failed execution {execution_id} with {log.total_bytes} bytes of log data")
+        await archive_finished_log(execution_id)
+
+async def _finish_execution(execution_id: int, status: str) -> Optional[str]:
+    """Store the final status; returns it, or None if the execution is gone."""
+    from datetime import datetime
+
+    async with unit_of_work() as db:
+        execution = await db.get(Execution, execution_id)
+        if execution is None:
+            return None
+        execution.status = status
+        execution.completed_at = datetime.utcnow()
+        return execution.status
 
 # Export the connection manager for use in other modules
 __all__ = ["router", "manager"]
\ No newline at end of file
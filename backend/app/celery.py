@@ -0,0 +1,93 @@
+"""
+Celery application for distributed crew execution.
+
+Started by docker-compose with ``celery -A app.celery worker``. When
+EXECUTION_DISPATCH is "celery", the API only creates the execution record and
+enqueues ``run_execution``; a worker runs the crew and publishes its output
+over Redis pub/sub (see app.core.execution_events), from where any API node
+relays it to WebSocket clients. Stopping such an execution revokes its task
+(see app.core.execution_control).
+
+Tasks are acked late, so a task whose worker dies is delivered again. Only
+the delivery that moves the execution from "queued" to "running" runs the
+crew. A redelivery after the crew started finds it running, stopped or done
+and does nothing, rather than paying for a second run and a second log.
+"""
+import asyncio
+from typing import Dict, Optional
+
+from celery import Celery
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.database import async_engine, unit_of_work
+from app.core.execution_events import close_broadcast, publish_execution_event
+from app.models.execution import Execution
+from app.models.process import Process
+
+celery_app = Celery("crewui", broker=settings.REDIS_URL)
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    # A crew run is long; hand each worker one job at a time and only ack it once done.
+    # Redeliveries of a started execution are skipped by run_execution.
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    task_ignore_result=True,
+)
+
+
+def execution_task_id(execution_id: int) -> str:
+    """Task id an execution is dispatched under, so it can be revoked by execution id."""
+    return f"crewui-execution-{execution_id}"
+
+
+def revoke_execution(execution_id: int) -> None:
+    """Drop a dispatched execution, terminating the worker process if it already runs."""
+    celery_app.control.revoke(execution_task_id(execution_id), terminate=True)
+
+
+@celery_app.task(name="crewui.run_execution")
+def run_execution(execution_id: int, variables: Optional[Dict[str, str]] = None, priority: int = 0):
+    """Run a queued execution and publish its output stream; skipped unless it is still queued."""
+    asyncio.run(_run_execution(execution_id, variables or {}, priority))
+
+
+async def _run_execution(execution_id: int, variables: Dict[str, str], priority: int):
+    try:
+        async with unit_of_work() as db:
+            # Claimed in one statement, so only one delivery of the task gets to run it
+            claimed = await db.execute(
+                update(Execution)
+                .where(Execution.id == execution_id, Execution.status == "queued")
+                .values(status="running")
+            )
+            if claimed.rowcount == 0:
+                execution = await db.get(Execution, execution_id)
+                if execution is None:
+                    print(f"❌ Celery: Execution {execution_id} not found")
+                else:
+                    print(f"⏭️  Celery: Execution {execution_id} is {execution.status}, not running it again")
+                return
+            execution = await db.get(Execution, execution_id)
+            process = await db.get(Process, execution.process_id)
+            if process is None:
+                print(f"❌ Celery: Process {execution.process_id} not found for execution {execution_id}")
+                execution.status = "failed"
+                return
+
+        # Imported here so the Celery app can be loaded without the API routes
+        from app.api.v1.endpoints.websockets import execute_with_websocket_streaming
+
+        await execute_with_websocket_streaming(
+            execution_id,
+            process,
+            variables,
+            priority,
+            publish=publish_execution_event
+        )
+    finally:
+        # Every task runs on a new event loop; pooled connections and the Redis
+        # client belong to the old one
+        await async_engine.dispose()
+        await close_broadcast()
@@ -2,6 +2,9 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List
 import os
 
+# The backend directory; default data paths are resolved from it, not from the working directory
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 class Settings(BaseSettings):
     # Pydantic v2 settings config
     model_config = SettingsConfigDict(
@@ -11,6 +14,16 @@ class Settings(BaseSettings):
     )
     # Database
     DATABASE_URL: str = "sqlite:///./crewui.db"
+    DATABASE_ENGINE_PROFILE: str = "production"  # 'production' (tuned pool/pragmas below) or 'default' (driver defaults)
+    DATABASE_ECHO: bool = False  # log every SQL statement (slow; for debugging only)
+    DB_POOL_SIZE: int = 10  # server databases: connections kept open per engine...
+    DB_MAX_OVERFLOW: int = 20  # ...plus this many extra under load
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # reopen connections older than this (seconds)
+    SQLITE_JOURNAL_MODE: str = "WAL"  # readers don't block the writer
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # fsync at checkpoints only; safe with WAL
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # wait this long for a lock instead of failing with "database is locked"
+    SQLITE_MMAP_SIZE: int = 268435456  # bytes of the database file read through mmap
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
@@ -27,6 +40,32 @@ class Settings(BaseSettings):
     # OpenAI
     OPENAI_API_KEY: str = ""
     
+    # Execution pool
+    CREW_MAX_CONCURRENCY: int = 4  # crews running at the same time
+    CREW_MAX_QUEUE_SIZE: int = 100  # executions waiting for a slot before rejecting
+    CREW_EXECUTION_BACKEND: str = "thread"  # 'thread' (in the API process) or 'process' (worker processes)
+    EXECUTION_DISPATCH: str = "local"  # 'local' (run in the API) or 'celery' (enqueue for `celery -A app.celery worker`)
+    CREW_EXECUTION_TIMEOUT_SECONDS: int = 0  # stop executions running longer than this (0 disables)
+    CREW_CANCEL_GRACE_SECONDS: float = 30.0  # interrupt a stopped crew's thread if it hasn't wound down by then
+    PROCESS_PLAN_CACHE_SIZE: int = 128  # compiled process plans kept for repeated executions (0 disables)
+    
+    # Execution logs
+    LOG_FLUSH_BYTES: int = 16384  # flush buffered output once this much has built up...
+    LOG_FLUSH_INTERVAL_MS: int = 250  # ...or once the oldest buffered chunk is this old
+    EXECUTION_LOG_DIR: str = os.path.join(BACKEND_DIR, "execution_logs")  # gzip archives of finished executions' logs
+    LOG_COMPRESSION_LEVEL: int = 6
+    
+    # WebSocket streams
+    WS_PING_INTERVAL: float = 20.0  # seconds between protocol-level pings to each client
+    WS_PING_TIMEOUT: float = 20.0  # close the connection if a pong takes longer than this
+    WS_REPLAY_BUFFER_SIZE: int = 1000  # recent messages kept per execution for reconnecting clients
+    WS_REPLAY_RETENTION_SECONDS: int = 300  # how long a message is kept for replay, finished or not
+    WS_SEND_QUEUE_SIZE: int = 256  # messages queued per connection before the slow consumer policy applies
+    WS_SLOW_CONSUMER_POLICY: str = "coalesce"  # 'drop_oldest', 'coalesce' or 'disconnect'
+    EXECUTION_BROADCAST_BACKEND: str = "auto"  # 'memory', 'redis' (shared by all API workers) or 'auto' (redis with Celery dispatch)
+    OUTPUT_BATCH_WINDOW_MS: int = 30  # merge output arriving within this window into one frame/event (0 disables)
+    OUTPUT_BATCH_MAX_BYTES: int = 16384  # ...or until this much has been merged
+    
     # File Storage
     UPLOAD_DIR: str = "./uploads"
     MAX_FILE_SIZE: int = 10485760  # 10MB
@@ -0,0 +1,143 @@
+"""
+Per-connection sending of execution WebSocket messages.
+
+Each connection gets a bounded queue drained by its own writer task, so a
+slow client never holds up the others or the execution producing the output.
+When the queue is full, WS_SLOW_CONSUMER_POLICY decides what happens:
+
+- "drop_oldest": drop the oldest queued output message.
+- "coalesce": merge queued output messages, dropping like drop_oldest if
+  that isn't enough.
+- "disconnect": close the connection.
+
+Only output is ever dropped. The client sees the missing seq and reconnects
+with ``?since=``, which replays what it missed; a queue full of other messages
+disconnects it, and it resumes the same way.
+"""
+import asyncio
+import json
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from fastapi import WebSocket
+
+from app.core.output_batching import OutputBatcher, merge_output_messages
+
+# What to do when a connection's send queue is full
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+
+class ConnectionSender:
+    """Sends one connection's messages from a bounded queue on its own task.
+
+    Queued entries are (message, serialized payload) pairs; the payload is
+    shared by every connection the message goes to.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue_size: int,
+        policy: str,
+        on_failure: Callable[[WebSocket], None],
+        batcher: Optional[OutputBatcher] = None
+    ):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {policy}")
+        self.websocket = websocket
+        self.max_queue_size = max_queue_size
+        self.policy = policy
+        self.on_failure = on_failure
+        # Merges output that arrives in quick succession into one frame
+        self.batcher = batcher or OutputBatcher(0, 0)
+        self.queue: Deque[Tuple[dict, Optional[str]]] = deque()
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+        # Metrics
+        self.max_queue_depth = 0
+        self.sent_total = 0
+        self.dropped_total = 0
+        self.coalesced_total = 0
+        self.batched_total = 0
+
+    def enqueue(self, message: dict, payload: Optional[str]) -> bool:
+        """Queue a message; returns False if the connection should be dropped instead."""
+        if len(self.queue) >= self.max_queue_size:
+            if self.policy == "disconnect":
+                return False
+            if self.policy == "coalesce":
+                self._coalesce()
+            if len(self.queue) >= self.max_queue_size and not self._drop_oldest_output():
+                return False
+        self.queue.append((message, payload))
+        self.max_queue_depth = max(self.max_queue_depth, len(self.queue))
+        self._ready.set()
+        return True
+
+    def close(self) -> None:
+        if self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": len(self.queue),
+            "max_queue_depth": self.max_queue_depth,
+            "sent_total": self.sent_total,
+            "dropped_total": self.dropped_total,
+            "coalesced_total": self.coalesced_total,
+            "batched_total": self.batched_total,
+        }
+
+    def _drop_oldest_output(self) -> bool:
+        """Drop the oldest queued output message; False if none is queued."""
+        for index, (message, _) in enumerate(self.queue):
+            if message.get("type") == "output":
+                del self.queue[index]
+                self.dropped_total += 1
+                return True
+        return False
+
+    def _coalesce(self) -> None:
+        """Merge runs of queued output messages into single messages."""
+        merged = merge_output_messages(message for message, _ in self.queue)
+        if len(merged) < len(self.queue):
+            self.coalesced_total += len(self.queue) - len(merged)
+            # Unchanged messages keep their shared payload
+            payloads = {id(message): payload for message, payload in self.queue}
+            self.queue = deque((message, payloads.get(id(message))) for message in merged)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                while not self.queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                message, payload = self.queue.popleft()
+                if message.get("type") == "output" and self.batcher.enabled:
+                    message, payload = await self._batch_output(message, payload)
+                await self.websocket.send_text(payload if payload is not None else json.dumps(message))
+                self.sent_total += 1
+                self.batcher.sent(loop.time())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.on_failure(self.websocket)
+
+    async def _batch_output(self, message: dict, payload: Optional[str]) -> Tuple[dict, Optional[str]]:
+        """Merge an output message with the output queued right behind it."""
+        delay = self.batcher.delay(asyncio.get_running_loop().time())
+        if delay:
+            # Output is arriving in quick succession; let the rest of the window queue up
+            await asyncio.sleep(delay)
+        batch = [message]
+        size = len(message["content"])
+        while self.queue and self.queue[0][0].get("type") == "output" and size < self.batcher.max_bytes:
+            next_message, _ = self.queue.popleft()
+            batch.append(next_message)
+            size += len(next_message["content"])
+        if len(batch) == 1:
+            return message, payload
+        self.batched_total += len(batch) - 1
+        return merge_output_messages(batch)[0], None
@@ -0,0 +1,84 @@
+"""
+Crew kickoff inside pooled worker processes.
+
+Used when CREW_EXECUTION_BACKEND is "process". CrewAI objects don't survive
+pickling, so the API process sends a plain crew spec (see
+``CrewAIService._agent_kwargs``/``_task_kwargs``) and the worker rebuilds the
+crew from it. Output lines travel back over a queue shared with the parent.
+
+Crews built here also check a cancel event after every agent step and task
+(``cancellation_callback``), which is how a stop reaches a running kickoff.
+"""
+from typing import Any, Callable, Dict, Optional
+
+from crewai import Agent, Crew, Process, Task
+
+from app.core.output_capture import LineWriter, capture_output
+
+# Marks the end of a kickoff's output on the channel
+END_OF_OUTPUT = None
+
+
+class ExecutionCancelled(Exception):
+    """Raised inside a kickoff to abandon it once a stop was requested."""
+
+
+def cancellation_callback(cancel_event: Any) -> Callable[..., None]:
+    """Crew step/task callback that aborts the kickoff once ``cancel_event`` is set."""
+    def check_cancelled(*args: Any, **kwargs: Any) -> None:
+        if cancel_event.is_set():
+            raise ExecutionCancelled("Execution was stopped")
+    return check_cancelled
+
+
+class ChannelLineSink(LineWriter):
+    """Line writer that sends each line to the parent process."""
+
+    def __init__(self, channel: Any, prefix: str = ""):
+        super().__init__(prefix=prefix)
+        self.channel = channel
+
+    def _deliver(self, line: str) -> None:
+        self.channel.put(line)
+
+
+def build_crew(spec: Dict[str, Any], cancel_event: Optional[Any] = None) -> Crew:
+    """Build a Crew from a spec of the form::
+
+        {
+            "process_type": "sequential",
+            "agents": {agent_id: {...Agent kwargs...}},
+            "tasks": [{"agent_id": agent_id, "kwargs": {...Task kwargs...}}],
+        }
+    """
+    agents = {agent_id: Agent(**kwargs) for agent_id, kwargs in spec["agents"].items()}
+    tasks = [Task(agent=agents[task["agent_id"]], **task["kwargs"]) for task in spec["tasks"]]
+    callbacks = {}
+    if cancel_event is not None:
+        check_cancelled = cancellation_callback(cancel_event)
+        callbacks = {"step_callback": check_cancelled, "task_callback": check_cancelled}
+    return Crew(
+        agents=list(agents.values()),
+        tasks=tasks,
+        process=Process.sequential if spec["process_type"] == "sequential" else Process.hierarchical,
+        verbose=True,
+        **callbacks
+    )
+
+
+def kickoff_crew_spec(spec: Dict[str, Any], cancel_event: Any, channel: Any) -> str:
+    """Worker process entry point: build the crew, stream its output, return the result."""
+    stdout_sink = ChannelLineSink(channel, prefix="🤖 ")
+    stderr_sink = ChannelLineSink(channel, prefix="⚠️  ")
+    try:
+        if cancel_event.is_set():
+            # Stopped while waiting for a free worker
+            raise ExecutionCancelled("Execution was stopped")
+        with capture_output(stdout=stdout_sink, stderr=stderr_sink):
+            result = build_crew(spec, cancel_event).kickoff()
+        # Crew results aren't guaranteed to pickle; the API only needs the text
+        return str(result) if result else ""
+    finally:
+        stdout_sink.close()
+        stderr_sink.close()
+        channel.put(END_OF_OUTPUT)
@@ -1,84 +1,122 @@
 """
 CrewAI Service for handling crew instantiation and execution.
+
+Every queued or running execution has an ExecutionHandle in the service's
+registry. Stopping an execution (by a user or the execution timeout) goes
+through the handle: the crew is asked to stop after its current agent step or
+task, its output is dropped, and its pool slot goes to the next execution
+straight away. A thread-backend crew that ignores the request is interrupted
+once CREW_CANCEL_GRACE_SECONDS have passed.
 """
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional, AsyncGenerator
 import asyncio
 from crewai import Crew, Agent, Task, Process
-from sqlalchemy.orm import Session
 from app.models.agent import Agent as AgentModel
 from app.models.task import Task as TaskModel
 from app.models.process import Process as ProcessModel
-from app.models.tool import Tool as ToolModel
+from app.models.execution import Execution as ExecutionModel
 from app.core.config import settings
 from app.core.crewai_tools import get_crewai_tool_by_name
-from app.core.database import SessionLocal
+from app.core.database import unit_of_work
+from app.core.execution_pool import CrewExecutionPool, ThreadInterrupt
+from app.core.crew_worker import ExecutionCancelled, cancellation_callback, kickoff_crew_spec
+from app.core.output_capture import LineStreamSink, capture_output
+from app.core.execution_plans import plan_cache
+from app.core.process_resolver import ResolvedSteps
+
+# Put on an execution's output queue to end its stream early
+EXECUTION_CANCELLED = "EXECUTION_CANCELLED"
+
+@dataclass
+class ExecutionHandle:
+    """Everything needed to stop a queued or running execution."""
+    execution_id: int
+    queue: asyncio.Queue
+    cancel_event: Any = None  # polled by the crew between steps and tasks
+    task: Optional[asyncio.Task] = None  # the _run_crew task once the crew was started
+    interrupt: ThreadInterrupt = field(default_factory=ThreadInterrupt)  # for the kickoff's thread (thread backend)
+    sinks: List[LineStreamSink] = field(default_factory=list)
+    cancel_reason: Optional[str] = None  # 'user' or 'timeout' once a stop was requested
+    timers: List[asyncio.TimerHandle] = field(default_factory=list)
 
 class CrewAIService:
     def __init__(self):
-        self.execution_queues: Dict[int, asyncio.Queue] = {}
+        self.executions: Dict[int, ExecutionHandle] = {}
+        # Why executions were stopped, until their stream has reported it
+        self.cancelled: Dict[int, str] = {}
+        # One long-lived, bounded pool shared by every execution
+        self.pool = CrewExecutionPool(
+            max_concurrency=settings.CREW_MAX_CONCURRENCY,
+            max_queue_size=settings.CREW_MAX_QUEUE_SIZE,
+            backend=settings.CREW_EXECUTION_BACKEND
+        )
 
-    async def create_agent(self, agent_model: AgentModel, db: Session) -> Agent:
+    async def create_agent(self, agent_model: AgentModel, resolved: ResolvedSteps, variables: Optional[Dict[str, str]] = None) -> Agent:
         """Create a CrewAI Agent from our AgentModel."""
-        # For now, create agents without tools to avoid the KeyError
-        # TODO: Implement proper tool instantiation for CrewAI tools
-        tools = []
-        
         # Log tool information for debugging
         if agent_model.tools:
             print(f"🔧 DEBUG: Agent {agent_model.name} has {len(agent_model.tools)} tools configured")
-            for tool_id in agent_model.tools:
-                tool = db.query(ToolModel).filter(ToolModel.id == tool_id).first()
-                if tool:
-                    print(f"   🔧 Tool: {tool.name} (Type: {tool.tool_type})")
-                    # TODO: Instantiate actual CrewAI/LangChain tool objects here
-                    # For now, we'll skip adding tools to avoid the KeyError
+            for tool in resolved.tools_of(agent_model.tools):
+                print(f"   🔧 Tool: {tool.name} (Type: {tool.tool_type})")
+                # TODO: Instantiate actual CrewAI/LangChain tool objects here
+                # For now, we'll skip adding tools to avoid the KeyError
         
-        return Agent(
-            role=agent_model.role,
-            goal=agent_model.goal,
-            backstory=agent_model.backstory,
-            tools=tools,  # Empty list for now to avoid KeyError
+        return Agent(**self._agent_kwargs(agent_model, variables))
+
+    def _agent_kwargs(self, agent_model: AgentModel, variables: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Keyword arguments for a CrewAI Agent; plain data so worker processes can rebuild it.
+
+        Variables are substituted here rather than on the model, so the stored
+        agent keeps its placeholders.
+        """
+        return dict(
+            role=self._substitute_variables(agent_model.role, variables),
+            goal=self._substitute_variables(agent_model.goal, variables),
+            backstory=self._substitute_variables(agent_model.backstory, variables),
+            # For now, create agents without tools to avoid the KeyError
+            # TODO: Implement proper tool instantiation for CrewAI tools
+            tools=[],
             llm_config=agent_model.llm_config or {},
             **agent_model.additional_params or {}
         )
 
-    async def create_task(self, task_model: TaskModel, agent: Agent, db: Session) -> Task:
+    async def create_task(self, task_model: TaskModel, agent: Agent, resolved: ResolvedSteps, variables: Optional[Dict[str, str]] = None) -> Task:
         """Create a CrewAI Task from our TaskModel."""
-        # For now, create tasks without tools to avoid the KeyError
-        # TODO: Implement proper tool instantiation for CrewAI tools
-        tools = []
-        
         # Log tool information for debugging
         if task_model.tools:
             print(f"🔧 DEBUG: Task {task_model.name} has {len(task_model.tools)} tools configured")
-            for tool_id in task_model.tools:
-                tool = db.query(ToolModel).filter(ToolModel.id == tool_id).first()
-                if tool:
-                    print(f"   🔧 Tool: {tool.name} (Type: {tool.tool_type})")
-                    # TODO: Instantiate actual CrewAI/LangChain tool objects here
-                    # For now, we'll skip adding tools to avoid the KeyError
+            for tool in resolved.tools_of(task_model.tools):
+                print(f"   🔧 Tool: {tool.name} (Type: {tool.tool_type})")
+                # TODO: Instantiate actual CrewAI/LangChain tool objects here
+                # For now, we'll skip adding tools to avoid the KeyError
 
-        # Fix context field - CrewAI expects a list of tasks, not a dict
-        context_tasks = []
         if task_model.context and isinstance(task_model.context, dict):
             # If context is a dict, we'll skip it for now as it's not the expected format
             print(f"🔍 DEBUG: Skipping context dict: {task_model.context}")
-        elif task_model.context and isinstance(task_model.context, list):
+        
+        return Task(agent=agent, **self._task_kwargs(task_model, variables))
+
+    def _task_kwargs(self, task_model: TaskModel, variables: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Keyword arguments for a CrewAI Task, excluding its agent."""
+        # Fix context field - CrewAI expects a list of tasks, not a dict
+        context_tasks = []
+        if task_model.context and isinstance(task_model.context, list):
             context_tasks = task_model.context
         
-        return Task(
-            description=task_model.description,
-            expected_output=task_model.expected_output,
-            agent=agent,
-            tools=tools,  # Empty list for now to avoid KeyError
+        return dict(
+            description=self._substitute_variables(task_model.description, variables),
+            expected_output=self._substitute_variables(task_model.expected_output, variables),
+            # For now, create tasks without tools to avoid the KeyError
+            # TODO: Implement proper tool instantiation for CrewAI tools
+            tools=[],
             context=context_tasks,
             **task_model.additional_params or {}
         )
 
     def create_output_callback(self, execution_id: int):
         """Create a callback for capturing CrewAI output."""
-        queue = asyncio.Queue()
-        self.execution_queues[execution_id] = queue
+        queue = self.executions[execution_id].queue
 
         def callback(output: str):
             """Synchronous callback for CrewAI output."""
@@ -95,30 +133,48 @@ class CrewAIService:
 
         return callback
 
-    async def execute_process(self, process: ProcessModel, execution_id: int, variables: Optional[Dict[str, str]] = None, db: Session = None) -> AsyncGenerator[str, None]:
-        """Execute a process using CrewAI and stream the output."""
+    async def execute_process(self, process: ProcessModel, execution_id: int, variables: Optional[Dict[str, str]] = None, priority: int = 0) -> AsyncGenerator[str, None]:
+        """Execute a process using CrewAI and stream the output.
+
+        The execution waits in the shared pool's queue (status ``queued``)
+        until a slot is free; higher ``priority`` values are admitted first.
+        ``process`` must have its columns loaded; the database is only used
+        through short ``unit_of_work`` sessions, never for the whole run.
+        """
         import time
         start_time = time.time()
+        crew_started = False
+        handle = ExecutionHandle(execution_id=execution_id, queue=asyncio.Queue())
+        self.executions[execution_id] = handle
         
         try:
             print(f"🤖 DEBUG CrewAI: Starting execution for process {process.name} (ID: {process.id})")
             print(f"🤖 DEBUG CrewAI: Execution ID: {execution_id}")
             print(f"🤖 DEBUG CrewAI: Variables: {variables}")
             
-            # Create database session if not provided
-            if db is None:
-                print(f"🤖 DEBUG CrewAI: Creating new database session")
+            # Wait for a free slot in the shared execution pool
+            admission = self.pool.reserve(execution_id, priority)
+            if not admission.done():
+                position = self.pool.queue_position(execution_id)
+                print(f"⏳ DEBUG CrewAI: Execution {execution_id} queued at position {position}")
+                await self._set_execution_status(execution_id, "queued")
+                yield f"⏳ Execution queued at position {position}, waiting for a free slot...\n"
                 try:
-                    db = SessionLocal()
-                    should_close_db = True
-                    print(f"✅ DEBUG CrewAI: Database session created successfully")
-                except Exception as db_error:
-                    print(f"❌ DEBUG CrewAI: Database session creation failed: {db_error}")
-                    yield f"❌ Database session creation failed: {str(db_error)}\n"
+                    waited = await admission
+                except asyncio.CancelledError:
+                    if not admission.cancelled():
+                        raise
+                    # Dropped from the queue by cancel_execution()
+                    yield f"🛑 Execution stopped while queued\n"
                     return
-            else:
-                should_close_db = False
-                print(f"✅ DEBUG CrewAI: Using provided database session")
+                await self._set_execution_status(execution_id, "running")
+                yield f"▶️  Execution slot acquired after {waited:.2f} seconds\n"
+                start_time = time.time()
+            
+            if settings.CREW_EXECUTION_TIMEOUT_SECONDS > 0:
+                handle.timers.append(asyncio.get_running_loop().call_later(
+                    settings.CREW_EXECUTION_TIMEOUT_SECONDS, self.cancel_execution, execution_id, "timeout"
+                ))
             
             yield f"🚀 Initializing CrewAI execution for process: {process.name}\n"
             yield f"📋 Variables provided: {len(variables) if variables else 0}\n"
@@ -128,18 +184,36 @@ class CrewAIService:
             
             yield f"⏰ Execution started at {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
             
-            # Create output callback
-            callback = self.create_output_callback(execution_id)
+            # The process backend builds the crew in its worker from crew_spec;
+            # CrewAI objects are only created here for the thread backend
+            build_in_process = self.pool.backend != "process"
             
             # Create agents and tasks based on process configuration
             agents = {}
             tasks = []
+            # Picklable description of the same crew for the process backend
+            crew_spec = {"process_type": process.process_type, "agents": {}, "tasks": []}
             
-            steps = process.configuration.get("steps", [])
+            # Every agent, task and tool the steps refer to, compiled once per process version
+            async with unit_of_work() as db:
+                plan, plan_cached = await db.run_sync(plan_cache.get, process)
+            resolved = plan.resolved
+            steps = resolved.steps
             print(f"🤖 DEBUG CrewAI: Found {len(steps)} steps in process configuration")
+            print(f"✅ DEBUG CrewAI: {'Reusing cached' if plan_cached else 'Compiled'} plan with {len(resolved.agents)} agents, {len(resolved.tasks)} tasks and {len(resolved.tools)} tools")
             yield f"📝 Processing {len(steps)} steps...\n"
+            missing_tools = resolved.missing()["tools"]
+            if missing_tools:
+                # Missing agents and tasks fail their step below; missing tools are just left out
+                yield f"⚠️  Tools not found: {', '.join(map(str, missing_tools))}\n"
+            missing_variables = plan.variable_names.difference(variables or {})
+            if missing_variables:
+                yield f"⚠️  No value provided for variables: {', '.join(sorted(missing_variables))}\n"
             
             for i, step in enumerate(steps):
+                if handle.cancel_reason is not None:
+                    yield self._stopped_message(handle)
+                    return
                 step_start_time = time.time()
                 print(f"🤖 DEBUG CrewAI: Processing step {i+1}: {step}")
                 yield f"🔄 Step {i+1}/{len(steps)}: Processing agent and task...\n"
@@ -152,7 +226,7 @@ class CrewAIService:
                     continue
                     
                 yield f"   🔍 Looking up agent ID: {agent_id}\n"
-                agent_model = db.query(AgentModel).filter(AgentModel.id == agent_id).first()
+                agent_model = resolved.agents.get(agent_id)
                 if agent_model:
                     print(f"✅ DEBUG CrewAI: Found agent: {agent_model.name}")
                     yield f"   🤖 Found agent: {agent_model.name} (Role: {agent_model.role})\n"
@@ -163,17 +237,16 @@ class CrewAIService:
                         # Show tool information
                         if agent_model.tools:
                             yield f"   🔧 Agent has {len(agent_model.tools)} tools configured\n"
-                            tool_names = []
-                            for tool_id in agent_model.tools:
-                                tool = db.query(ToolModel).filter(ToolModel.id == tool_id).first()
-                                if tool:
-                                    tool_names.append(f"{tool.name} ({tool.tool_type})")
+                            tool_names = [f"{tool.name} ({tool.tool_type})" for tool in resolved.tools_of(agent_model.tools)]
                             if tool_names:
                                 yield f"      Tools: {', '.join(tool_names)}\n"
                         else:
                             yield f"   🔧 No tools configured for this agent\n"
                         
-                        agents[agent_model.id] = await self.create_agent(agent_model, db)
+                        agents[agent_model.id] = (
+                            await self.create_agent(agent_model, resolved, variables) if build_in_process else None
+                        )
+                        crew_spec["agents"][agent_model.id] = self._agent_kwargs(agent_model, variables)
                         print(f"✅ DEBUG CrewAI: Created CrewAI agent for {agent_model.name}")
                         yield f"   ✅ Created CrewAI agent: {agent_model.name}\n"
                         yield f"   ⚠️  Note: Tools are not yet instantiated (UI shows associations only)\n"
@@ -188,7 +261,7 @@ class CrewAIService:
                         continue
                     
                     yield f"   🔍 Looking up task ID: {task_id}\n"
-                    task_model = db.query(TaskModel).filter(TaskModel.id == task_id).first()
+                    task_model = resolved.tasks.get(task_id)
                     if task_model:
                         print(f"✅ DEBUG CrewAI: Found task: {task_model.name}")
                         yield f"   📋 Found task: {task_model.name}\n"
@@ -198,48 +271,32 @@ class CrewAIService:
                         if variables:
                             print(f"🔄 DEBUG CrewAI: Applying variable substitution")
                             yield f"   🔄 Applying variable substitution to task and agent...\n"
-                            substituted_count = 0
-                            original_task_desc = task_model.description
-                            original_task_output = task_model.expected_output
-                            original_agent_role = agent_model.role
-                            original_agent_goal = agent_model.goal
-                            original_agent_backstory = agent_model.backstory
-                            
-                            task_model.description = self._substitute_variables(task_model.description, variables)
-                            task_model.expected_output = self._substitute_variables(task_model.expected_output, variables)
-                            agent_model.role = self._substitute_variables(agent_model.role, variables)
-                            agent_model.goal = self._substitute_variables(agent_model.goal, variables)
-                            agent_model.backstory = self._substitute_variables(agent_model.backstory, variables)
-                            
-                            if original_task_desc != task_model.description:
-                                substituted_count += 1
-                            if original_task_output != task_model.expected_output:
-                                substituted_count += 1
-                            if original_agent_role != agent_model.role:
-                                substituted_count += 1
-                            if original_agent_goal != agent_model.goal:
-                                substituted_count += 1
-                            if original_agent_backstory != agent_model.backstory:
-                                substituted_count += 1
+                            substituted_count = sum(
+                                self._substitute_variables(text, variables) != text
+                                for text in (
+                                    task_model.description, task_model.expected_output,
+                                    agent_model.role, agent_model.goal, agent_model.backstory
+                                )
+                            )
                             
                             yield f"   ✅ Applied {substituted_count} variable substitutions\n"
                         
                         # Show task tool information
                         if task_model.tools:
                             yield f"   🔧 Task has {len(task_model.tools)} tools configured\n"
-                            task_tool_names = []
-                            for tool_id in task_model.tools:
-                                tool = db.query(ToolModel).filter(ToolModel.id == tool_id).first()
-                                if tool:
-                                    task_tool_names.append(f"{tool.name} ({tool.tool_type})")
+                            task_tool_names = [f"{tool.name} ({tool.tool_type})" for tool in resolved.tools_of(task_model.tools)]
                             if task_tool_names:
                                 yield f"      Tools: {', '.join(task_tool_names)}\n"
                         else:
                             yield f"   🔧 No tools configured for this task\n"
                         
                         yield f"   🔨 Creating CrewAI task instance...\n"
-                        task = await self.create_task(task_model, agents[agent_model.id], db)
+                        task = (
+                            await self.create_task(task_model, agents[agent_model.id], resolved, variables)
+                            if build_in_process else None
+                        )
                         tasks.append(task)
+                        crew_spec["tasks"].append({"agent_id": agent_model.id, "kwargs": self._task_kwargs(task_model, variables)})
                         print(f"✅ DEBUG CrewAI: Created CrewAI task for {task_model.name}")
                         
                         step_duration = time.time() - step_start_time
@@ -270,29 +327,42 @@ class CrewAIService:
             yield f"   🤖 Agent Count: {len(agents)}\n"
             yield f"   📋 Task Count: {len(tasks)}\n"
             
-            crew_creation_start = time.time()
-            crew = Crew(
-                agents=list(agents.values()),
-                tasks=tasks,
-                process=Process.sequential if process.process_type == "sequential" else Process.hierarchical,
-                verbose=True,
-                output_callback=callback
-            )
-            crew_creation_duration = time.time() - crew_creation_start
+            if handle.cancel_reason is not None:
+                yield self._stopped_message(handle)
+                return
             
-            print(f"✅ DEBUG CrewAI: Crew created successfully")
-            yield f"✅ Crew created successfully (took {crew_creation_duration:.2f}s)\n"
+            crew_creation_start = time.time()
+            handle.cancel_event = self.pool.new_cancel_event()
+            crew = None
+            if build_in_process:
+                check_cancelled = cancellation_callback(handle.cancel_event)
+                crew = Crew(
+                    agents=list(agents.values()),
+                    tasks=tasks,
+                    process=Process.sequential if process.process_type == "sequential" else Process.hierarchical,
+                    verbose=True,
+                    output_callback=self.create_output_callback(execution_id),
+                    step_callback=check_cancelled,
+                    task_callback=check_cancelled
+                )
+                crew_creation_duration = time.time() - crew_creation_start
+                
+                print(f"✅ DEBUG CrewAI: Crew created successfully")
+                yield f"✅ Crew created successfully (took {crew_creation_duration:.2f}s)\n"
+            else:
+                yield f"✅ Crew spec ready, the worker process builds the crew\n"
             yield f"🚀 Starting crew execution...\n"
             yield f"🔍 This process will run {len(tasks)} tasks using {len(agents)} agents\n"
 
             # Start crew execution in a background task
             print(f"🤖 DEBUG CrewAI: Starting crew execution in background task")
             execution_start_time = time.time()
-            asyncio.create_task(self._run_crew(crew, execution_id))
+            handle.task = asyncio.create_task(self._run_crew(crew, execution_id, crew_spec))
+            crew_started = True
 
             # Stream output from the queue
             print(f"🤖 DEBUG CrewAI: Starting to stream output from queue")
-            queue = self.execution_queues[execution_id]
+            queue = handle.queue
             chunk_count = 0
             while True:
                 try:
@@ -300,6 +370,10 @@ class CrewAIService:
                     chunk_count += 1
                     print(f"🤖 DEBUG CrewAI: Received output chunk {chunk_count} from queue: {output[:100]}...")
                     
+                    if output == EXECUTION_CANCELLED:
+                        print(f"🛑 DEBUG CrewAI: Execution {execution_id} stopped ({handle.cancel_reason})")
+                        yield self._stopped_message(handle)
+                        break
                     if output == "EXECUTION_COMPLETE":
                         execution_duration = time.time() - execution_start_time
                         total_duration = time.time() - start_time
@@ -324,98 +398,153 @@ class CrewAIService:
             yield error_msg
             yield f"❌ Traceback: {traceback_details}\n"
         finally:
-            if execution_id in self.execution_queues:
-                print(f"🧹 DEBUG CrewAI: Cleaning up execution queue for {execution_id}")
-                del self.execution_queues[execution_id]
-            if should_close_db:
-                print(f"🧹 DEBUG CrewAI: Closing database session")
-                db.close()
-
-    async def _run_crew(self, crew: Crew, execution_id: int):
-        """Run the crew in a separate task and handle completion."""
+            if not crew_started:
+                # Otherwise _run_crew frees the slot and the handle once kickoff returns
+                print(f"🧹 DEBUG CrewAI: Cleaning up execution handle for {execution_id}")
+                self.pool.release(execution_id)
+                self._drop_handle(handle)
+
+    async def _run_crew(self, crew: Optional[Crew], execution_id: int, crew_spec: Optional[Dict[str, Any]] = None):
+        """Run the crew in a separate task and handle completion.
+
+        With the "process" backend the crew is built from ``crew_spec`` in a
+        worker process, and ``crew`` is None.
+        """
+        handle = self.executions[execution_id]
+        queue = handle.queue
         try:
             print(f"🤖 DEBUG _run_crew: Starting crew kickoff for execution {execution_id}")
-            await self.execution_queues[execution_id].put("🚀 Crew kickoff started...\n")
-            await self.execution_queues[execution_id].put("📡 Beginning agent task execution...\n")
+            await queue.put("🚀 Crew kickoff started...\n")
+            await queue.put("📡 Beginning agent task execution...\n")
             
-            # Run crew.kickoff() in a thread to avoid blocking, with output capture
-            import asyncio
-            import concurrent.futures
-            import sys
-            import io
-            from contextlib import redirect_stdout, redirect_stderr
+            # Run crew.kickoff() on the shared pool, streaming its output
+            loop = asyncio.get_running_loop()
+            stdout_sink = LineStreamSink(loop, queue, prefix="🤖 ")
+            stderr_sink = LineStreamSink(loop, queue, prefix="⚠️  ")
+            handle.sinks = [stdout_sink, stderr_sink]
             
             def run_crew_with_capture():
-                """Run crew and capture stdout/stderr"""
-                # Create string buffers to capture output
-                stdout_buffer = io.StringIO()
-                stderr_buffer = io.StringIO()
-                
+                """Run crew with this thread's stdout/stderr streamed into the queue"""
                 try:
-                    # Redirect stdout and stderr to capture CrewAI's output
-                    with redirect_stdout(stdout_buffer), redirect_stderr(stderr_buffer):
-                        result = crew.kickoff()
-                    
-                    # Get captured output
-                    stdout_output = stdout_buffer.getvalue()
-                    stderr_output = stderr_buffer.getvalue()
-                    
-                    return result, stdout_output, stderr_output
-                except Exception as e:
-                    # Return the exception along with any captured output
-                    stdout_output = stdout_buffer.getvalue()
-                    stderr_output = stderr_buffer.getvalue()
-                    return None, stdout_output, stderr_output, str(e)
+                    # This pooled thread can't be interrupted once it runs other work
+                    with handle.interrupt.running():
+                        if handle.cancel_event.is_set():
+                            # Stopped while waiting for a free worker thread
+                            raise ExecutionCancelled("Execution was stopped")
+                        with capture_output(stdout=stdout_sink, stderr=stderr_sink):
+                            return crew.kickoff()
+                finally:
+                    # Forward any trailing partial line
+                    stdout_sink.close()
+                    stderr_sink.close()
             
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                # Run the crew with output capture in a thread
-                await self.execution_queues[execution_id].put("⚡ Starting CrewAI task execution...\n")
-                crew_result = await loop.run_in_executor(executor, run_crew_with_capture)
-                
-                if len(crew_result) == 4:  # Error case
-                    result, stdout_output, stderr_output, error = crew_result
-                    raise Exception(error)
+            def relay_output(line: str):
+                if handle.cancel_reason is None:
+                    queue.put_nowait(line)
+            
+            await queue.put("⚡ Starting CrewAI task execution...\n")
+            await queue.put("\n📺 === CREW EXECUTION LOG ===\n")
+            try:
+                if self.pool.backend == "process" and crew_spec is not None:
+                    result = await self.pool.run_in_process(
+                        kickoff_crew_spec, crew_spec, handle.cancel_event, on_output=relay_output
+                    )
                 else:
-                    result, stdout_output, stderr_output = crew_result
+                    result = await self.pool.run(run_crew_with_capture)
+            finally:
+                await queue.put("📺 === END LOG ===\n\n")
             
             print(f"✅ DEBUG _run_crew: Crew execution completed with result type: {type(result)}")
             print(f"✅ DEBUG _run_crew: Result content: {str(result)[:500]}...")
-            print(f"✅ DEBUG _run_crew: Captured stdout: {stdout_output[:200]}...")
-            print(f"✅ DEBUG _run_crew: Captured stderr: {stderr_output[:200]}...")
-            
-            # Send captured stdout (CrewAI verbose output)
-            if stdout_output.strip():
-                await self.execution_queues[execution_id].put(f"\n📺 === CREW EXECUTION LOG ===\n")
-                # Split output into lines and send each line
-                for line in stdout_output.strip().split('\n'):
-                    if line.strip():
-                        await self.execution_queues[execution_id].put(f"🤖 {line}\n")
-                await self.execution_queues[execution_id].put(f"📺 === END LOG ===\n\n")
-            
-            # Send any error output
-            if stderr_output.strip():
-                await self.execution_queues[execution_id].put(f"\n⚠️  === STDERR OUTPUT ===\n")
-                for line in stderr_output.strip().split('\n'):
-                    if line.strip():
-                        await self.execution_queues[execution_id].put(f"⚠️  {line}\n")
-                await self.execution_queues[execution_id].put(f"⚠️  === END STDERR ===\n\n")
             
             # Format and send the final result
             result_str = str(result) if result else "No result returned"
-            await self.execution_queues[execution_id].put(f"\n🎯 === CREW EXECUTION RESULT ===\n")
-            await self.execution_queues[execution_id].put(f"{result_str}\n")
-            await self.execution_queues[execution_id].put(f"🎯 === END RESULT ===\n\n")
-            await self.execution_queues[execution_id].put("EXECUTION_COMPLETE")
+            await queue.put(f"\n🎯 === CREW EXECUTION RESULT ===\n")
+            await queue.put(f"{result_str}\n")
+            await queue.put(f"🎯 === END RESULT ===\n\n")
+            await queue.put("EXECUTION_COMPLETE")
         except Exception as e:
+            if handle.cancel_reason is not None:
+                # Nobody reads the queue anymore; the stream already reported the stop
+                print(f"🛑 DEBUG _run_crew: Execution {execution_id} wound down after stop ({type(e).__name__})")
+                return
             import traceback
             error_msg = f"❌ Error in crew execution: {str(e)}"
             traceback_details = traceback.format_exc()
             print(f"❌ DEBUG _run_crew: {error_msg}")
             print(f"❌ DEBUG _run_crew Traceback: {traceback_details}")
-            await self.execution_queues[execution_id].put(f"{error_msg}\n")
-            await self.execution_queues[execution_id].put(f"❌ Traceback: {traceback_details}\n")
-            await self.execution_queues[execution_id].put("EXECUTION_COMPLETE")
+            await queue.put(f"{error_msg}\n")
+            await queue.put(f"❌ Traceback: {traceback_details}\n")
+            await queue.put("EXECUTION_COMPLETE")
+        finally:
+            self.pool.release(execution_id)
+            self._drop_handle(handle)
+
+    def cancel_execution(self, execution_id: int, reason: str = "user") -> bool:
+        """Stop a queued or running execution.
+
+        A queued execution leaves the pool's queue. A running one stops
+        streaming right away and gives its slot to the next execution; its
+        crew is told to stop after the current agent step or task. Returns
+        False if the execution isn't queued or running in this process.
+        """
+        handle = self.executions.get(execution_id)
+        if handle is None:
+            return False
+        if handle.cancel_reason is not None:
+            return True
+        print(f"🛑 DEBUG CrewAI: Stopping execution {execution_id} ({reason})")
+        handle.cancel_reason = reason
+        self.cancelled[execution_id] = reason
+        if self.pool.queue_position(execution_id) is not None:
+            # Resolves the queued stream's admission as cancelled
+            self.pool.release(execution_id)
+            return True
+
+        if handle.cancel_event is not None:
+            handle.cancel_event.set()
+        for sink in handle.sinks:
+            sink.detach()
+        handle.queue.put_nowait(EXECUTION_CANCELLED)
+        if handle.task is not None:
+            # The kickoff keeps its worker until it returns, but not its slot
+            self.pool.abandon(execution_id)
+            if self.pool.backend == "thread" and settings.CREW_CANCEL_GRACE_SECONDS > 0:
+                handle.timers.append(asyncio.get_running_loop().call_later(
+                    settings.CREW_CANCEL_GRACE_SECONDS, self._interrupt_kickoff, handle
+                ))
+        return True
+
+    def was_cancelled(self, execution_id: int) -> Optional[str]:
+        """Why the execution was stopped ('user' or 'timeout'), if it was; clears the flag."""
+        return self.cancelled.pop(execution_id, None)
+
+    def _stopped_message(self, handle: ExecutionHandle) -> str:
+        if handle.cancel_reason == "timeout":
+            return f"⏱️  Execution timed out after {settings.CREW_EXECUTION_TIMEOUT_SECONDS} seconds\n"
+        return f"🛑 Execution stopped by user\n"
+
+    def _interrupt_kickoff(self, handle: ExecutionHandle) -> None:
+        """Raise ExecutionCancelled in a kickoff thread that ignored the stop request.
+
+        Takes effect once the thread runs Python code again, so a crew blocked
+        in a long network call is interrupted when that call returns.
+        """
+        if handle.interrupt.interrupt(ExecutionCancelled):
+            print(f"🛑 DEBUG CrewAI: Execution {handle.execution_id} ignored the stop request, interrupted its thread")
+
+    def _drop_handle(self, handle: ExecutionHandle) -> None:
+        for timer in handle.timers:
+            timer.cancel()
+        if self.executions.get(handle.execution_id) is handle:
+            del self.executions[handle.execution_id]
+
+    async def _set_execution_status(self, execution_id: int, status: str):
+        """Persist a status change made by the service (e.g. queued -> running)."""
+        async with unit_of_work() as db:
+            execution = await db.get(ExecutionModel, execution_id)
+            if execution:
+                execution.status = status
 
     def _substitute_variables(self, text: str, variables: Dict[str, str]) -> str:
         """Replace {{variable}} placeholders with their values."""
@@ -1,18 +1,126 @@
-from sqlalchemy import create_engine
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
+# Async drivers for the databases DATABASE_URL may point at
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL with its driver swapped for the dialect's async one."""
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver for {url.get_backend_name()} databases")
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+ENGINE_PROFILES = ("production", "default")
+
+def engine_options(url: str, profile: str) -> Dict[str, Any]:
+    """create_engine/create_async_engine arguments for an engine profile.
+
+    "production" sizes and recycles the pool of server databases, and lets
+    SQLite connections be shared across threads and wait for locks; the
+    SQLite pragmas come from ``apply_sqlite_pragmas``. "default" leaves the
+    driver defaults.
+    """
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown database engine profile: {profile}")
+    options: Dict[str, Any] = {"pool_pre_ping": True, "echo": settings.DATABASE_ECHO}
+    if profile == "default":
+        return options
+    if make_url(url).get_backend_name() == "sqlite":
+        options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+    else:
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    return options
+
+def apply_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    """Connect hook tuning each new SQLite connection for concurrent writers."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.close()
+
+def create_database_engine(url: str, profile: Optional[str] = None, asynchronous: bool = False) -> Any:
+    """Engine for ``url`` set up according to ``profile`` (DATABASE_ENGINE_PROFILE
+    by default); an AsyncEngine if ``asynchronous``."""
+    profile = profile or settings.DATABASE_ENGINE_PROFILE
+    if asynchronous:
+        database_engine = create_async_engine(async_database_url(url), **engine_options(url, profile))
+        sync_engine = database_engine.sync_engine
+    else:
+        database_engine = sync_engine = create_engine(url, **engine_options(url, profile))
+    if profile == "production" and sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", apply_sqlite_pragmas)
+    return database_engine
+
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=settings.DEBUG
-)
+engine = create_database_engine(settings.DATABASE_URL)
+
+# Same database through an async driver, for code running on the event loop
+async_engine = create_database_engine(settings.DATABASE_URL, asynchronous=True)
+
+class PoolOccupancy:
+    """Connections an engine's pool has handed out, now and at the peak."""
+
+    def __init__(self, engine: Any):
+        self.engine = engine
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.checkouts_total = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def _on_checkout(self, *args: Any) -> None:
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts_total += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, *args: Any) -> None:
+        with self._lock:
+            self.checked_out -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        pool = self.engine.pool
+        return {
+            "pool": type(pool).__name__,
+            # NullPool (aiosqlite) opens a connection per checkout and has no size
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "checked_out": self.checked_out,
+            "peak_checked_out": self.peak_checked_out,
+            "checkouts_total": self.checkouts_total,
+        }
+
+pool_occupancy = {"sync": PoolOccupancy(engine), "async": PoolOccupancy(async_engine.sync_engine)}
+
+def database_pool_metrics() -> Dict[str, Any]:
+    return {name: occupancy.snapshot() for name, occupancy in pool_occupancy.items()}
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Attributes can't lazy-load on the event loop, so keep them loaded across commits
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Create base class for models
 Base = declarative_base()
 
@@ -22,4 +130,21 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# Dependency to get an async database session, for `async def` endpoints
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncIterator[AsyncSession]:
+    """Session for one batch of work, committed on exit.
+
+    Long-running work (like an execution) opens one per write instead of
+    holding a session, so its pooled connection is only taken while the
+    batch runs.
+    """
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            yield db
@@ -0,0 +1,76 @@
+"""
+Stopping executions wherever they run.
+
+An execution running in this API process is stopped through the CrewAI
+service, and its own stream records the stop. With a distributed broadcast
+backend the stop request is also published to the other API workers, one of
+which may be running it. One dispatched to Celery is revoked, which terminates
+the worker process running it, so the stop is recorded and announced to
+viewers from here instead.
+"""
+import asyncio
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.crewai_service import crewai_service
+from app.core.database import AsyncSessionLocal
+from app.core.execution_events import get_broadcast, publish_execution_event
+from app.core.execution_logs import append_log
+from app.models.execution import Execution
+
+STOPPABLE_STATUSES = {"running", "pending", "queued"}
+
+
+async def stop_execution(db: AsyncSession, execution: Execution) -> None:
+    """Stop a queued or running execution and mark it stopped."""
+    record_stop = False
+    if crewai_service.cancel_execution(execution.id):
+        pass
+    elif settings.EXECUTION_DISPATCH == "celery":
+        from app.celery import revoke_execution
+
+        await asyncio.to_thread(revoke_execution, execution.id)
+        await publish_execution_event(execution.id, {
+            "type": "execution_stopped",
+            "execution_id": execution.id,
+            "message": "Execution stopped by user"
+        })
+        record_stop = True
+    elif get_broadcast().distributed:
+        # Whichever API worker runs it records the stop in its stream
+        await get_broadcast().publish_control({"type": "stop_execution", "execution_id": execution.id})
+    else:
+        # Nothing runs it anymore (e.g. the server restarted mid-execution)
+        record_stop = True
+
+    execution.status = "stopped"
+    execution.completed_at = datetime.utcnow()
+    await db.commit()
+    if record_stop:
+        await db.run_sync(append_log, execution.id, "\nExecution stopped by user.\n")
+
+
+async def stop_execution_by_id(execution_id: int) -> bool:
+    """Like ``stop_execution`` with its own session; False if there is nothing to stop."""
+    async with AsyncSessionLocal() as db:
+        execution = await db.get(Execution, execution_id)
+        if execution is None or execution.status not in STOPPABLE_STATUSES:
+            return False
+        await stop_execution(db, execution)
+        return True
+
+
+async def handle_stop_requests() -> None:
+    """Stop this worker's executions when other API workers publish a stop request."""
+    while True:
+        try:
+            async for message in get_broadcast().control_messages():
+                if message.get("type") == "stop_execution":
+                    crewai_service.cancel_execution(message["execution_id"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Listening for stop requests failed, retrying: {str(e)}")
+            await asyncio.sleep(5)
@@ -0,0 +1,288 @@
+"""
+Broadcast of execution stream messages between workers.
+
+Every WebSocket message of an execution is published to a broadcast backend.
+Each API worker with viewers for an execution subscribes to it and relays its
+messages to the local connections, so a viewer can connect to any worker no
+matter which API worker (or Celery worker) runs the crew.
+
+Backends (EXECUTION_BROADCAST_BACKEND):
+
+- "memory": in-process; enough for a single API worker without Celery.
+- "redis": one Redis Stream per execution on REDIS_URL. The stream keeps the
+  last WS_REPLAY_BUFFER_SIZE messages, so a worker that starts relaying late
+  still gets the backlog. Control requests (stopping an execution running on
+  another worker) go over Redis pub/sub.
+
+The backlog is also the replay buffer for reconnecting viewers. Both backends
+drop messages older than WS_REPLAY_RETENTION_SECONDS, so the backlog of an
+execution that never finishes (a crashed worker) goes away too, and drop a
+finished execution's backlog that long after its last message.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+CHANNEL_PREFIX = "crewui:execution:"
+CONTROL_CHANNEL = "crewui:control"
+
+# Message types after which an execution produces no more output
+TERMINAL_MESSAGE_TYPES = {"execution_completed", "execution_error", "execution_stopped"}
+
+BROADCAST_BACKENDS = ("memory", "redis")
+
+_redis: Optional[redis.Redis] = None
+_broadcast = None
+
+
+def channel_name(execution_id: int) -> str:
+    return f"{CHANNEL_PREFIX}{execution_id}"
+
+
+def get_redis() -> redis.Redis:
+    """Shared Redis client for the current process."""
+    global _redis
+    if _redis is None:
+        _redis = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+def is_terminal(message: Dict[str, Any]) -> bool:
+    return message.get("type") in TERMINAL_MESSAGE_TYPES
+
+
+class InMemorySubscription:
+    """One subscriber's view of an execution on the in-memory backend."""
+
+    def __init__(self, broadcast: "InMemoryBroadcast", execution_id: int):
+        self.broadcast = broadcast
+        self.execution_id = execution_id
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.finished = False
+
+    async def backlog(self) -> List[Dict[str, Any]]:
+        """Messages published so far; live ones follow when iterating."""
+        messages = self.broadcast._recent(self.execution_id)
+        # Registered in the same step, so no message falls between backlog and live
+        self.broadcast.subscribers.setdefault(self.execution_id, set()).add(self.queue)
+        self.finished = bool(messages) and is_terminal(messages[-1])
+        return messages
+
+    async def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        while not self.finished:
+            message = await self.queue.get()
+            self.finished = is_terminal(message)
+            yield message
+
+    async def close(self) -> None:
+        subscribers = self.broadcast.subscribers.get(self.execution_id)
+        if subscribers is not None:
+            subscribers.discard(self.queue)
+            if not subscribers:
+                del self.broadcast.subscribers[self.execution_id]
+
+
+class InMemoryBroadcast:
+    """Broadcast within this process only."""
+
+    distributed = False
+
+    def __init__(self, backlog_size: int, retention_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.backlog_size = backlog_size
+        self.retention_seconds = retention_seconds
+        self.clock = clock
+        # Map execution_id -> (publish time, message) pairs, oldest first
+        self.backlogs: Dict[int, Deque[Tuple[float, Dict[str, Any]]]] = {}
+        self.subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self.control_listeners: Set[asyncio.Queue] = set()
+        self._next_sweep = clock() + retention_seconds
+
+    async def publish(self, execution_id: int, message: Dict[str, Any]) -> None:
+        now = self.clock()
+        if now >= self._next_sweep:
+            # Backlogs nobody publishes to or reads anymore are only found this way
+            for backlog_id in list(self.backlogs):
+                self._prune(backlog_id, now)
+            self._next_sweep = now + self.retention_seconds
+        backlog = self.backlogs.get(execution_id)
+        if backlog is None:
+            backlog = self.backlogs[execution_id] = deque(maxlen=self.backlog_size)
+        backlog.append((now, message))
+        if is_terminal(message):
+            asyncio.get_running_loop().call_later(self.retention_seconds, self.backlogs.pop, execution_id, None)
+        for queue in self.subscribers.get(execution_id, ()):
+            queue.put_nowait(message)
+
+    async def recent_messages(self, execution_id: int) -> List[Dict[str, Any]]:
+        """The execution's messages still within the backlog, oldest first."""
+        return self._recent(execution_id)
+
+    def subscribe(self, execution_id: int) -> InMemorySubscription:
+        return InMemorySubscription(self, execution_id)
+
+    def _recent(self, execution_id: int) -> List[Dict[str, Any]]:
+        self._prune(execution_id, self.clock())
+        return [message for _, message in self.backlogs.get(execution_id, ())]
+
+    def _prune(self, execution_id: int, now: float) -> None:
+        """Drop messages published more than retention_seconds ago."""
+        backlog = self.backlogs.get(execution_id)
+        if backlog is None:
+            return
+        while backlog and backlog[0][0] <= now - self.retention_seconds:
+            backlog.popleft()
+        if not backlog:
+            del self.backlogs[execution_id]
+
+    async def publish_control(self, message: Dict[str, Any]) -> None:
+        for queue in self.control_listeners:
+            queue.put_nowait(message)
+
+    async def control_messages(self) -> AsyncIterator[Dict[str, Any]]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self.control_listeners.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.control_listeners.discard(queue)
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisSubscription:
+    """One subscriber's view of an execution's Redis Stream."""
+
+    def __init__(self, broadcast: "RedisBroadcast", execution_id: int):
+        self.broadcast = broadcast
+        self.key = channel_name(execution_id)
+        self.last_id = "0-0"
+        self.finished = False
+
+    async def backlog(self) -> List[Dict[str, Any]]:
+        """Messages still in the stream; iterating continues after the last of them."""
+        entries = await self.broadcast.client.xrange(self.key)
+        messages = [json.loads(fields["message"]) for _, fields in entries]
+        if entries:
+            self.last_id = entries[-1][0]
+        self.finished = bool(messages) and is_terminal(messages[-1])
+        return messages
+
+    async def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        while not self.finished:
+            response = await self.broadcast.client.xread(
+                {self.key: self.last_id}, count=100, block=self.broadcast.block_ms
+            )
+            for _, entries in response or ():
+                for entry_id, fields in entries:
+                    self.last_id = entry_id
+                    message = json.loads(fields["message"])
+                    self.finished = is_terminal(message)
+                    yield message
+                    if self.finished:
+                        return
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisBroadcast:
+    """Broadcast across processes and hosts through Redis.
+
+    ``client`` must be a ``redis.asyncio`` client created with
+    ``decode_responses=True`` (or a stand-in offering the same commands).
+    """
+
+    distributed = True
+
+    def __init__(self, client: Any, backlog_size: int, retention_seconds: float, block_ms: int = 5000):
+        self.client = client
+        self.backlog_size = backlog_size
+        self.retention_seconds = retention_seconds
+        self.block_ms = block_ms
+
+    async def publish(self, execution_id: int, message: Dict[str, Any]) -> None:
+        key = channel_name(execution_id)
+        # Stream IDs start with the publish time in milliseconds
+        oldest_kept = int((time.time() - self.retention_seconds) * 1000)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.xadd(key, {"message": json.dumps(message)}, maxlen=self.backlog_size, approximate=True)
+            pipe.xtrim(key, minid=max(oldest_kept, 0), approximate=True)
+            # The stream outlives its last message by the retention, finished or not
+            pipe.expire(key, int(self.retention_seconds))
+            await pipe.execute()
+
+    async def recent_messages(self, execution_id: int) -> List[Dict[str, Any]]:
+        """The execution's messages still in the stream, oldest first."""
+        entries = await self.client.xrange(channel_name(execution_id))
+        return [json.loads(fields["message"]) for _, fields in entries]
+
+    def subscribe(self, execution_id: int) -> RedisSubscription:
+        return RedisSubscription(self, execution_id)
+
+    async def publish_control(self, message: Dict[str, Any]) -> None:
+        await self.client.publish(CONTROL_CHANNEL, json.dumps(message))
+
+    async def control_messages(self) -> AsyncIterator[Dict[str, Any]]:
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(CONTROL_CHANNEL)
+        try:
+            async for item in pubsub.listen():
+                if item.get("type") == "message":
+                    yield json.loads(item["data"])
+        finally:
+            await pubsub.unsubscribe(CONTROL_CHANNEL)
+            await pubsub.aclose()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def broadcast_backend_name() -> str:
+    backend = settings.EXECUTION_BROADCAST_BACKEND
+    if backend == "auto":
+        # Celery workers run in other processes, so their output has to go through Redis
+        return "redis" if settings.EXECUTION_DISPATCH == "celery" else "memory"
+    if backend not in BROADCAST_BACKENDS:
+        raise ValueError(f"Unknown broadcast backend: {backend}")
+    return backend
+
+
+def get_broadcast():
+    """Broadcast backend for the current process."""
+    global _broadcast
+    if _broadcast is None:
+        if broadcast_backend_name() == "redis":
+            _broadcast = RedisBroadcast(
+                get_redis(), settings.WS_REPLAY_BUFFER_SIZE, settings.WS_REPLAY_RETENTION_SECONDS
+            )
+        else:
+            _broadcast = InMemoryBroadcast(settings.WS_REPLAY_BUFFER_SIZE, settings.WS_REPLAY_RETENTION_SECONDS)
+    return _broadcast
+
+
+async def close_broadcast() -> None:
+    """Close the process's broadcast backend and Redis client; the next use creates new ones.
+
+    A redis.asyncio client belongs to the event loop it was first used on, so
+    code that runs each job on a new loop (Celery tasks) closes them before
+    its loop ends.
+    """
+    global _redis, _broadcast
+    broadcast, client = _broadcast, _redis
+    _broadcast = _redis = None
+    if broadcast is not None:
+        await broadcast.close()
+    if client is not None and getattr(broadcast, "client", None) is not client:
+        await client.aclose()
+
+
+async def publish_execution_event(execution_id: int, message: Dict[str, Any]) -> None:
+    await get_broadcast().publish(execution_id, message)
@@ -0,0 +1,692 @@
+"""
+Append-only storage for execution console logs.
+
+Output is stored as numbered chunks in ``execution_log_chunks`` and written
+with batched inserts, instead of rewriting ``executions.console_log`` on every
+flush. ``console_log`` itself is kept for rows written before chunked storage
+existed; the full log of an execution is that column followed by its chunks.
+
+Once an execution finishes, its log is compressed with gzip into a file under
+EXECUTION_LOG_DIR (see archive_log) and the chunks and column are cleared.
+The archive then takes the column's place as the start of the log and is
+decompressed as a stream on read.
+
+While an execution streams, an ExecutionLogWriter task batches its output and
+flushes every LOG_FLUSH_INTERVAL_MS or LOG_FLUSH_BYTES, whichever comes first,
+running the inserts in a worker thread so the event loop never waits on them.
+"""
+import asyncio
+import gzip
+import io
+import os
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.execution import Execution
+from app.models.execution_log import ExecutionLogArchive, ExecutionLogChunk
+
+
+def _log_tail(db: Session, execution_id: int) -> tuple:
+    """(next seq, next byte offset) for an execution's log."""
+    last = (
+        db.query(ExecutionLogChunk.seq, ExecutionLogChunk.byte_offset, ExecutionLogChunk.byte_size)
+        .filter(ExecutionLogChunk.execution_id == execution_id)
+        .order_by(ExecutionLogChunk.seq.desc())
+        .first()
+    )
+    if last is not None:
+        return last.seq + 1, last.byte_offset + last.byte_size
+    return 0, _prefix_size(db, execution_id)
+
+
+def _prefix_size(db: Session, execution_id: int) -> int:
+    """Size of the part of the log stored before the chunks (archive or legacy column)."""
+    archived_size = (
+        db.query(ExecutionLogArchive.original_size)
+        .filter(ExecutionLogArchive.execution_id == execution_id)
+        .scalar()
+    )
+    if archived_size is not None:
+        return archived_size
+    legacy_log = db.query(Execution.console_log).filter(Execution.id == execution_id).scalar()
+    return len(legacy_log.encode("utf-8")) if legacy_log else 0
+
+
+class ExecutionLogBuffer:
+    """Collects an execution's output and appends it to the log in batches."""
+
+    def __init__(self, execution_id: int, next_seq: int = 0, next_offset: int = 0):
+        self.execution_id = execution_id
+        self.next_seq = next_seq
+        self.next_offset = next_offset
+        self.pending: List[dict] = []
+        self.pending_bytes = 0
+
+    @classmethod
+    def resume(cls, db: Session, execution_id: int) -> "ExecutionLogBuffer":
+        """Buffer that continues after whatever is already stored for the execution."""
+        next_seq, next_offset = _log_tail(db, execution_id)
+        return cls(execution_id, next_seq, next_offset)
+
+    @property
+    def total_bytes(self) -> int:
+        return self.next_offset
+
+    def append(self, content: str) -> None:
+        size = len(content.encode("utf-8"))
+        self.pending.append({
+            "execution_id": self.execution_id,
+            "seq": self.next_seq,
+            "byte_offset": self.next_offset,
+            "byte_size": size,
+            "content": content,
+        })
+        self.next_seq += 1
+        self.next_offset += size
+        self.pending_bytes += size
+
+    def should_flush(self) -> bool:
+        return self.pending_bytes >= settings.LOG_FLUSH_BYTES
+
+    def take(self) -> List[dict]:
+        """Remove and return the pending chunks."""
+        rows, self.pending, self.pending_bytes = self.pending, [], 0
+        return rows
+
+    def put_back(self, rows: List[dict]) -> None:
+        """Return chunks from a failed flush to the front of the batch."""
+        self.pending = rows + self.pending
+        self.pending_bytes += sum(row["byte_size"] for row in rows)
+
+    def renumber(self, next_seq: int, next_offset: int) -> None:
+        """Number the pending chunks from ``next_seq``/``next_offset`` on, after
+        chunks someone else appended to the log."""
+        for row in self.pending:
+            row["seq"], row["byte_offset"] = next_seq, next_offset
+            next_seq += 1
+            next_offset += row["byte_size"]
+        self.next_seq, self.next_offset = next_seq, next_offset
+
+    def flush(self, db: Session) -> None:
+        """Insert all pending chunks in one batch and commit."""
+        rows = self.take()
+        if rows:
+            _insert_chunks(db, rows)
+
+
+def _insert_chunks(db: Session, rows: List[dict]) -> None:
+    db.execute(insert(ExecutionLogChunk), rows)
+    db.commit()
+
+
+class LogWriterMetrics:
+    """Flush counters and lag (oldest buffered chunk -> committed) across all writers."""
+
+    def __init__(self):
+        self.flushes_total = 0
+        self.failed_flushes_total = 0
+        self.chunks_total = 0
+        self.bytes_total = 0
+        self.total_lag_seconds = 0.0
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+
+    def record(self, rows: List[dict], lag: float) -> None:
+        self.flushes_total += 1
+        self.chunks_total += len(rows)
+        self.bytes_total += sum(row["byte_size"] for row in rows)
+        self.total_lag_seconds += lag
+        self.last_lag_seconds = lag
+        self.max_lag_seconds = max(self.max_lag_seconds, lag)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "flushes_total": self.flushes_total,
+            "failed_flushes_total": self.failed_flushes_total,
+            "chunks_total": self.chunks_total,
+            "bytes_total": self.bytes_total,
+            "avg_flush_lag_ms": self.total_lag_seconds / self.flushes_total * 1000 if self.flushes_total else 0.0,
+            "last_flush_lag_ms": self.last_lag_seconds * 1000,
+            "max_flush_lag_ms": self.max_lag_seconds * 1000,
+        }
+
+
+log_writer_metrics = LogWriterMetrics()
+
+# Writers running in this process, by execution id; append_log goes through them
+_live_writers: Dict[int, "ExecutionLogWriter"] = {}
+
+
+class ExecutionLogWriter:
+    """Background task that appends one execution's output to its log.
+
+    ``write`` never blocks. Output is flushed once LOG_FLUSH_BYTES are
+    buffered or the oldest buffered chunk is LOG_FLUSH_INTERVAL_MS old.
+    Each flush runs in a worker thread with its own short-lived session; a
+    failed flush keeps its chunks and is retried on the next one. While the
+    writer runs it is the only one numbering chunks in this process; if
+    another process appended to the log meanwhile, the (execution_id, seq)
+    unique index rejects the flush and the pending chunks are renumbered
+    after the other process's.
+    """
+
+    def __init__(self, buffer: ExecutionLogBuffer, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.buffer = buffer
+        self.loop = loop
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._oldest_pending_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def start(cls, execution_id: int) -> "ExecutionLogWriter":
+        buffer = await asyncio.to_thread(_resume_buffer, execution_id)
+        writer = cls(buffer, asyncio.get_running_loop())
+        writer._task = asyncio.create_task(writer._run())
+        _live_writers[execution_id] = writer
+        return writer
+
+    @property
+    def total_bytes(self) -> int:
+        return self.buffer.total_bytes
+
+    def write(self, content: str) -> None:
+        if self._oldest_pending_at is None:
+            self._oldest_pending_at = asyncio.get_running_loop().time()
+            self._wakeup.set()
+        self.buffer.append(content)
+        if self.buffer.should_flush():
+            self._wakeup.set()
+
+    async def close(self) -> None:
+        """Flush everything still buffered and stop the writer."""
+        if _live_writers.get(self.buffer.execution_id) is self:
+            del _live_writers[self.buffer.execution_id]
+        self._closing = True
+        self._wakeup.set()
+        if self._task:
+            await self._task
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = settings.LOG_FLUSH_INTERVAL_MS / 1000
+        while True:
+            self._wakeup.clear()
+            if not self.buffer.pending:
+                if self._closing:
+                    return
+                await self._wakeup.wait()
+                continue
+
+            remaining = self._oldest_pending_at + interval - loop.time()
+            if remaining > 0 and not self.buffer.should_flush() and not self._closing:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if not await self._flush() and self._closing:
+                print(f"❌ Dropping {len(self.buffer.pending)} unsaved log chunks for execution {self.buffer.execution_id}")
+                return
+
+    async def _flush(self) -> bool:
+        oldest_pending_at = self._oldest_pending_at
+        self._oldest_pending_at = None
+        rows = self.buffer.take()
+        try:
+            try:
+                await asyncio.to_thread(_write_chunks, rows)
+            except IntegrityError:
+                # Another process appended to this log; continue after its chunks
+                self.buffer.put_back(rows)
+                tail = await asyncio.to_thread(_resume_buffer, self.buffer.execution_id)
+                self.buffer.renumber(tail.next_seq, tail.next_offset)
+                rows = self.buffer.take()
+                await asyncio.to_thread(_write_chunks, rows)
+        except Exception as e:
+            print(f"❌ Log flush failed for execution {self.buffer.execution_id}: {str(e)}")
+            log_writer_metrics.failed_flushes_total += 1
+            self.buffer.put_back(rows)
+            self._oldest_pending_at = oldest_pending_at
+            if not self._closing:
+                await asyncio.sleep(settings.LOG_FLUSH_INTERVAL_MS / 1000)
+            return False
+        log_writer_metrics.record(rows, asyncio.get_running_loop().time() - oldest_pending_at)
+        return True
+
+
+def _resume_buffer(execution_id: int) -> ExecutionLogBuffer:
+    db = SessionLocal()
+    try:
+        return ExecutionLogBuffer.resume(db, execution_id)
+    finally:
+        db.close()
+
+
+def _write_chunks(rows: List[dict]) -> None:
+    db = SessionLocal()
+    try:
+        _insert_chunks(db, rows)
+    finally:
+        db.close()
+
+
+def append_log(db: Session, execution_id: int, content: str) -> None:
+    """Append a single piece of text to an execution's log.
+
+    While the execution has a live ExecutionLogWriter in this process the text
+    is handed to it, so chunks are numbered in one place; it is committed with
+    the writer's next flush. Otherwise it is inserted and committed here.
+    """
+    writer = _live_writers.get(execution_id)
+    if writer is not None:
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is writer.loop:
+            writer.write(content)
+            return
+        try:
+            writer.loop.call_soon_threadsafe(_append_on_loop, execution_id, content)
+            return
+        except RuntimeError:
+            pass  # the writer's loop is closed
+    _append_chunk(db, execution_id, content)
+
+
+def _append_on_loop(execution_id: int, content: str) -> None:
+    writer = _live_writers.get(execution_id)
+    if writer is not None:
+        writer.write(content)
+    else:
+        # The writer closed before the text got to it
+        asyncio.get_running_loop().run_in_executor(None, _append_chunk_in_session, execution_id, content)
+
+
+def _append_chunk(db: Session, execution_id: int, content: str, attempts: int = 3) -> None:
+    for attempt in range(attempts):
+        buffer = ExecutionLogBuffer.resume(db, execution_id)
+        buffer.append(content)
+        try:
+            buffer.flush(db)
+            return
+        except IntegrityError:
+            # Someone appended a chunk with the same seq first; read the tail again
+            db.rollback()
+            if attempt == attempts - 1:
+                raise
+
+
+def _append_chunk_in_session(execution_id: int, content: str) -> None:
+    db = SessionLocal()
+    try:
+        _append_chunk(db, execution_id, content)
+    finally:
+        db.close()
+
+
+def read_log_chunks(
+    db: Session,
+    execution_id: int,
+    after_seq: Optional[int] = None,
+    limit: Optional[int] = None
+) -> List[ExecutionLogChunk]:
+    """Chunks of an execution's log in order, optionally after a given seq."""
+    query = db.query(ExecutionLogChunk).filter(ExecutionLogChunk.execution_id == execution_id)
+    if after_seq is not None:
+        query = query.filter(ExecutionLogChunk.seq > after_seq)
+    query = query.order_by(ExecutionLogChunk.seq)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+def get_log_archive(db: Session, execution_id: int) -> Optional[ExecutionLogArchive]:
+    return db.query(ExecutionLogArchive).filter(ExecutionLogArchive.execution_id == execution_id).first()
+
+
+def archive_file_path(archive: ExecutionLogArchive) -> str:
+    return os.path.join(settings.EXECUTION_LOG_DIR, archive.path)
+
+
+def iter_archive_bytes(
+    archive: ExecutionLogArchive,
+    start: int = 0,
+    end: Optional[int] = None,
+    block_size: int = 65536
+) -> Iterator[bytes]:
+    """Decompress bytes ``[start, end)`` of an archived log as a stream."""
+    end = archive.original_size if end is None else min(end, archive.original_size)
+    if start >= end:
+        return
+    with gzip.open(archive_file_path(archive), "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(block_size, remaining))
+            if not block:
+                return
+            remaining -= len(block)
+            yield block
+
+
+def _iter_prefix_bytes(db: Session, execution: Execution) -> Iterator[bytes]:
+    archive = get_log_archive(db, execution.id)
+    if archive is not None:
+        yield from iter_archive_bytes(archive)
+    elif execution.console_log:
+        yield execution.console_log.encode("utf-8")
+
+
+def _iter_chunk_bytes(db: Session, execution_id: int, page_size: int = 500) -> Iterator[bytes]:
+    last_seq = -1
+    while True:
+        page = (
+            db.query(ExecutionLogChunk.seq, ExecutionLogChunk.content)
+            .filter(ExecutionLogChunk.execution_id == execution_id, ExecutionLogChunk.seq > last_seq)
+            .order_by(ExecutionLogChunk.seq)
+            .limit(page_size)
+            .all()
+        )
+        if not page:
+            return
+        last_seq = page[-1].seq
+        yield "".join(content for _, content in page).encode("utf-8")
+
+
+def assemble_console_log(db: Session, execution: Execution) -> str:
+    """Full console log of one execution (archive or legacy column + chunks)."""
+    prefix = b"".join(_iter_prefix_bytes(db, execution)).decode("utf-8")
+    chunks = read_log_chunks(db, execution.id)
+    return prefix + "".join(chunk.content for chunk in chunks)
+
+
+def assemble_console_logs(db: Session, executions: Iterable[Execution]) -> Dict[int, str]:
+    """Full console logs of several executions, loading their chunks in one query."""
+    executions = list(executions)
+    logs = {execution.id: [execution.console_log or ""] for execution in executions}
+    if logs:
+        archives = db.query(ExecutionLogArchive).filter(ExecutionLogArchive.execution_id.in_(list(logs)))
+        for archive in archives:
+            logs[archive.execution_id] = [b"".join(iter_archive_bytes(archive)).decode("utf-8")]
+        chunks = (
+            db.query(ExecutionLogChunk.execution_id, ExecutionLogChunk.content)
+            .filter(ExecutionLogChunk.execution_id.in_(list(logs)))
+            .order_by(ExecutionLogChunk.execution_id, ExecutionLogChunk.seq)
+        )
+        for execution_id, content in chunks:
+            logs[execution_id].append(content)
+    return {execution_id: "".join(parts) for execution_id, parts in logs.items()}
+
+
+def delete_log(db: Session, execution_id: int) -> None:
+    """Remove an execution's chunks and archive (the caller commits)."""
+    db.query(ExecutionLogChunk).filter(ExecutionLogChunk.execution_id == execution_id).delete(synchronize_session=False)
+    archive = get_log_archive(db, execution_id)
+    if archive is not None:
+        db.delete(archive)
+        try:
+            os.remove(archive_file_path(archive))
+        except FileNotFoundError:
+            pass
+
+
+def log_size(db: Session, execution_id: int) -> int:
+    """Total size in bytes of an execution's log."""
+    return _log_tail(db, execution_id)[1]
+
+
+def parse_byte_range(range_header: str, total: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range into an inclusive (start, end) pair.
+
+    Returns None for headers we don't serve ranges for (other units,
+    multiple ranges), in which case the full log is sent.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first == "":
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            return max(total - length, 0), total - 1
+        start = int(first)
+        end = int(last) if last else total - 1
+    except ValueError:
+        return None
+    if start >= total:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{total}"}
+        )
+    if start > end:
+        return None
+    return start, min(end, total - 1)
+
+
+def read_log_range(db: Session, execution: Execution, start: int, end: int) -> bytes:
+    """Bytes ``[start, end)`` of an execution's full log.
+
+    Only the chunks overlapping the range are loaded, using the
+    (execution_id, byte_offset) index; an archive is decompressed only up
+    to ``end``.
+    """
+    parts = []
+    archive = get_log_archive(db, execution.id)
+    if archive is not None:
+        parts.extend(iter_archive_bytes(archive, start, end))
+    else:
+        legacy = (execution.console_log or "").encode("utf-8")
+        if start < len(legacy):
+            parts.append(legacy[start:end])
+
+    first_offset = (
+        db.query(ExecutionLogChunk.byte_offset)
+        .filter(ExecutionLogChunk.execution_id == execution.id, ExecutionLogChunk.byte_offset <= start)
+        .order_by(ExecutionLogChunk.byte_offset.desc())
+        .limit(1)
+        .scalar()
+    )
+    chunks = (
+        db.query(ExecutionLogChunk.byte_offset, ExecutionLogChunk.byte_size, ExecutionLogChunk.content)
+        .filter(
+            ExecutionLogChunk.execution_id == execution.id,
+            ExecutionLogChunk.byte_offset >= (first_offset if first_offset is not None else start),
+            ExecutionLogChunk.byte_offset < end
+        )
+        .order_by(ExecutionLogChunk.byte_offset)
+    )
+    for byte_offset, byte_size, content in chunks:
+        data = content.encode("utf-8")
+        parts.append(data[max(start - byte_offset, 0):min(end - byte_offset, byte_size)])
+    return b"".join(parts)
+
+
+def read_log_text(db: Session, execution: Execution, offset: int, limit: int) -> Tuple[int, int, int, str]:
+    """Up to ``limit`` bytes of log text starting at ``offset``.
+
+    The range is narrowed to whole UTF-8 characters, so the returned
+    (start, end) offsets may differ slightly from the requested ones; ``end``
+    is the cursor to continue reading from. Returns (start, end, total, text).
+    """
+    total = log_size(db, execution.id)
+    start = min(offset, total)
+    data = read_log_range(db, execution, start, min(start + limit, total))
+    # Skip continuation bytes of a character that began before the range
+    lead = 0
+    while lead < len(data) and 0x80 <= data[lead] < 0xC0:
+        lead += 1
+    text = data[lead:].decode("utf-8", errors="ignore")
+    start += lead
+    return start, start + len(text.encode("utf-8")), total, text
+
+
+def read_log_page(execution_id: int, offset: int, limit: int) -> Tuple[int, int, int, str]:
+    """read_log_text with its own session, for use from a worker thread."""
+    db = SessionLocal()
+    try:
+        execution = db.query(Execution).filter(Execution.id == execution_id).first()
+        if execution is None:
+            return 0, 0, 0, ""
+        return read_log_text(db, execution, offset, limit)
+    finally:
+        db.close()
+
+
+def iter_log_bytes(execution_id: int) -> Iterator[bytes]:
+    """Stream an execution's full log, with its own session."""
+    db = SessionLocal()
+    try:
+        execution = db.query(Execution).filter(Execution.id == execution_id).first()
+        if execution is None:
+            return
+        yield from _iter_prefix_bytes(db, execution)
+        yield from _iter_chunk_bytes(db, execution_id)
+    finally:
+        db.close()
+
+
+def tail_log(db: Session, execution: Execution, lines: int, page_size: int = 200) -> Tuple[int, str]:
+    """Last ``lines`` lines of an execution's log and the byte offset they start at.
+
+    Chunks are read backwards from the end until enough lines are collected.
+    """
+    total = log_size(db, execution.id)
+    parts: List[str] = []
+    newlines = 0
+    before_seq = None
+    while newlines <= lines:
+        query = db.query(ExecutionLogChunk.seq, ExecutionLogChunk.content).filter(
+            ExecutionLogChunk.execution_id == execution.id
+        )
+        if before_seq is not None:
+            query = query.filter(ExecutionLogChunk.seq < before_seq)
+        page = query.order_by(ExecutionLogChunk.seq.desc()).limit(page_size).all()
+        if not page:
+            # Reached the beginning of the chunks; the archive or legacy log precedes them
+            parts.append(_prefix_tail(db, execution, lines - newlines + 1))
+            break
+        for seq, content in page:
+            parts.append(content)
+            newlines += content.count("\n")
+            if newlines > lines:
+                break
+        before_seq = page[-1].seq
+
+    text = "".join(reversed(parts))
+    tail = "".join(text.splitlines(keepends=True)[-lines:]) if lines > 0 else ""
+    return total - len(tail.encode("utf-8")), tail
+
+
+def _prefix_tail(db: Session, execution: Execution, lines: int) -> str:
+    archive = get_log_archive(db, execution.id)
+    if archive is None:
+        return execution.console_log or ""
+    # Decompress as a stream, keeping only the last lines
+    with gzip.open(archive_file_path(archive), "rb") as f:
+        return "".join(deque(io.TextIOWrapper(f, encoding="utf-8", newline=""), maxlen=lines))
+
+
+def archive_log(db: Session, execution_id: int) -> Optional[ExecutionLogArchive]:
+    """Compress a finished execution's log into a gzip file.
+
+    The archive covers everything stored so far; the chunks it covers and the
+    legacy column are then cleared. Anything appended afterwards is kept as
+    chunks following the archive. Returns None when there is nothing to archive.
+    """
+    execution = db.query(Execution).filter(Execution.id == execution_id).first()
+    if execution is None:
+        return None
+    existing = get_log_archive(db, execution_id)
+    if existing is not None:
+        return existing
+
+    os.makedirs(settings.EXECUTION_LOG_DIR, exist_ok=True)
+    filename = f"{execution_id}.log.gz"
+    path = os.path.join(settings.EXECUTION_LOG_DIR, filename)
+    original_size = 0
+    with gzip.open(path + ".tmp", "wb", compresslevel=settings.LOG_COMPRESSION_LEVEL) as f:
+        for block in _iter_prefix_bytes(db, execution):
+            f.write(block)
+            original_size += len(block)
+        for block in _iter_chunk_bytes(db, execution_id):
+            f.write(block)
+            original_size += len(block)
+    if original_size == 0:
+        os.remove(path + ".tmp")
+        return None
+    os.replace(path + ".tmp", path)
+
+    archive = ExecutionLogArchive(
+        execution_id=execution_id,
+        path=filename,
+        encoding="gzip",
+        original_size=original_size,
+        compressed_size=os.path.getsize(path)
+    )
+    try:
+        db.add(archive)
+        db.query(ExecutionLogChunk).filter(
+            ExecutionLogChunk.execution_id == execution_id,
+            ExecutionLogChunk.byte_offset < original_size
+        ).delete(synchronize_session=False)
+        execution.console_log = None
+        db.commit()
+    except Exception:
+        db.rollback()
+        os.remove(path)
+        raise
+    return archive
+
+
+def _archive_log(execution_id: int) -> Optional[ExecutionLogArchive]:
+    db = SessionLocal()
+    try:
+        archive = archive_log(db, execution_id)
+        if archive is not None:
+            db.refresh(archive)
+            db.expunge(archive)
+        return archive
+    finally:
+        db.close()
+
+
+async def archive_finished_log(execution_id: int) -> None:
+    """Archive an execution's log in a worker thread; on failure it stays uncompressed."""
+    try:
+        archive = await asyncio.to_thread(_archive_log, execution_id)
+    except Exception as e:
+        print(f"❌ Failed to archive log for execution {execution_id}: {str(e)}")
+        return
+    if archive is not None:
+        print(f"🗜️ Archived log for execution {execution_id}: {archive.original_size} -> {archive.compressed_size} bytes ({archive.compression_ratio:.1f}x)")
+
+
+def log_storage_stats(db: Session) -> Dict[str, Any]:
+    """Totals across all archived logs."""
+    count, original, compressed = db.query(
+        func.count(ExecutionLogArchive.execution_id),
+        func.coalesce(func.sum(ExecutionLogArchive.original_size), 0),
+        func.coalesce(func.sum(ExecutionLogArchive.compressed_size), 0)
+    ).one()
+    return {
+        "archived_logs": count,
+        "original_bytes": original,
+        "compressed_bytes": compressed,
+        "compression_ratio": original / compressed if compressed else 0.0,
+    }
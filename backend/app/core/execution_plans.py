@@ -0,0 +1,161 @@
+"""
+Compiled execution plans for processes.
+
+Most executions rerun a handful of processes with different variables. A
+plan holds everything ``execute_process`` needs from the database (the
+process steps with their agents, tasks and tools) plus the variable
+placeholders they use, so a repeated execution sets up without a query.
+
+Plans are cached per process and its ``updated_at`` in an LRU of
+PROCESS_PLAN_CACHE_SIZE entries. Writes to a process, or to an agent, task
+or tool a plan refers to, drop the affected plans through ORM events. Those
+events only see writes made through this process's ORM sessions, so with
+several API workers an agent edited on one worker is picked up by the
+others once their plan is evicted or the process itself is updated.
+"""
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.process_resolver import ResolvedSteps, resolve_steps
+from app.models.agent import Agent as AgentModel
+from app.models.process import Process as ProcessModel
+from app.models.task import Task as TaskModel
+from app.models.tool import Tool as ToolModel
+
+PLACEHOLDER = re.compile(r"\{\{(.+?)\}\}")
+
+# Text columns that may contain {{variable}} placeholders
+TEMPLATE_COLUMNS = {
+    "agents": ("role", "goal", "backstory"),
+    "tasks": ("description", "expected_output"),
+}
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """A process's steps resolved against the database, ready to build crews from."""
+    process_id: int
+    version: Any  # the process's updated_at when the plan was compiled
+    resolved: ResolvedSteps  # rows are detached copies, safe to share between executions
+    references: Dict[str, FrozenSet[int]]  # ids the steps refer to per table, found or not
+    variable_names: FrozenSet[str]  # placeholders used by the agents' and tasks' texts
+
+
+def _detached_copy(row: Any) -> Any:
+    """Copy of an ORM row that belongs to no session, so commits elsewhere can't expire it."""
+    copy = type(row)()
+    for attribute in inspect(row).mapper.column_attrs:
+        setattr(copy, attribute.key, getattr(row, attribute.key))
+    return copy
+
+
+def compile_plan(db: Session, process: ProcessModel) -> ExecutionPlan:
+    steps = (process.configuration or {}).get("steps", [])
+    resolved = resolve_steps(db, steps)
+    resolved = ResolvedSteps(
+        steps=steps,
+        agents={row_id: _detached_copy(row) for row_id, row in resolved.agents.items()},
+        tasks={row_id: _detached_copy(row) for row_id, row in resolved.tasks.items()},
+        tools={row_id: _detached_copy(row) for row_id, row in resolved.tools.items()},
+    )
+
+    tool_ids = set(resolved.tools)
+    for step in steps:
+        tool_ids.update(step.get("tools") or [])
+    for row in [*resolved.agents.values(), *resolved.tasks.values()]:
+        tool_ids.update(row.tools or [])
+    references = {
+        "agents": frozenset(step["agent_id"] for step in steps if step.get("agent_id") is not None),
+        "tasks": frozenset(step["task_id"] for step in steps if step.get("task_id") is not None),
+        "tools": frozenset(tool_ids),
+    }
+
+    variable_names = set()
+    for table, rows in (("agents", resolved.agents), ("tasks", resolved.tasks)):
+        for row in rows.values():
+            for column in TEMPLATE_COLUMNS[table]:
+                variable_names.update(PLACEHOLDER.findall(getattr(row, column) or ""))
+
+    return ExecutionPlan(
+        process_id=process.id,
+        version=process.updated_at,
+        resolved=resolved,
+        references=references,
+        variable_names=frozenset(variable_names),
+    )
+
+
+class ExecutionPlanCache:
+    """LRU of compiled plans keyed by (process id, process updated_at)."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._plans: "OrderedDict[Tuple[int, Any], ExecutionPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, db: Session, process: ProcessModel) -> Tuple[ExecutionPlan, bool]:
+        """The process's plan, compiling it on a miss; also tells whether it was cached."""
+        key = (process.id, process.updated_at)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan, True
+            self.misses += 1
+
+        plan = compile_plan(db, process)
+        if self.max_size > 0:
+            with self._lock:
+                self._plans[key] = plan
+                while len(self._plans) > self.max_size:
+                    self._plans.popitem(last=False)
+        return plan, False
+
+    def invalidate(self, table: str, row_id: Optional[int]) -> None:
+        """Drop the plans of a changed process, or of processes using a changed agent, task or tool."""
+        with self._lock:
+            stale = [
+                key for key, plan in self._plans.items()
+                if (plan.process_id == row_id if table == "processes" else row_id in plan.references.get(table, ()))
+            ]
+            for key in stale:
+                del self._plans[key]
+            self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._plans),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+plan_cache = ExecutionPlanCache(settings.PROCESS_PLAN_CACHE_SIZE)
+
+
+def _invalidate_plans(mapper: Any, connection: Any, target: Any) -> None:
+    plan_cache.invalidate(target.__tablename__, target.id)
+
+
+# Inserts count too: a plan may refer to an id that didn't exist when it was compiled
+for _model in (ProcessModel, AgentModel, TaskModel, ToolModel):
+    for _event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event_name, _invalidate_plans)
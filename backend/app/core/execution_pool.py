@@ -0,0 +1,297 @@
+"""
+Shared execution pool for crew kickoffs.
+
+All crews run on one long-lived thread pool owned by the CrewAI service.
+At most ``max_concurrency`` executions hold a slot at a time; the rest wait
+in a bounded pending queue ordered by priority (higher first) and then
+arrival order. Admission beyond the queue bound is rejected.
+
+With the "process" backend the kickoff itself runs in a reusable pool of
+worker processes instead, so crew CPU work and GIL contention stay out of the
+API process and a crashing crew only takes down its worker.
+
+A stopped execution gives its slot back right away (``abandon``) while its
+kickoff winds down; up to ``max_concurrency`` such draining kickoffs get
+workers of their own so they never delay newly admitted ones. A thread-backend
+kickoff that ignores the stop can be interrupted through its ThreadInterrupt.
+"""
+import asyncio
+import concurrent.futures
+import ctypes
+import heapq
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Type
+
+
+class ExecutionPoolFull(Exception):
+    """Raised when both the running slots and the pending queue are full."""
+
+
+class WorkerCrashed(Exception):
+    """Raised when a crew worker process dies mid-execution."""
+
+
+class ThreadInterrupt:
+    """Raises an exception in the pool thread running one kickoff, from another thread.
+
+    The exception can only be raised while the kickoff runs inside
+    ``running()``, and only once. One that is still pending when the kickoff
+    returns is cleared before the thread goes back to the pool, so it can't
+    land in the next execution the thread runs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread_id: Optional[int] = None
+        self.interrupted = False
+
+    @contextmanager
+    def running(self) -> Iterator[None]:
+        with self._lock:
+            self._thread_id = threading.get_ident()
+        try:
+            yield
+        finally:
+            with self._lock:
+                thread_id, self._thread_id = self._thread_id, None
+                if thread_id is not None:
+                    # NULL clears the thread's pending async exception, if any
+                    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_id), None)
+
+    def interrupt(self, exception: Type[BaseException]) -> bool:
+        """Raise ``exception`` in the kickoff's thread once it runs Python code
+        again; False if the kickoff isn't running (anymore) or was interrupted."""
+        with self._lock:
+            if self._thread_id is None or self.interrupted:
+                return False
+            self.interrupted = True
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(self._thread_id), ctypes.py_object(exception))
+            return True
+
+
+@dataclass(order=True)
+class _PendingExecution:
+    sort_priority: int
+    sequence: int
+    execution_id: int = field(compare=False)
+    admitted: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class CrewExecutionPool:
+    def __init__(self, max_concurrency: int, max_queue_size: int, backend: str = "thread"):
+        if backend not in ("thread", "process"):
+            raise ValueError(f"Unknown execution backend: {backend}")
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.backend = backend
+        # Runs kickoffs with the thread backend, output relays with the process backend;
+        # the second half of the workers is headroom for draining kickoffs
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.worker_count,
+            thread_name_prefix="crew"
+        )
+        self._process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._manager = None
+        self._running: Set[int] = set()
+        self._draining: Set[int] = set()
+        self._pending: List[_PendingExecution] = []
+        self._sequence = itertools.count()
+
+        # Metrics
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.worker_crashes_total = 0
+        self.abandoned_total = 0
+
+    @property
+    def worker_count(self) -> int:
+        return self.max_concurrency * 2
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    def can_admit(self) -> bool:
+        """Whether a new execution would be accepted (running or queued)."""
+        return self._has_free_slot() or len(self._pending) < self.max_queue_size
+
+    def new_cancel_event(self):
+        """Event a kickoff polls to stop cooperatively; shared with worker processes if needed."""
+        if self.backend == "process":
+            return self._get_manager().Event()
+        return threading.Event()
+
+    def reserve(self, execution_id: int, priority: int = 0) -> asyncio.Future:
+        """Claim a slot for an execution.
+
+        Returns a future that resolves once the execution may start; it is
+        already done when a slot was free. Raises ExecutionPoolFull when the
+        pending queue is at capacity.
+        """
+        loop = asyncio.get_running_loop()
+        admitted = loop.create_future()
+
+        if self._has_free_slot() and not self._pending:
+            self._admit(execution_id, admitted, waited=0.0)
+            return admitted
+
+        if len(self._pending) >= self.max_queue_size:
+            self.rejected_total += 1
+            raise ExecutionPoolFull(
+                f"Execution queue is full ({self.max_queue_size} pending executions)"
+            )
+
+        heapq.heappush(self._pending, _PendingExecution(
+            sort_priority=-priority,
+            sequence=next(self._sequence),
+            execution_id=execution_id,
+            admitted=admitted,
+            enqueued_at=time.monotonic()
+        ))
+        return admitted
+
+    def release(self, execution_id: int) -> None:
+        """Free an execution's slot, or drop it from the queue if still pending."""
+        if execution_id in self._running:
+            self._running.discard(execution_id)
+        elif execution_id in self._draining:
+            self._draining.discard(execution_id)
+        else:
+            for entry in self._pending:
+                if entry.execution_id == execution_id:
+                    self._pending.remove(entry)
+                    heapq.heapify(self._pending)
+                    entry.admitted.cancel()
+                    break
+        self._admit_next()
+
+    def abandon(self, execution_id: int) -> None:
+        """Give a stopped execution's slot to the next one while its kickoff winds down.
+
+        The kickoff keeps a worker until it returns; call ``release`` then.
+        """
+        if execution_id in self._running:
+            self._running.discard(execution_id)
+            self._draining.add(execution_id)
+            self.abandoned_total += 1
+            self._admit_next()
+
+    def queue_position(self, execution_id: int) -> Optional[int]:
+        """1-based position of a pending execution, or None if not queued."""
+        for position, entry in enumerate(sorted(self._pending), start=1):
+            if entry.execution_id == execution_id:
+                return position
+        return None
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking callable on the shared executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def run_in_process(self, fn: Callable[..., Any], *args: Any, on_output: Callable[[Any], None]) -> Any:
+        """Run ``fn(*args, channel)`` in a worker process.
+
+        Items the worker puts on ``channel`` are passed to ``on_output`` on the
+        event loop until it puts ``None``. If the worker dies, the process
+        pool is rebuilt and WorkerCrashed is raised; the API keeps running.
+        """
+        loop = asyncio.get_running_loop()
+        channel = self._get_manager().Queue()
+        future = self._get_process_pool().submit(fn, *args, channel)
+
+        def relay():
+            while True:
+                try:
+                    item = channel.get(timeout=0.25)
+                except queue.Empty:
+                    if future.done():
+                        # Worker finished (or died) without an end marker
+                        return
+                    continue
+                if item is None:
+                    return
+                loop.call_soon_threadsafe(on_output, item)
+
+        await loop.run_in_executor(self.executor, relay)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool as e:
+            self.worker_crashes_total += 1
+            self._reset_process_pool()
+            raise WorkerCrashed("Crew worker process exited unexpectedly") from e
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self._reset_process_pool()
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def metrics(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        oldest_wait = max((now - entry.enqueued_at for entry in self._pending), default=0.0)
+        return {
+            "backend": self.backend,
+            "max_concurrency": self.max_concurrency,
+            "running": len(self._running),
+            "draining": len(self._draining),
+            "queue_depth": len(self._pending),
+            "max_queue_size": self.max_queue_size,
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total,
+            "avg_wait_seconds": self.total_wait_seconds / self.admitted_total if self.admitted_total else 0.0,
+            "max_wait_seconds": self.max_wait_seconds,
+            "oldest_queued_wait_seconds": oldest_wait,
+            "worker_crashes_total": self.worker_crashes_total,
+            "abandoned_total": self.abandoned_total,
+        }
+
+    def _get_process_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._process_pool is None:
+            # spawn: forking a threaded uvicorn worker is not safe
+            self._process_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.worker_count,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._process_pool
+
+    def _get_manager(self):
+        if self._manager is None:
+            self._manager = multiprocessing.get_context("spawn").Manager()
+        return self._manager
+
+    def _reset_process_pool(self) -> None:
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+    def _admit(self, execution_id: int, admitted: asyncio.Future, waited: float) -> None:
+        self._running.add(execution_id)
+        self.admitted_total += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        admitted.set_result(waited)
+
+    def _has_free_slot(self) -> bool:
+        # Draining kickoffs beyond the headroom still hold workers, so they count against slots
+        return (
+            len(self._running) < self.max_concurrency
+            and len(self._running) + len(self._draining) < self.worker_count
+        )
+
+    def _admit_next(self) -> None:
+        while self._has_free_slot() and self._pending:
+            entry = heapq.heappop(self._pending)
+            if entry.admitted.cancelled():
+                continue
+            self._admit(entry.execution_id, entry.admitted, waited=time.monotonic() - entry.enqueued_at)
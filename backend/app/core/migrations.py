@@ -0,0 +1,109 @@
+"""
+Schema migrations.
+
+The schema is managed by Alembic (``migrations/`` in the backend directory)
+and applied once per deploy by ``python scripts/migrate.py``, before the API
+and Celery workers start. Workers never run DDL themselves, so they start
+without reflecting the schema, several of them can start at once, and
+schema changes roll out as migrations instead of on the next restart.
+"""
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Set, Tuple
+
+from alembic import command, context, op
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+from app.core.database import engine
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# The schema main.py used to create with create_all at startup
+BASELINE_REVISION = "eb514e22a633"
+BASELINE_TABLES = {"agents", "tasks", "processes", "tools", "executions"}
+
+
+def alembic_config() -> Config:
+    config = Config(str(ALEMBIC_INI))
+    # Relative to alembic.ini rather than the working directory
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "migrations"))
+    return config
+
+
+def _current_revision(connection: Any) -> Optional[str]:
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def migrate(revision: str = "head", bind: Engine = engine) -> None:
+    """Upgrade the database to ``revision``.
+
+    A database create_all set up has the tables but no alembic_version; it is
+    stamped with the baseline first so the baseline's tables aren't created
+    again, and the later revisions add whatever else it lacks.
+    """
+    config = alembic_config()
+    with bind.connect() as connection:
+        current = _current_revision(connection)
+        existing_tables = set(inspect(connection).get_table_names())
+    if current is None and existing_tables & BASELINE_TABLES:
+        missing = BASELINE_TABLES - existing_tables
+        if missing:
+            raise RuntimeError(
+                f"Database has no alembic_version and doesn't match the baseline schema "
+                f"(missing tables: {', '.join(sorted(missing))}); refusing to stamp it"
+            )
+        print(f"🗂️  Database predates migrations, stamping baseline {BASELINE_REVISION}")
+        _run(config, bind, command.stamp, BASELINE_REVISION)
+    _run(config, bind, command.upgrade, revision)
+    with bind.connect() as connection:
+        print(f"✅ Database schema at revision {_current_revision(connection)}")
+
+
+def _run(config: Config, bind: Engine, alembic_command: Any, revision: str) -> None:
+    # migrations/env.py runs on this connection instead of opening its own
+    with bind.connect() as connection:
+        config.attributes["connection"] = connection
+        alembic_command(config, revision)
+
+
+def schema_is_current(bind: Engine = engine) -> bool:
+    """Whether the database is migrated to the latest revision; only reads alembic_version."""
+    head = ScriptDirectory.from_config(alembic_config()).get_current_head()
+    with bind.connect() as connection:
+        return _current_revision(connection) == head
+
+
+# Helpers for revisions, which may find objects create_all made already.
+# Offline (--sql) upgrades can't read the schema and assume none exist.
+
+def has_table(table: str) -> bool:
+    if context.is_offline_mode():
+        return False
+    return inspect(op.get_bind()).has_table(table)
+
+
+def existing_indexes(table: str) -> Set[str]:
+    if context.is_offline_mode():
+        return set()
+    return {index["name"] for index in inspect(op.get_bind()).get_indexes(table)}
+
+
+def create_missing_indexes(indexes: Iterable[Tuple[str, str, List[str]]]) -> None:
+    """Create the (table, name, columns) indexes the database doesn't have yet.
+
+    On PostgreSQL they are built concurrently, so writes to the tables aren't
+    blocked while they build.
+    """
+    postgresql = op.get_context().dialect.name == "postgresql"
+    for table, name, columns in indexes:
+        if name in existing_indexes(table):
+            continue
+        if postgresql:
+            # CREATE INDEX CONCURRENTLY can't run inside a transaction
+            with op.get_context().autocommit_block():
+                op.create_index(name, table, columns, postgresql_concurrently=True)
+        else:
+            op.create_index(name, table, columns)
@@ -0,0 +1,111 @@
+"""
+Batching of high-frequency execution output.
+
+Verbose crews emit thousands of short lines per second. Instead of one frame
+(or SSE event) per line, output is merged per time window or size threshold.
+Batching is adaptive: after a quiet period the first chunk goes out at once,
+and only chunks that follow it closely are held back for the rest of the
+window, so sparse output keeps its latency.
+"""
+import asyncio
+from typing import AsyncIterator, Iterable, List, Optional
+
+
+class OutputBatcher:
+    """Decides when merged output should be sent."""
+
+    def __init__(self, window_ms: int, max_bytes: int):
+        self.window = window_ms / 1000
+        self.max_bytes = max_bytes
+        self._last_sent_at: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def delay(self, now: float) -> float:
+        """Seconds to hold output that arrives at ``now`` before sending it."""
+        if not self.enabled or self._last_sent_at is None:
+            return 0.0
+        return max(self._last_sent_at + self.window - now, 0.0)
+
+    def sent(self, now: float) -> None:
+        self._last_sent_at = now
+
+
+def merge_output_messages(messages: Iterable[dict], max_bytes: Optional[int] = None) -> List[dict]:
+    """Merge runs of consecutive ``output`` messages into single messages.
+
+    A merged message keeps the first chunk's log offset and the last chunk's
+    seq; ``first_seq`` tells the client which seqs it covers. With
+    ``max_bytes`` a run is split once its content reaches that size.
+    """
+    merged: List[dict] = []
+    for message in messages:
+        previous = merged[-1] if merged else None
+        if (
+            previous is not None
+            and previous.get("type") == "output"
+            and message.get("type") == "output"
+            and (max_bytes is None or len(previous["content"]) < max_bytes)
+        ):
+            merged[-1] = {
+                **previous,
+                # Chunks emptied because the client already has them don't count as first
+                "log_offset": previous.get("log_offset") if previous["content"] else message.get("log_offset"),
+                "content": previous["content"] + message["content"],
+                "first_seq": previous.get("first_seq", previous.get("seq")),
+                "seq": message.get("seq")
+            }
+        else:
+            merged.append(message)
+    return merged
+
+
+async def batch_chunks(chunks: AsyncIterator[str], window_ms: int, max_bytes: int) -> AsyncIterator[str]:
+    """Re-yield text chunks merged per window or once ``max_bytes`` have built up."""
+    batcher = OutputBatcher(window_ms, max_bytes)
+    if not batcher.enabled:
+        async for chunk in chunks:
+            yield chunk
+        return
+
+    loop = asyncio.get_running_loop()
+    pending: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    async def pump():
+        try:
+            async for chunk in chunks:
+                await pending.put(chunk)
+        finally:
+            await pending.put(done)
+
+    pump_task = asyncio.create_task(pump())
+    try:
+        finished = False
+        while not finished:
+            item = await pending.get()
+            if item is done:
+                break
+            batch = [item]
+            size = len(item)
+            deadline = loop.time() + batcher.delay(loop.time())
+            while size < max_bytes:
+                try:
+                    item = pending.get_nowait() if loop.time() >= deadline else await asyncio.wait_for(
+                        pending.get(), deadline - loop.time()
+                    )
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if item is done:
+                    finished = True
+                    break
+                batch.append(item)
+                size += len(item)
+            yield "".join(batch)
+            batcher.sent(loop.time())
+        # Surface errors raised by the source generator
+        await pump_task
+    finally:
+        pump_task.cancel()
@@ -0,0 +1,184 @@
+"""
+Streaming output capture for CrewAI executions.
+
+Crew kickoff runs in a worker thread and reports its progress by writing to
+stdout/stderr. The sinks in this module turn those writes into complete lines
+as they arrive and hand each line to the execution's asyncio queue on the
+event loop thread, so clients see output while the crew is still running.
+
+sys.stdout and sys.stderr are replaced once at startup by demultiplexers that
+route each write to the sink of the execution owning the current context, so
+several crews can share one worker process without mixing their output.
+"""
+import abc
+import asyncio
+import io
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, TextIO
+
+# Sinks of the execution running in the current context, keyed by stream name
+_current_sinks: ContextVar[Optional[Dict[str, TextIO]]] = ContextVar("crewui_output_sinks", default=None)
+
+
+class LineWriter(io.TextIOBase):
+    """File-like writer that splits output into lines and delivers each one.
+
+    Only the current partial line is buffered, so memory stays bounded no
+    matter how long the crew runs. Lines longer than ``max_line_length`` are
+    delivered in pieces. Subclasses decide where lines go by implementing
+    ``_deliver``.
+    """
+
+    def __new__(cls, *args, **kwargs):
+        # io's C base class skips ABCMeta's check for unimplemented abstract methods
+        if cls.__abstractmethods__:
+            raise TypeError(
+                f"Can't instantiate abstract class {cls.__name__} without {', '.join(sorted(cls.__abstractmethods__))}"
+            )
+        return super().__new__(cls)
+
+    def __init__(self, prefix: str = "", max_line_length: int = 8192):
+        super().__init__()
+        self.prefix = prefix
+        self.max_line_length = max_line_length
+        self.lines_emitted = 0
+        self._pending = ""
+        self._lock = threading.Lock()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if not text:
+            return 0
+
+        with self._lock:
+            lines = (self._pending + text).split("\n")
+            self._pending = lines.pop()
+            while len(self._pending) >= self.max_line_length:
+                lines.append(self._pending[:self.max_line_length])
+                self._pending = self._pending[self.max_line_length:]
+
+        for line in lines:
+            self._emit(line)
+        return len(text)
+
+    def flush(self) -> None:
+        # Partial lines are held back until their newline arrives (or close)
+        pass
+
+    def close(self) -> None:
+        with self._lock:
+            remaining, self._pending = self._pending, ""
+        self._emit(remaining)
+        super().close()
+
+    def _emit(self, line: str) -> None:
+        if not line.strip():
+            return
+
+        self.lines_emitted += 1
+        self._deliver(f"{self.prefix}{line}\n")
+
+    @abc.abstractmethod
+    def _deliver(self, line: str) -> None:
+        """Hand one complete line, newline included, to wherever output goes."""
+
+
+class LineStreamSink(LineWriter):
+    """Line writer that hands each line to an asyncio queue, thread-safely."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        queue: asyncio.Queue,
+        prefix: str = "",
+        max_line_length: int = 8192,
+    ):
+        super().__init__(prefix=prefix, max_line_length=max_line_length)
+        self.loop = loop
+        self.queue = queue
+        self.detached = False
+
+    def detach(self) -> None:
+        """Drop further lines, e.g. once the execution was stopped and nobody reads the queue."""
+        self.detached = True
+
+    def _deliver(self, line: str) -> None:
+        if self.detached:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, line)
+        except RuntimeError:
+            # Event loop already closed; nobody is listening anymore
+            pass
+
+
+class OutputDemultiplexer(io.TextIOBase):
+    """Stand-in for sys.stdout/sys.stderr that routes writes per execution.
+
+    Writes made while an execution's sinks are active in the current context
+    (see ``capture_output``) go to that execution's sink; everything else goes
+    to the original stream.
+    """
+
+    def __init__(self, stream_name: str, original: TextIO):
+        super().__init__()
+        self.stream_name = stream_name
+        self.original = original
+
+    def _target(self) -> TextIO:
+        sinks = _current_sinks.get()
+        if sinks and self.stream_name in sinks:
+            return sinks[self.stream_name]
+        return self.original
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+    def isatty(self) -> bool:
+        return self.original.isatty()
+
+    def fileno(self) -> int:
+        return self.original.fileno()
+
+    @property
+    def encoding(self) -> str:
+        return getattr(self.original, "encoding", "utf-8")
+
+
+def install_output_demux() -> None:
+    """Replace sys.stdout/sys.stderr with demultiplexers (idempotent)."""
+    if not isinstance(sys.stdout, OutputDemultiplexer):
+        sys.stdout = OutputDemultiplexer("stdout", sys.stdout)
+    if not isinstance(sys.stderr, OutputDemultiplexer):
+        sys.stderr = OutputDemultiplexer("stderr", sys.stderr)
+
+
+@contextmanager
+def capture_output(stdout: Optional[TextIO] = None, stderr: Optional[TextIO] = None) -> Iterator[None]:
+    """Route this context's stdout/stderr writes to the given sinks.
+
+    Must be entered on the thread that runs the crew. Threads the crew spawns
+    itself start with an empty context and print to the original streams.
+    """
+    install_output_demux()
+    sinks = {}
+    if stdout is not None:
+        sinks["stdout"] = stdout
+    if stderr is not None:
+        sinks["stderr"] = stderr
+    token = _current_sinks.set(sinks)
+    try:
+        yield
+    finally:
+        _current_sinks.reset(token)
@@ -0,0 +1,153 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Pages are fetched with ``WHERE (sort_key, id) < (last sort_key, last id)``
+instead of OFFSET, so a deep page costs the same as the first one as long
+as (sort_key, id) is indexed. Cursors are opaque to clients: URL-safe base64
+of the sort column and the last row's sort key and id. List endpoints keep
+returning plain arrays and put the cursor of the next page in the
+``X-Next-Cursor`` header (absent on the last page).
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_key: str, sort_value: Any, row_id: int) -> str:
+    if isinstance(sort_value, datetime):
+        payload = {"k": sort_key, "dt": sort_value.isoformat(), "id": row_id}
+    else:
+        payload = {"k": sort_key, "v": sort_value, "id": row_id}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str) -> Tuple[Any, int]:
+    """Sort value and id encoded in a cursor; raises a 400 for malformed cursors
+    and cursors from a list sorted by another column."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        row_id = int(payload["id"])
+        sort_value = datetime.fromisoformat(payload["dt"]) if "dt" in payload else payload["v"]
+        if payload["k"] != sort_key:
+            raise ValueError("cursor is for another sort order")
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return sort_value, row_id
+
+
+def parse_sort(sort: str, columns: Dict[str, Any]) -> Tuple[Any, bool]:
+    """Column and direction for a ``sort`` parameter such as ``name`` or ``-created_at``."""
+    descending = sort.startswith("-")
+    column = columns.get(sort[1:] if descending else sort)
+    if column is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid sort '{sort}', expected one of: {', '.join(columns)} (prefix with '-' for descending)"
+        )
+    return column, descending
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+def _keyset_page(query: Any, sort_column: Any, id_column: Any, limit: int, cursor: Optional[str], descending: bool) -> Any:
+    """``query`` (an ORM Query or a select()) narrowed to the page after ``cursor``, plus one row."""
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, sort_column.key)
+        if sort_column is not id_column:
+            # Compare with the value as stored (e.g. SQLite timestamps without
+            # microseconds); the cursor's copy only stands in if the row is gone
+            stored_value = select(sort_column).where(id_column == row_id).scalar_subquery()
+            sort_value = func.coalesce(stored_value, sort_value)
+        if sort_column is id_column:
+            after = id_column < row_id if descending else id_column > row_id
+        else:
+            # A row-value comparison lets the (sort column, id) index seek straight to the page
+            position = tuple_(sort_column, id_column)
+            cursor_position = tuple_(sort_value, row_id)
+            after = position < cursor_position if descending else position > cursor_position
+        query = query.filter(after)
+
+    columns = [id_column] if sort_column is id_column else [sort_column, id_column]
+    order = [column.desc() if descending else column.asc() for column in columns]
+    # One extra row tells whether there is a next page
+    return query.order_by(*order).limit(limit + 1)
+
+
+def _keyset_result(rows: List[Any], sort_column: Any, id_column: Any, limit: int) -> Tuple[List[Any], Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(sort_column.key, getattr(last, sort_column.key), getattr(last, id_column.key))
+
+
+def paginate(
+    query: Query,
+    sort_column: Any,
+    id_column: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+) -> Tuple[List[Any], Optional[str]]:
+    """One page of ``query`` ordered by (sort_column, id_column); returns the rows and the next cursor."""
+    rows = _keyset_page(query, sort_column, id_column, limit, cursor, descending).all()
+    return _keyset_result(rows, sort_column, id_column, limit)
+
+
+async def paginate_async(
+    db: AsyncSession,
+    statement: Select,
+    sort_column: Any,
+    id_column: Any,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+) -> Tuple[List[Any], Optional[str]]:
+    """``paginate`` for a select() of ORM entities run on an async session."""
+    page = _keyset_page(statement, sort_column, id_column, limit, cursor, descending)
+    rows = (await db.execute(page)).scalars().all()
+    return _keyset_result(list(rows), sort_column, id_column, limit)
+
+
+def _position_offset(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    offset, _ = decode_cursor(cursor, "position")
+    if not isinstance(offset, int) or offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset
+
+
+def _position_result(rows: List[Any], offset: int, limit: int) -> Tuple[List[Any], Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+    return rows[:limit], encode_cursor("position", offset + limit, 0)
+
+
+def paginate_by_position(query: Query, limit: int, cursor: Optional[str] = None) -> Tuple[List[Any], Optional[str]]:
+    """One page of an already ordered ``query`` whose order has no key to seek on,
+    such as search relevance; the cursor holds the position of the next page."""
+    offset = _position_offset(cursor)
+    rows = query.offset(offset).limit(limit + 1).all()
+    return _position_result(rows, offset, limit)
+
+
+async def paginate_by_position_async(
+    db: AsyncSession, statement: Select, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[Any], Optional[str]]:
+    """``paginate_by_position`` for a select() of ORM entities run on an async session."""
+    offset = _position_offset(cursor)
+    rows = (await db.execute(statement.offset(offset).limit(limit + 1))).scalars().all()
+    return _position_result(list(rows), offset, limit)
@@ -0,0 +1,78 @@
+"""
+Batch loading of the agents, tasks and tools a process refers to.
+
+A process configuration only stores ids (``steps: [{agent_id, task_id,
+tools}]``, with agents and tasks listing tool ids of their own). Resolving
+them one by one costs a query per step and per tool; ``resolve_steps``
+loads everything with one ``IN`` query per table instead.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Set
+
+from sqlalchemy.orm import Session
+
+from app.models.agent import Agent as AgentModel
+from app.models.task import Task as TaskModel
+from app.models.tool import Tool as ToolModel
+
+
+@dataclass
+class ResolvedSteps:
+    """Process steps with the rows they refer to, keyed by id."""
+    steps: List[Dict[str, Any]]
+    agents: Dict[int, AgentModel] = field(default_factory=dict)
+    tasks: Dict[int, TaskModel] = field(default_factory=dict)
+    tools: Dict[int, ToolModel] = field(default_factory=dict)
+
+    def tools_of(self, tool_ids: Any) -> List[ToolModel]:
+        """Loaded tools for a list of tool ids, skipping unknown ones."""
+        return [self.tools[tool_id] for tool_id in _tool_ids(tool_ids) if tool_id in self.tools]
+
+    def missing(self) -> Dict[str, List[int]]:
+        """Ids the steps (or their agents and tasks) refer to that aren't in the database, per table."""
+        return {
+            "agents": sorted(set(_step_ids(self.steps, "agent_id")).difference(self.agents)),
+            "tasks": sorted(set(_step_ids(self.steps, "task_id")).difference(self.tasks)),
+            "tools": sorted(_referenced_tool_ids(self.steps, self.agents, self.tasks).difference(self.tools)),
+        }
+
+
+def process_steps(configuration: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Steps of a process configuration (older configurations call them tasks)."""
+    configuration = configuration or {}
+    return configuration.get("steps", configuration.get("tasks", [])) or []
+
+
+def _tool_ids(tool_ids: Any) -> List[int]:
+    return [tool_id for tool_id in tool_ids if isinstance(tool_id, int)] if isinstance(tool_ids, list) else []
+
+
+def _step_ids(steps: List[Dict[str, Any]], key: str) -> List[int]:
+    return [step[key] for step in steps if step.get(key) is not None]
+
+
+def _referenced_tool_ids(steps: List[Dict[str, Any]], agents: Dict[int, Any], tasks: Dict[int, Any]) -> Set[int]:
+    tool_ids = set()
+    for step in steps:
+        tool_ids.update(_tool_ids(step.get("tools")))
+    for row in [*agents.values(), *tasks.values()]:
+        tool_ids.update(_tool_ids(row.tools))
+    return tool_ids
+
+
+def _load(db: Session, model: Any, ids: Iterable[int]) -> Dict[int, Any]:
+    ids = set(ids)
+    if not ids:
+        return {}
+    return {row.id: row for row in db.query(model).filter(model.id.in_(ids)).all()}
+
+
+def resolve_steps(db: Session, steps: List[Dict[str, Any]]) -> ResolvedSteps:
+    """Load every agent, task and tool referenced by ``steps`` in three queries.
+
+    Ids with no row are left out rather than raising; ``missing()`` lists them.
+    """
+    agents = _load(db, AgentModel, _step_ids(steps, "agent_id"))
+    tasks = _load(db, TaskModel, _step_ids(steps, "task_id"))
+    tools = _load(db, ToolModel, _referenced_tool_ids(steps, agents, tasks))
+    return ResolvedSteps(steps=steps, agents=agents, tasks=tasks, tools=tools)
@@ -0,0 +1,180 @@
+"""
+Full-text search for the agent, task, process and tool libraries.
+
+The index is picked by database dialect:
+
+- SQLite: an FTS5 table per library (``<table>_fts``) using the library table
+  as external content, kept in sync by insert/update/delete triggers.
+- PostgreSQL: a generated ``search_vector`` tsvector column with a GIN index,
+  which the database recomputes on every write.
+
+Search terms match word prefixes ("res" finds "research"), every term has to
+match, and results come best match first with hits in the name weighted
+above hits in the other columns. Other dialects, or a SQLite build without
+FTS5, fall back to substring matching.
+
+The indexes are created by a migration; at startup ``detect_search_backend``
+only looks for them.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, column, func, literal_column, or_, table, text
+from sqlalchemy.engine import Engine
+
+# Searched columns per table; the first one (the name) weighs more in ranking
+SEARCH_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "agents": ("name", "role", "goal"),
+    "tasks": ("name", "description", "expected_output"),
+    "processes": ("name", "description", "process_type"),
+    "tools": ("name", "description"),
+}
+
+NAME_WEIGHT = 4.0
+
+# Tables, columns and indexes the search indexes add, which the models don't declare
+SEARCH_OBJECT = re.compile(r"^(\w+_fts(_\w+)?|search_vector|ix_\w+_search_vector)$")
+
+# Dialect whose index is in place, None until detect_search_backend finds it
+_backend: Optional[str] = None
+
+
+def search_terms(search: str) -> List[str]:
+    return re.findall(r"\w+", search.lower())
+
+
+def _sqlite_statements(table_name: str, columns: Tuple[str, ...]) -> List[str]:
+    fts = f"{table_name}_fts"
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{name}" for name in columns)
+    old_values = ", ".join(f"old.{name}" for name in columns)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def _create_sqlite_index(connection: Any, table_name: str, columns: Tuple[str, ...]) -> None:
+    fts = f"{table_name}_fts"
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": fts}
+    ).first()
+    if not exists:
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({', '.join(columns)}, content='{table_name}', "
+            "content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        ))
+        # Index the rows written before search existed
+        connection.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+    for statement in _sqlite_statements(table_name, columns):
+        connection.execute(text(statement))
+
+
+def _create_postgres_index(connection: Any, table_name: str, columns: Tuple[str, ...]) -> None:
+    name, *others = columns
+    rest = " || ' ' || ".join(f"coalesce({other}, '')" for other in others)
+    connection.execute(text(
+        f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+        f"setweight(to_tsvector('simple', coalesce({name}, '')), 'A') || "
+        f"setweight(to_tsvector('simple', {rest}), 'B')) STORED"
+    ))
+    connection.execute(text(
+        f"CREATE INDEX IF NOT EXISTS ix_{table_name}_search_vector ON {table_name} USING GIN (search_vector)"
+    ))
+
+
+def fts5_available(connection: Any) -> bool:
+    return bool(connection.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar())
+
+
+def create_search_index(connection: Any, table_name: str, columns: Tuple[str, ...]) -> bool:
+    """Create the full-text index of a table if missing; False if the database can't have one."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite" and fts5_available(connection):
+        _create_sqlite_index(connection, table_name, columns)
+    elif dialect == "postgresql":
+        _create_postgres_index(connection, table_name, columns)
+    else:
+        return False
+    return True
+
+
+def drop_search_index(connection: Any, table_name: str) -> None:
+    if connection.dialect.name == "sqlite":
+        fts = f"{table_name}_fts"
+        for suffix in ("ai", "ad", "au"):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {fts}_{suffix}"))
+        connection.execute(text(f"DROP TABLE IF EXISTS {fts}"))
+    elif connection.dialect.name == "postgresql":
+        connection.execute(text(f"DROP INDEX IF EXISTS ix_{table_name}_search_vector"))
+        connection.execute(text(f"ALTER TABLE {table_name} DROP COLUMN IF EXISTS search_vector"))
+
+
+def is_search_object(name: Optional[str]) -> bool:
+    return name is not None and SEARCH_OBJECT.match(name) is not None
+
+
+def detect_search_backend(engine: Engine) -> Optional[str]:
+    """Use the full-text indexes if every library has one; returns the dialect in use or None."""
+    global _backend
+    dialect = engine.dialect.name
+    with engine.connect() as connection:
+        if dialect == "sqlite":
+            found = connection.execute(
+                text("SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name IN :names").bindparams(
+                    bindparam("names", expanding=True)
+                ),
+                {"names": [f"{table_name}_fts" for table_name in SEARCH_COLUMNS]},
+            ).scalar()
+        elif dialect == "postgresql":
+            found = connection.execute(
+                text(
+                    "SELECT count(*) FROM information_schema.columns "
+                    "WHERE column_name = 'search_vector' AND table_schema = current_schema() AND table_name IN :names"
+                ).bindparams(bindparam("names", expanding=True)),
+                {"names": list(SEARCH_COLUMNS)},
+            ).scalar()
+        else:
+            found = 0
+    if found != len(SEARCH_COLUMNS):
+        print(f"⚠️  No full-text search indexes in the {dialect} database, searching by substring")
+        _backend = None
+        return None
+    _backend = dialect
+    return dialect
+
+
+def _substring_search(query: Any, model: Any, search: str) -> Any:
+    pattern = f"%{search}%"
+    columns = SEARCH_COLUMNS[model.__tablename__]
+    return query.filter(or_(*(getattr(model, name).ilike(pattern) for name in columns))).order_by(model.id)
+
+
+def apply_search(query: Any, model: Any, search: str) -> Any:
+    """Restrict ``query`` (an ORM Query or a select()) to rows of ``model``
+    matching ``search``, best match first."""
+    terms = search_terms(search)
+    if _backend is None or not terms:
+        return _substring_search(query, model, search)
+
+    table_name = model.__tablename__
+    if _backend == "sqlite":
+        fts = f"{table_name}_fts"
+        weights = ", ".join([str(NAME_WEIGHT)] + ["1.0"] * (len(SEARCH_COLUMNS[table_name]) - 1))
+        match = " ".join(f'"{term}"*' for term in terms)
+        fts_table = table(fts, column("rowid"))
+        return (
+            query.join(fts_table, fts_table.c.rowid == model.id)
+            .filter(literal_column(fts).op("MATCH")(match))
+            # bm25 is lower for better matches
+            .order_by(text(f"bm25({fts}, {weights})"), model.id)
+        )
+
+    vector = literal_column(f"{table_name}.search_vector")
+    ts_query = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{term}:*" for term in terms))
+    return query.filter(vector.op("@@")(ts_query)).order_by(func.ts_rank(vector, ts_query).desc(), model.id)
@@ -3,6 +3,7 @@ from .agent import Agent
 from .task import Task
 from .process import Process
 from .execution import Execution
+from .execution_log import ExecutionLogArchive, ExecutionLogChunk
 from .tool import Tool
 
-__all__ = ["Base", "Agent", "Task", "Process", "Execution", "Tool"] 
\ No newline at end of file
+__all__ = ["Base", "Agent", "Task", "Process", "Execution", "ExecutionLogChunk", "ExecutionLogArchive", "Tool"] 
\ No newline at end of file
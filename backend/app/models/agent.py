@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -14,4 +14,10 @@ class Agent(Base):
     llm_config = Column(JSON, default={})
     additional_params = Column(JSON, default={})
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now()) 
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Keyset pagination on (sort column, id)
+    __table_args__ = (
+        Index("ix_agents_name_id", "name", "id"),
+        Index("ix_agents_created_at_id", "created_at", "id"),
+    )
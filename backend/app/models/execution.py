@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -10,9 +10,16 @@ class Execution(Base):
     process_id = Column(Integer, ForeignKey("processes.id"))
     status = Column(String(50), nullable=False)  # 'running', 'completed', 'failed', 'stopped'
     output_path = Column(String(500))
-    console_log = Column(Text)
+    console_log = Column(Text)  # legacy inline log; new output lives in execution_log_chunks
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True))
     
     # Relationship
-    process = relationship("Process", back_populates="executions") 
\ No newline at end of file
+    process = relationship("Process", back_populates="executions")
+    
+    # Lists are paged newest first on (started_at, id), overall, per process and per status
+    __table_args__ = (
+        Index("ix_executions_started_at_id", "started_at", "id"),
+        Index("ix_executions_process_started_at_id", "process_id", "started_at", "id"),
+        Index("ix_executions_status_started_at_id", "status", "started_at", "id"),
+    )
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class ExecutionLogChunk(Base):
+    __tablename__ = "execution_log_chunks"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    execution_id = Column(Integer, ForeignKey("executions.id", ondelete="CASCADE"), nullable=False)
+    seq = Column(Integer, nullable=False)  # order of the chunk within its execution's log
+    byte_offset = Column(Integer, nullable=False)  # UTF-8 byte offset of the chunk in the full log
+    byte_size = Column(Integer, nullable=False)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        # Also keeps two writers from giving out the same seq
+        Index("uq_execution_log_chunks_execution_seq", "execution_id", "seq", unique=True),
+        Index("ix_execution_log_chunks_execution_offset", "execution_id", "byte_offset"),
+    )
+
+
+class ExecutionLogArchive(Base):
+    __tablename__ = "execution_log_archives"
+    
+    # A finished execution's log, compressed into a file under EXECUTION_LOG_DIR
+    execution_id = Column(Integer, ForeignKey("executions.id", ondelete="CASCADE"), primary_key=True)
+    path = Column(String(500), nullable=False)  # relative to EXECUTION_LOG_DIR
+    encoding = Column(String(20), nullable=False)  # e.g. 'gzip'
+    original_size = Column(Integer, nullable=False)  # bytes of log text covered by the archive
+    compressed_size = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    @property
+    def compression_ratio(self) -> float:
+        return self.original_size / self.compressed_size if self.compressed_size else 0.0
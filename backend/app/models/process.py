@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -15,4 +15,10 @@ class Process(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
-    executions = relationship("Execution", back_populates="process") 
\ No newline at end of file
+    executions = relationship("Execution", back_populates="process")
+    
+    # Keyset pagination on (sort column, id)
+    __table_args__ = (
+        Index("ix_processes_name_id", "name", "id"),
+        Index("ix_processes_created_at_id", "created_at", "id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Boolean, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -34,4 +34,12 @@ class Tool(Base):
     author = Column(String(255), nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now()) 
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Keyset pagination on (sort column, id); name is unique and indexed already.
+    # Category and type filters, and their DISTINCT lists, read the last two
+    __table_args__ = (
+        Index("ix_tools_created_at_id", "created_at", "id"),
+        Index("ix_tools_category_id", "category", "id"),
+        Index("ix_tools_tool_type_id", "tool_type", "id"),
+    )
@@ -1,15 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+import asyncio
 import os
 
 from app.core.config import settings
 from app.api.v1.api import api_router
 from app.core.database import engine
-from app.models import Base
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from app.core.output_capture import install_output_demux
+from app.core.crewai_service import crewai_service
+from app.core.execution_control import handle_stop_requests
+from app.core.execution_events import close_broadcast, get_broadcast
+from app.core.migrations import schema_is_current
+from app.core.search import detect_search_backend
 
 app = FastAPI(
     title="CrewAI Configuration Platform",
@@ -36,6 +39,26 @@ app.include_router(api_router, prefix="/api/v1")
 if os.path.exists(settings.UPLOAD_DIR):
     app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
 
+@app.on_event("startup")
+async def startup():
+    # The schema is migrated by scripts/migrate.py before workers start; only check it
+    if not schema_is_current():
+        print("⚠️  Database schema is not up to date, run: python scripts/migrate.py")
+    detect_search_backend(engine)
+    # Route crew stdout/stderr per execution so concurrent crews don't interleave
+    install_output_demux()
+    # Stop commands can reach any worker; forward them to the one running the crew
+    if get_broadcast().distributed:
+        app.state.stop_request_listener = asyncio.create_task(handle_stop_requests())
+
+@app.on_event("shutdown")
+async def shutdown():
+    listener = getattr(app.state, "stop_request_listener", None)
+    if listener:
+        listener.cancel()
+    crewai_service.pool.shutdown()
+    await close_broadcast()
+
 @app.get("/")
 async def root():
     return {"message": "CrewAI Configuration Platform API"}
@@ -46,4 +69,12 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    # Heartbeats for idle WebSocket connections are ping/pong frames sent by the server
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        ws="websockets",
+        ws_ping_interval=settings.WS_PING_INTERVAL,
+        ws_ping_timeout=settings.WS_PING_TIMEOUT
+    ) 
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""Alembic environment: migrates the database at DATABASE_URL to the models in app.models."""
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.search import is_search_object
+from app.models import Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """Keep the full-text search tables, columns and indexes out of autogenerate."""
+    return not (reflected and compare_to is None and is_search_object(name))
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL without connecting (``alembic upgrade head --sql``)."""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations(connection) -> None:
+    # SQLite can't ALTER most things in place; batch mode rebuilds the table
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=True,
+        include_object=include_object,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    # app.core.migrations.migrate() passes a connection of the engine it migrates
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+    # The app's engine, so SQLite gets the same pragmas as at runtime
+    with engine.connect() as connection:
+        run_migrations(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,68 @@
+"""Execution log chunks and archives
+
+- execution_log_chunks: the console log of an execution, stored as
+  append-only chunks ordered by seq, with each chunk's byte offset
+- execution_log_archives: finished logs compressed into files under
+  EXECUTION_LOG_DIR
+
+Databases set up by create_all may have one or both tables already; those
+are left alone and only their missing indexes are added.
+
+Revision ID: 06b2bc92f2b0
+Revises: eb514e22a633
+Create Date: 2026-10-17 08:58:12.640315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import existing_indexes, has_table
+
+
+# revision identifiers, used by Alembic.
+revision = '06b2bc92f2b0'
+down_revision = 'eb514e22a633'
+branch_labels = None
+depends_on = None
+
+CHUNK_INDEXES = [
+    ("ix_execution_log_chunks_id", ["id"]),
+    ("ix_execution_log_chunks_execution_seq", ["execution_id", "seq"]),
+    ("ix_execution_log_chunks_execution_offset", ["execution_id", "byte_offset"]),
+]
+
+
+def upgrade() -> None:
+    if not has_table('execution_log_chunks'):
+        op.create_table('execution_log_chunks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('execution_id', sa.Integer(), nullable=False),
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('byte_offset', sa.Integer(), nullable=False),
+        sa.Column('byte_size', sa.Integer(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['execution_id'], ['executions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+    existing = existing_indexes('execution_log_chunks')
+    for name, columns in CHUNK_INDEXES:
+        if name not in existing:
+            op.create_index(name, 'execution_log_chunks', columns, unique=False)
+
+    if not has_table('execution_log_archives'):
+        op.create_table('execution_log_archives',
+        sa.Column('execution_id', sa.Integer(), nullable=False),
+        sa.Column('path', sa.String(length=500), nullable=False),
+        sa.Column('encoding', sa.String(length=20), nullable=False),
+        sa.Column('original_size', sa.Integer(), nullable=False),
+        sa.Column('compressed_size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['execution_id'], ['executions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('execution_id')
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('execution_log_archives')
+    op.drop_table('execution_log_chunks')
@@ -0,0 +1,47 @@
+"""Full-text search indexes for the agent, task, process and tool libraries
+
+FTS5 tables and triggers on SQLite, generated tsvector columns with GIN
+indexes on PostgreSQL (see app/core/search.py). Databases without full-text
+support get nothing and search by substring. Indexes an older startup
+already created are kept.
+
+Revision ID: 0a6985a12360
+Revises: 2ac6175b77d9
+Create Date: 2026-10-17 10:26:55.914302
+
+"""
+from alembic import context, op
+
+from app.core.search import create_search_index, drop_search_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0a6985a12360'
+down_revision = '2ac6175b77d9'
+branch_labels = None
+depends_on = None
+
+# Columns indexed by this revision; changing them takes a new revision
+SEARCH_COLUMNS = {
+    "agents": ("name", "role", "goal"),
+    "tasks": ("name", "description", "expected_output"),
+    "processes": ("name", "description", "process_type"),
+    "tools": ("name", "description"),
+}
+
+
+def upgrade() -> None:
+    if context.is_offline_mode():
+        # The SQLite index setup reads the schema, which needs a live connection
+        op.execute("-- full-text search indexes are only created by an online upgrade")
+        return
+    bind = op.get_bind()
+    for table, columns in SEARCH_COLUMNS.items():
+        if not create_search_index(bind, table, columns):
+            print(f"⚠️  No full-text search in this {bind.dialect.name} database, searching by substring")
+            return
+
+
+def downgrade() -> None:
+    for table in SEARCH_COLUMNS:
+        drop_search_index(op.get_bind(), table)
@@ -0,0 +1,44 @@
+"""(sort column, id) indexes for keyset pagination of the library lists
+
+Agents, tasks and processes are listed by name or by creation time, tools by
+creation time (tools.name is unique and indexed already). Each index matches
+a list's ORDER BY, with id breaking ties, so a page is read in index order.
+
+Databases set up by create_all may have some of these already; those are
+left alone. On PostgreSQL the indexes are built concurrently so writes to
+the tables aren't blocked while they build.
+
+Revision ID: 1b504f61820d
+Revises: 06b2bc92f2b0
+Create Date: 2026-10-17 09:04:27.118946
+
+"""
+from alembic import op
+
+from app.core.migrations import create_missing_indexes
+
+
+# revision identifiers, used by Alembic.
+revision = '1b504f61820d'
+down_revision = '06b2bc92f2b0'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("agents", "ix_agents_name_id", ["name", "id"]),
+    ("agents", "ix_agents_created_at_id", ["created_at", "id"]),
+    ("tasks", "ix_tasks_name_id", ["name", "id"]),
+    ("tasks", "ix_tasks_created_at_id", ["created_at", "id"]),
+    ("processes", "ix_processes_name_id", ["name", "id"]),
+    ("processes", "ix_processes_created_at_id", ["created_at", "id"]),
+    ("tools", "ix_tools_created_at_id", ["created_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    create_missing_indexes(INDEXES)
+
+
+def downgrade() -> None:
+    for table, name, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,43 @@
+"""Composite indexes for the hot execution and tool queries
+
+- executions newest first, overall (started_at, id), per process
+  (process_id, started_at, id) and per status (status, started_at, id)
+- tools by category and by tool type, which also serve the DISTINCT scans
+  of /tools/categories and /tools/types
+
+Databases set up by create_all may have some of these already; those are
+left alone. On PostgreSQL the indexes are built concurrently so writes to
+the tables aren't blocked while they build.
+
+Revision ID: 2ac6175b77d9
+Revises: 1b504f61820d
+Create Date: 2026-10-17 09:12:41.503218
+
+"""
+from alembic import op
+
+from app.core.migrations import create_missing_indexes
+
+
+# revision identifiers, used by Alembic.
+revision = '2ac6175b77d9'
+down_revision = '1b504f61820d'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("executions", "ix_executions_started_at_id", ["started_at", "id"]),
+    ("executions", "ix_executions_process_started_at_id", ["process_id", "started_at", "id"]),
+    ("executions", "ix_executions_status_started_at_id", ["status", "started_at", "id"]),
+    ("tools", "ix_tools_category_id", ["category", "id"]),
+    ("tools", "ix_tools_tool_type_id", ["tool_type", "id"]),
+]
+
+
+def upgrade() -> None:
+    create_missing_indexes(INDEXES)
+
+
+def downgrade() -> None:
+    for table, name, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,74 @@
+"""Unique (execution_id, seq) for execution log chunks
+
+Two writers appending to the same log could both take the next seq from
+their own view of its tail. Chunks already stored with a duplicate seq are
+renumbered in (seq, id) order, with byte offsets recomputed to follow each
+other, and the (execution_id, seq) index becomes unique so it can't happen
+again.
+
+Revision ID: cd76dc58d529
+Revises: 0a6985a12360
+Create Date: 2026-10-17 11:40:18.275631
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.core.migrations import existing_indexes
+
+
+# revision identifiers, used by Alembic.
+revision = 'cd76dc58d529'
+down_revision = '0a6985a12360'
+branch_labels = None
+depends_on = None
+
+OLD_INDEX = "ix_execution_log_chunks_execution_seq"
+NEW_INDEX = "uq_execution_log_chunks_execution_seq"
+
+chunks = sa.table(
+    "execution_log_chunks",
+    sa.column("id", sa.Integer),
+    sa.column("execution_id", sa.Integer),
+    sa.column("seq", sa.Integer),
+    sa.column("byte_offset", sa.Integer),
+    sa.column("byte_size", sa.Integer),
+)
+
+
+def _renumber_duplicates() -> None:
+    bind = op.get_bind()
+    duplicated = bind.execute(
+        sa.select(chunks.c.execution_id)
+        .group_by(chunks.c.execution_id, chunks.c.seq)
+        .having(sa.func.count() > 1)
+        .distinct()
+    ).scalars().all()
+    for execution_id in duplicated:
+        rows = bind.execute(
+            sa.select(chunks.c.id, chunks.c.byte_offset, chunks.c.byte_size)
+            .where(chunks.c.execution_id == execution_id)
+            .order_by(chunks.c.seq, chunks.c.id)
+        ).all()
+        offset = min(row.byte_offset for row in rows)
+        for seq, row in enumerate(rows):
+            bind.execute(chunks.update().where(chunks.c.id == row.id).values(seq=seq, byte_offset=offset))
+            offset += row.byte_size
+        print(f"🔢 Renumbered {len(rows)} log chunks of execution {execution_id}")
+
+
+def upgrade() -> None:
+    if context.is_offline_mode():
+        op.execute("-- duplicate log chunk seqs are only renumbered by an online upgrade")
+    else:
+        _renumber_duplicates()
+    existing = existing_indexes("execution_log_chunks")
+    if NEW_INDEX not in existing:
+        op.create_index(NEW_INDEX, 'execution_log_chunks', ['execution_id', 'seq'], unique=True)
+    if OLD_INDEX in existing or context.is_offline_mode():
+        op.drop_index(OLD_INDEX, table_name='execution_log_chunks')
+
+
+def downgrade() -> None:
+    op.create_index(OLD_INDEX, 'execution_log_chunks', ['execution_id', 'seq'], unique=False)
+    op.drop_index(NEW_INDEX, table_name='execution_log_chunks')
@@ -0,0 +1,106 @@
+"""Baseline: the schema main.py used to create with create_all
+
+The five tables as they were before the execution log tables and the list
+indexes were added. Databases created that way have no alembic_version
+table; ``scripts/migrate.py`` stamps them with this revision instead of
+running it, and the later revisions add what they lack.
+
+Revision ID: eb514e22a633
+Revises:
+Create Date: 2026-10-17 08:47:03.227840
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'eb514e22a633'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('agents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('role', sa.Text(), nullable=False),
+    sa.Column('goal', sa.Text(), nullable=False),
+    sa.Column('backstory', sa.Text(), nullable=False),
+    sa.Column('tools', sa.JSON(), nullable=True),
+    sa.Column('llm_config', sa.JSON(), nullable=True),
+    sa.Column('additional_params', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_agents_id'), 'agents', ['id'], unique=False)
+    op.create_table('processes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('process_type', sa.String(length=50), nullable=False),
+    sa.Column('configuration', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_processes_id'), 'processes', ['id'], unique=False)
+    op.create_table('tasks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('expected_output', sa.Text(), nullable=False),
+    sa.Column('tools', sa.JSON(), nullable=True),
+    sa.Column('context', sa.JSON(), nullable=True),
+    sa.Column('additional_params', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tasks_id'), 'tasks', ['id'], unique=False)
+    op.create_table('tools',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('tool_type', sa.String(length=50), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('langchain_tool_name', sa.String(length=255), nullable=True),
+    sa.Column('langchain_params', sa.JSON(), nullable=True),
+    sa.Column('crewai_tool_name', sa.String(length=255), nullable=True),
+    sa.Column('crewai_params', sa.JSON(), nullable=True),
+    sa.Column('python_code', sa.Text(), nullable=True),
+    sa.Column('custom_params', sa.JSON(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('requires_api_key', sa.Boolean(), nullable=True),
+    sa.Column('api_key_name', sa.String(length=100), nullable=True),
+    sa.Column('tags', sa.JSON(), nullable=True),
+    sa.Column('version', sa.String(length=20), nullable=True),
+    sa.Column('author', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_tools_id'), 'tools', ['id'], unique=False)
+    op.create_table('executions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('process_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('output_path', sa.String(length=500), nullable=True),
+    sa.Column('console_log', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['process_id'], ['processes.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_executions_id'), 'executions', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_table('executions')
+    op.drop_table('tools')
+    op.drop_table('tasks')
+    op.drop_table('processes')
+    op.drop_table('agents')
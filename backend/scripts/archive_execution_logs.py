@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Script to compress the logs of finished executions that are still stored
+uncompressed in the database (e.g. executions from before log archiving)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.core.execution_logs import archive_log
+from app.models.execution import Execution
+from app.models.execution_log import ExecutionLogArchive
+
+FINISHED_STATUSES = ["completed", "failed", "stopped"]
+
+def archive_execution_logs():
+    """Archive the log of every finished execution that has no archive yet"""
+    db = SessionLocal()
+
+    try:
+        execution_ids = [
+            execution_id
+            for (execution_id,) in db.query(Execution.id)
+            .outerjoin(ExecutionLogArchive, ExecutionLogArchive.execution_id == Execution.id)
+            .filter(Execution.status.in_(FINISHED_STATUSES), ExecutionLogArchive.execution_id.is_(None))
+            .order_by(Execution.id)
+        ]
+
+        archived_count = 0
+        original_total = 0
+        compressed_total = 0
+        for execution_id in execution_ids:
+            try:
+                archive = archive_log(db, execution_id)
+            except Exception as e:
+                print(f"Error archiving log of execution {execution_id}: {e}")
+                continue
+            if archive is None:
+                continue
+            archived_count += 1
+            original_total += archive.original_size
+            compressed_total += archive.compressed_size
+            print(f"Archived execution {execution_id}: {archive.original_size} -> {archive.compressed_size} bytes")
+
+        ratio = original_total / compressed_total if compressed_total else 0.0
+        print(f"\nArchived {archived_count} execution logs: {original_total} -> {compressed_total} bytes ({ratio:.1f}x)")
+
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    archive_execution_logs()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark mixed CRUD and streaming load on the sync and async database layers.
+
+CRUD workers create, read, update, list and delete tools from coroutines, the
+way the async endpoints do, while simulated streams tick on the same event
+loop every few milliseconds like an execution relaying output. "sync" runs
+the queries on the blocking Session (how async endpoints used to work),
+"async" on the AsyncSession from get_async_db.
+
+Run from the backend directory, against a throwaway database:
+
+    DATABASE_URL=sqlite:///./benchmark.db python scripts/benchmark_async_db.py
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, select
+
+from app.core.database import AsyncSessionLocal, SessionLocal, async_engine, engine
+from app.models import Base
+from app.models.tool import Tool
+
+STREAM_TICK_SECONDS = 0.005
+
+
+def crud_sync(worker: int, iteration: int) -> None:
+    with SessionLocal() as db:
+        tool = Tool(name=f"bench-{worker}-{iteration}", description="benchmark", tool_type="custom", category="benchmark")
+        db.add(tool)
+        db.commit()
+        db.get(Tool, tool.id)
+        tool.description = "benchmark, updated"
+        db.commit()
+        db.scalars(select(Tool).where(Tool.category == "benchmark").order_by(Tool.id.desc()).limit(50)).all()
+        db.delete(tool)
+        db.commit()
+
+
+async def crud_async(worker: int, iteration: int) -> None:
+    async with AsyncSessionLocal() as db:
+        tool = Tool(name=f"bench-{worker}-{iteration}", description="benchmark", tool_type="custom", category="benchmark")
+        db.add(tool)
+        await db.commit()
+        await db.get(Tool, tool.id)
+        tool.description = "benchmark, updated"
+        await db.commit()
+        (await db.scalars(select(Tool).where(Tool.category == "benchmark").order_by(Tool.id.desc()).limit(50))).all()
+        await db.delete(tool)
+        await db.commit()
+
+
+async def crud_worker(mode: str, worker: int, iterations: int, latencies: list) -> None:
+    for iteration in range(iterations):
+        started = time.perf_counter()
+        if mode == "sync":
+            crud_sync(worker, iteration)
+        else:
+            await crud_async(worker, iteration)
+        latencies.append(time.perf_counter() - started)
+        # Yield like an endpoint returning its response would
+        await asyncio.sleep(0)
+
+
+async def stream(stop: asyncio.Event, ticks: list, lags: list) -> None:
+    loop = asyncio.get_running_loop()
+    count = 0
+    while not stop.is_set():
+        expected = loop.time() + STREAM_TICK_SECONDS
+        await asyncio.sleep(STREAM_TICK_SECONDS)
+        lags.append(max(0.0, loop.time() - expected))
+        count += 1
+    ticks.append(count)
+
+
+async def run(mode: str, workers: int, iterations: int, streams: int) -> dict:
+    latencies: list = []
+    ticks: list = []
+    lags: list = []
+    stop = asyncio.Event()
+    stream_tasks = [asyncio.create_task(stream(stop, ticks, lags)) for _ in range(streams)]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(crud_worker(mode, worker, iterations, latencies) for worker in range(workers)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*stream_tasks)
+
+    latencies.sort()
+    lags.sort()
+    return {
+        "mode": mode,
+        "crud_ops_per_second": len(latencies) / elapsed,
+        "crud_p50_ms": statistics.median(latencies) * 1000,
+        "crud_p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "stream_ticks_per_second": sum(ticks) / elapsed / max(streams, 1),
+        "stream_lag_p99_ms": lags[int(len(lags) * 0.99) - 1] * 1000 if lags else 0.0,
+        "stream_lag_max_ms": lags[-1] * 1000 if lags else 0.0,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    Base.metadata.create_all(bind=engine)
+    for mode in args.modes:
+        result = await run(mode, args.workers, args.iterations, args.streams)
+        print(
+            f"{result['mode']:>5}: {result['crud_ops_per_second']:8.1f} CRUD ops/s "
+            f"(p50 {result['crud_p50_ms']:.1f} ms, p99 {result['crud_p99_ms']:.1f} ms), "
+            f"streams {result['stream_ticks_per_second']:.1f} ticks/s of {1 / STREAM_TICK_SECONDS:.0f} "
+            f"(lag p99 {result['stream_lag_p99_ms']:.1f} ms, max {result['stream_lag_max_ms']:.1f} ms)"
+        )
+    with SessionLocal() as db:
+        db.execute(delete(Tool).where(Tool.category == "benchmark"))
+        db.commit()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=16, help="concurrent CRUD workers")
+    parser.add_argument("--iterations", type=int, default=50, help="CRUD rounds per worker")
+    parser.add_argument("--streams", type=int, default=20, help="simulated execution streams")
+    parser.add_argument("--modes", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    asyncio.run(main(parser.parse_args()))
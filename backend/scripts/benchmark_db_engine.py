@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent write throughput for each database engine profile.
+
+Writer threads append batches of log chunks the way concurrent executions'
+log writers do, each flush in its own short session, while reader threads
+page through the log. Each profile gets a fresh engine (and, for SQLite, a
+fresh database file next to the one in DATABASE_URL).
+
+Run from the backend directory:
+
+    python scripts/benchmark_db_engine.py
+    DATABASE_URL=postgresql://... python scripts/benchmark_db_engine.py --profiles production
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import ENGINE_PROFILES, create_database_engine
+from app.models import Base
+from app.models.execution import Execution
+from app.models.execution_log import ExecutionLogChunk
+
+CHUNK = "🤖 " + "x" * 200 + "\n"
+
+
+def profile_database_url(profile: str) -> str:
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        return settings.DATABASE_URL
+    root, extension = os.path.splitext(url.database)
+    database = f"{root}.benchmark-{profile}{extension or '.db'}"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(database + suffix):
+            os.remove(database + suffix)
+    return url.set(database=database).render_as_string(hide_password=False)
+
+
+def run(profile: str, writers: int, flushes: int, rows_per_flush: int, readers: int) -> dict:
+    engine = create_database_engine(profile_database_url(profile), profile)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        execution_ids = []
+        for _ in range(writers):
+            execution = Execution(process_id=0, status="running")
+            db.add(execution)
+            db.flush()
+            execution_ids.append(execution.id)
+        db.commit()
+
+    latencies: list = []
+    errors = [0]
+    reads = [0]
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def write(execution_id: int) -> None:
+        for flush in range(flushes):
+            rows = [
+                {"execution_id": execution_id, "seq": flush * rows_per_flush + i,
+                 "byte_offset": 0, "byte_size": len(CHUNK.encode()), "content": CHUNK}
+                for i in range(rows_per_flush)
+            ]
+            started = time.perf_counter()
+            try:
+                with Session() as db:
+                    db.execute(insert(ExecutionLogChunk), rows)
+                    db.commit()
+            except OperationalError:
+                with lock:
+                    errors[0] += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    def read() -> None:
+        while not done.is_set():
+            try:
+                with Session() as db:
+                    db.execute(
+                        select(ExecutionLogChunk.content).order_by(ExecutionLogChunk.id.desc()).limit(200)
+                    ).all()
+                with lock:
+                    reads[0] += 1
+            except OperationalError:
+                with lock:
+                    errors[0] += 1
+
+    reader_threads = [threading.Thread(target=read) for _ in range(readers)]
+    writer_threads = [threading.Thread(target=write, args=(execution_id,)) for execution_id in execution_ids]
+    started = time.perf_counter()
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+
+    with Session() as db:
+        db.execute(delete(ExecutionLogChunk).where(ExecutionLogChunk.execution_id.in_(execution_ids)))
+        db.execute(delete(Execution).where(Execution.id.in_(execution_ids)))
+        db.commit()
+    engine.dispose()
+
+    latencies.sort()
+    return {
+        "profile": profile,
+        "flushes_per_second": len(latencies) / elapsed,
+        "rows_per_second": len(latencies) * rows_per_flush / elapsed,
+        "flush_p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "flush_p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+        "reads_per_second": reads[0] / elapsed,
+        "errors": errors[0],
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    print(f"{args.writers} writers x {args.flushes} flushes of {args.rows} rows, {args.readers} readers")
+    for profile in args.profiles:
+        result = run(profile, args.writers, args.flushes, args.rows, args.readers)
+        print(
+            f"{result['profile']:>10}: {result['flushes_per_second']:8.1f} flushes/s "
+            f"({result['rows_per_second']:.0f} rows/s, p50 {result['flush_p50_ms']:.1f} ms, "
+            f"p99 {result['flush_p99_ms']:.1f} ms), {result['reads_per_second']:.1f} reads/s, "
+            f"{result['errors']} failed with a lock error"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=8, help="concurrent log writers")
+    parser.add_argument("--flushes", type=int, default=100, help="flushes per writer")
+    parser.add_argument("--rows", type=int, default=10, help="log chunks per flush")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent log readers")
+    parser.add_argument("--profiles", nargs="+", choices=ENGINE_PROFILES, default=list(reversed(ENGINE_PROFILES)))
+    main(parser.parse_args())
@@ -57,6 +57,10 @@ else
     exit 1
 fi
 
+# Bring the database schema up to date
+echo "🗂️  Migrating database..."
+uv run python scripts/migrate.py || exit 1
+
 # Start the development server
 echo "🌐 Starting development server..."
 echo "   API will be available at: http://localhost:8000"
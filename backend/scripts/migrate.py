@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+Migrate the database at DATABASE_URL to the latest schema.
+
+Run once per deploy, before starting the API and Celery workers. Databases
+created by create_all before migrations existed are adopted automatically.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.migrations import migrate
+
+if __name__ == "__main__":
+    migrate(sys.argv[1] if len(sys.argv) > 1 else "head")
@@ -0,0 +1,45 @@
+import os
+import tempfile
+
+# Settings are read when app.core.config is first imported; point the app at a
+# scratch database and log directory before any test imports it.
+SCRATCH_DIR = tempfile.mkdtemp(prefix="crewui-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(SCRATCH_DIR, 'crewui.db')}"
+os.environ["EXECUTION_LOG_DIR"] = os.path.join(SCRATCH_DIR, "execution_logs")
+os.environ["EXECUTION_BROADCAST_BACKEND"] = "memory"
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.core.database import SessionLocal, engine
+from app.core.migrations import migrate
+from app.models import Base
+
+
+@pytest.fixture(scope="session")
+def migrated_engine():
+    """The app's engine, on a scratch SQLite database migrated to head."""
+    migrate(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def db(migrated_engine):
+    """A session on the migrated database; every table is emptied afterwards."""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(table.delete())
+        session.commit()
+        session.close()
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    """An engine on an empty SQLite database of its own."""
+    database_engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    yield database_engine
+    database_engine.dispose()
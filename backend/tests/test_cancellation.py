@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from app.core.config import settings
+from app.core.crewai_service import EXECUTION_CANCELLED, CrewAIService, ExecutionHandle
+
+
+class IgnoresStop:
+    """Crew whose kickoff never checks for a stop request."""
+
+    def __init__(self):
+        self.started = threading.Event()
+
+    def kickoff(self):
+        self.started.set()
+        while True:
+            time.sleep(0.01)
+
+
+class StopsWhenAsked:
+    """Crew whose kickoff stops at the next step once asked to."""
+
+    def __init__(self, cancel_event):
+        self.started = threading.Event()
+        self.cancel_event = cancel_event
+
+    def kickoff(self):
+        self.started.set()
+        while not self.cancel_event.is_set():
+            time.sleep(0.01)
+        return "partial result"
+
+
+@pytest.fixture
+def service(monkeypatch, migrated_engine):
+    monkeypatch.setattr(settings, "CREW_EXECUTION_BACKEND", "thread")
+    monkeypatch.setattr(settings, "CREW_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "CREW_CANCEL_GRACE_SECONDS", 0.05)
+    service = CrewAIService()
+    yield service
+    service.pool.shutdown()
+
+
+async def start_crew(service, execution_id, make_crew):
+    handle = ExecutionHandle(execution_id=execution_id, queue=asyncio.Queue())
+    handle.cancel_event = service.pool.new_cancel_event()
+    service.executions[execution_id] = handle
+    await service.pool.reserve(execution_id)
+    crew = make_crew(handle)
+    handle.task = asyncio.create_task(service._run_crew(crew, execution_id))
+    await asyncio.to_thread(crew.started.wait, 5)
+    return handle
+
+
+def test_crew_that_stops_cooperatively_is_not_interrupted(service):
+    async def scenario():
+        handle = await start_crew(service, 1, lambda handle: StopsWhenAsked(handle.cancel_event))
+        assert service.cancel_execution(1)
+        await asyncio.wait_for(handle.task, 5)
+        return handle
+
+    handle = asyncio.run(scenario())
+
+    assert not handle.interrupt.interrupted
+    assert service.was_cancelled(1) == "user"
+    assert 1 not in service.executions
+    assert service.pool.metrics()["running"] == 0
+    assert service.pool.metrics()["draining"] == 0
+
+
+def test_crew_that_ignores_stop_is_interrupted_and_frees_its_worker(service):
+    async def scenario():
+        handle = await start_crew(service, 1, lambda handle: IgnoresStop())
+        assert service.cancel_execution(1)
+        # The slot goes to the next execution while the kickoff winds down
+        next_admission = service.pool.reserve(2)
+        assert next_admission.done()
+        await asyncio.wait_for(handle.task, 5)
+        assert service.pool.metrics()["draining"] == 0
+        service.pool.release(2)
+        # Every worker thread is usable again
+        results = await asyncio.gather(*(service.pool.run(sum, [1, 2]) for _ in range(service.pool.worker_count)))
+        return handle, results
+
+    handle, results = asyncio.run(scenario())
+
+    assert handle.interrupt.interrupted
+    assert EXECUTION_CANCELLED in [handle.queue.get_nowait() for _ in range(handle.queue.qsize())]
+    assert results == [3] * service.pool.worker_count
+    assert 1 not in service.executions
+
+
+def test_queued_execution_stops_without_running(service):
+    process = SimpleNamespace(id=1, name="Research")
+
+    async def scenario():
+        await service.pool.reserve(99)  # the only slot is taken
+        stream = service.execute_process(process, execution_id=1)
+        queued = await stream.__anext__()
+        assert service.cancel_execution(1)
+        rest = [line async for line in stream]
+        return queued, rest
+
+    queued, rest = asyncio.run(scenario())
+
+    assert queued.startswith("⏳ Execution queued at position 1")
+    assert rest == ["🛑 Execution stopped while queued\n"]
+    assert service.pool.queue_depth == 0
+    assert 1 not in service.executions
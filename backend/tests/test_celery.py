@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("celery")
+
+from app.celery import _run_execution
+from app.models import Execution
+
+
+@pytest.mark.parametrize("status", ["running", "stopped", "completed", "failed"])
+def test_redelivered_task_leaves_a_started_execution_alone(db, status):
+    # A worker died mid-kickoff (or the task was terminated) and the broker delivered it again
+    execution = Execution(status=status)
+    db.add(execution)
+    db.commit()
+
+    asyncio.run(_run_execution(execution.id, {}, 0))
+
+    db.refresh(execution)
+    assert execution.status == status
+
+
+def test_queued_execution_without_its_process_fails(db):
+    execution = Execution(status="queued", process_id=9999)
+    db.add(execution)
+    db.commit()
+
+    asyncio.run(_run_execution(execution.id, {}, 0))
+
+    db.refresh(execution)
+    assert execution.status == "failed"
+
+
+def test_missing_execution_is_ignored(migrated_engine):
+    asyncio.run(_run_execution(424242, {}, 0))
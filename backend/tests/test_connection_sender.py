@@ -0,0 +1,144 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.connection_sender import ConnectionSender
+
+
+class StalledWebSocket:
+    """Holds every send until released, so the sender's queue fills up."""
+
+    def __init__(self):
+        self.sent = []
+        self.released = asyncio.Event()
+
+    async def send_text(self, text):
+        await self.released.wait()
+        self.sent.append(json.loads(text))
+
+
+def output(seq, text="line\n"):
+    return {"type": "output", "seq": seq, "content": text, "log_offset": (seq - 1) * len(text)}
+
+
+def status(seq):
+    return {"type": "status", "seq": seq}
+
+
+async def stalled_sender(policy, max_queue_size=3):
+    websocket = StalledWebSocket()
+    failures = []
+    sender = ConnectionSender(websocket, max_queue_size, policy, on_failure=failures.append)
+    # The writer task takes the first message and waits in send_text
+    assert sender.enqueue(status(1), None)
+    await asyncio.sleep(0)
+    return sender, websocket
+
+
+async def drain(sender, websocket):
+    websocket.released.set()
+    while sender.queue:
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    sender.close()
+    return [message["seq"] for message in websocket.sent]
+
+
+def test_drop_oldest_drops_output_only():
+    async def scenario():
+        sender, websocket = await stalled_sender("drop_oldest")
+        for message in (status(2), output(3), output(4), output(5)):
+            assert sender.enqueue(message, None)
+        return sender.metrics(), await drain(sender, websocket)
+
+    metrics, sent = asyncio.run(scenario())
+
+    # The status message stays; the client sees seq 3 missing and resumes from 2
+    assert sent == [1, 2, 4, 5]
+    assert metrics["dropped_total"] == 1
+
+
+def test_drop_oldest_disconnects_when_no_output_is_queued():
+    async def scenario():
+        sender, websocket = await stalled_sender("drop_oldest")
+        for seq in (2, 3, 4):
+            assert sender.enqueue(status(seq), None)
+        accepted = sender.enqueue(status(5), None)
+        sender.close()
+        return accepted, sender.metrics()
+
+    accepted, metrics = asyncio.run(scenario())
+
+    assert not accepted
+    assert metrics["dropped_total"] == 0
+
+
+def test_coalesce_merges_output_without_losing_seqs():
+    async def scenario():
+        sender, websocket = await stalled_sender("coalesce")
+        for message in (output(2), output(3), output(4), output(5)):
+            assert sender.enqueue(message, None)
+        queued = [message for message, _ in sender.queue]
+        metrics = sender.metrics()
+        sender.close()
+        return queued, metrics
+
+    queued, metrics = asyncio.run(scenario())
+
+    assert metrics["coalesced_total"] == 2
+    assert metrics["dropped_total"] == 0
+    merged = queued[0]
+    assert (merged["first_seq"], merged["seq"]) == (2, 4)
+    assert merged["content"] == "line\n" * 3
+    assert merged["log_offset"] == output(2)["log_offset"]
+    assert queued[1]["seq"] == 5
+
+
+def test_coalesce_drops_output_when_merging_is_not_enough():
+    async def scenario():
+        sender, websocket = await stalled_sender("coalesce")
+        for message in (output(2), status(3), output(4), status(5)):
+            assert sender.enqueue(message, None)
+        return sender.metrics(), await drain(sender, websocket)
+
+    metrics, sent = asyncio.run(scenario())
+
+    assert sent == [1, 3, 4, 5]
+    assert metrics["dropped_total"] == 1
+
+
+def test_disconnect_policy_refuses_when_full():
+    async def scenario():
+        sender, websocket = await stalled_sender("disconnect")
+        for seq in (2, 3, 4):
+            assert sender.enqueue(output(seq), None)
+        accepted = sender.enqueue(output(5), None)
+        sender.close()
+        return accepted, len(sender.queue)
+
+    assert asyncio.run(scenario()) == (False, 3)
+
+
+def test_unknown_policy_is_rejected():
+    async def scenario():
+        ConnectionSender(StalledWebSocket(), 3, "block", on_failure=lambda websocket: None)
+
+    with pytest.raises(ValueError):
+        asyncio.run(scenario())
+
+
+def test_failed_send_reports_the_connection():
+    class ClosedWebSocket:
+        async def send_text(self, text):
+            raise RuntimeError("connection closed")
+
+    async def scenario():
+        failures = []
+        websocket = ClosedWebSocket()
+        sender = ConnectionSender(websocket, 3, "coalesce", on_failure=failures.append)
+        sender.enqueue(status(1), None)
+        await asyncio.sleep(0)
+        return failures == [websocket]
+
+    assert asyncio.run(scenario())
@@ -0,0 +1,198 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.core import execution_events
+from app.core.config import settings
+from app.core.execution_events import RedisBroadcast, close_broadcast, get_broadcast
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    """A fake Redis server that get_redis() connects to, with the redis backend selected."""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        execution_events.redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.aioredis.FakeRedis(server=server, **kwargs),
+    )
+    monkeypatch.setattr(settings, "EXECUTION_BROADCAST_BACKEND", "redis")
+    yield server
+    asyncio.run(close_broadcast())
+
+
+def stream_messages(server, execution_id):
+    async def read():
+        client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+        try:
+            return await RedisBroadcast(client, 100, 60).subscribe(execution_id).backlog()
+        finally:
+            await client.aclose()
+
+    return asyncio.run(read())
+
+
+def test_publishes_from_consecutive_event_loops(redis_server):
+    # Celery runs every task in its own asyncio.run
+    async def task(execution_id):
+        try:
+            await execution_events.publish_execution_event(execution_id, {"type": "output", "seq": 1})
+        finally:
+            await close_broadcast()
+
+    asyncio.run(task(1))
+    asyncio.run(task(2))
+
+    assert stream_messages(redis_server, 1) == [{"type": "output", "seq": 1}]
+    assert stream_messages(redis_server, 2) == [{"type": "output", "seq": 1}]
+
+
+def test_close_broadcast_starts_over(redis_server):
+    async def backend_and_client():
+        return get_broadcast(), execution_events.get_redis()
+
+    broadcast, client = asyncio.run(backend_and_client())
+    assert broadcast.client is client
+    asyncio.run(close_broadcast())
+    assert execution_events._broadcast is None and execution_events._redis is None
+    assert asyncio.run(backend_and_client())[0] is not broadcast
+
+
+@pytest.fixture
+def redis_broadcast():
+    """A RedisBroadcast on its own fake server, short-blocking so tests don't wait."""
+    server = fakeredis.FakeServer()
+
+    def create():
+        client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+        return RedisBroadcast(client, backlog_size=100, retention_seconds=60, block_ms=50)
+
+    return create
+
+
+def output(seq, text="line\n"):
+    return {"type": "output", "seq": seq, "data": text}
+
+
+def test_late_subscriber_gets_backlog_then_live_messages(redis_broadcast):
+    async def scenario():
+        broadcast = redis_broadcast()
+        for seq in range(1, 4):
+            await broadcast.publish(7, output(seq))
+
+        subscription = broadcast.subscribe(7)
+        backlog = await subscription.backlog()
+        await broadcast.publish(7, output(4))
+        await broadcast.publish(7, {"type": "execution_completed", "seq": 5})
+        live = [message async for message in subscription]
+        await broadcast.close()
+        return backlog, live
+
+    backlog, live = asyncio.run(scenario())
+
+    assert [message["seq"] for message in backlog] == [1, 2, 3]
+    assert [message["seq"] for message in live] == [4, 5]
+
+
+def test_subscriber_to_finished_execution_gets_backlog_only(redis_broadcast):
+    async def scenario():
+        broadcast = redis_broadcast()
+        await broadcast.publish(7, output(1))
+        await broadcast.publish(7, {"type": "execution_stopped", "seq": 2})
+        subscription = broadcast.subscribe(7)
+        backlog = await subscription.backlog()
+        live = [message async for message in subscription]
+        await broadcast.close()
+        return backlog, live
+
+    backlog, live = asyncio.run(scenario())
+
+    assert [message["type"] for message in backlog] == ["output", "execution_stopped"]
+    assert live == []
+
+
+def test_stream_expires_after_retention_finished_or_not(redis_broadcast):
+    async def scenario():
+        broadcast = redis_broadcast()
+        await broadcast.publish(7, output(1))
+        running_ttl = await broadcast.client.ttl(execution_events.channel_name(7))
+        await broadcast.publish(7, {"type": "execution_completed", "seq": 2})
+        finished_ttl = await broadcast.client.ttl(execution_events.channel_name(7))
+        recent = await broadcast.recent_messages(7)
+        await broadcast.close()
+        return running_ttl, finished_ttl, recent
+
+    running_ttl, finished_ttl, recent = asyncio.run(scenario())
+
+    # An execution whose worker died mid-run doesn't leave its stream behind
+    assert 0 < running_ttl <= 60
+    assert 0 < finished_ttl <= 60
+    assert [message["seq"] for message in recent] == [1, 2]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_in_memory_backlog_drops_messages_older_than_retention():
+    clock = FakeClock()
+
+    async def scenario():
+        broadcast = execution_events.InMemoryBroadcast(backlog_size=100, retention_seconds=60, clock=clock)
+        await broadcast.publish(7, output(1))
+        clock.now += 30
+        await broadcast.publish(7, output(2))
+        clock.now += 40
+        recent = await broadcast.recent_messages(7)
+        clock.now += 30
+        return recent, await broadcast.subscribe(7).backlog(), broadcast.backlogs
+
+    recent, backlog, backlogs = asyncio.run(scenario())
+
+    assert [message["seq"] for message in recent] == [2]
+    assert backlog == []
+    assert backlogs == {}
+
+
+def test_in_memory_backlog_of_unfinished_execution_is_swept():
+    # No terminal message ever comes, and nobody reads the backlog again
+    clock = FakeClock()
+
+    async def scenario():
+        broadcast = execution_events.InMemoryBroadcast(backlog_size=100, retention_seconds=60, clock=clock)
+        await broadcast.publish(7, output(1))
+        clock.now += 61
+        await broadcast.publish(8, output(1))
+        return broadcast.backlogs
+
+    assert list(asyncio.run(scenario())) == [8]
+
+
+def test_control_messages_across_event_loops(redis_server):
+    async def round_trip(execution_id):
+        broadcast = get_broadcast()
+        messages = broadcast.control_messages()
+        receive = asyncio.ensure_future(messages.__anext__())
+
+        async def subscribed():
+            while (await broadcast.client.pubsub_numsub(execution_events.CONTROL_CHANNEL))[0][1] == 0:
+                await asyncio.sleep(0.01)
+
+        try:
+            # Publish once the listener has subscribed
+            await asyncio.wait_for(subscribed(), 1)
+            await broadcast.publish_control({"type": "stop_execution", "execution_id": execution_id})
+            return await asyncio.wait_for(receive, 1)
+        finally:
+            receive.cancel()
+            await asyncio.gather(receive, return_exceptions=True)
+            await messages.aclose()
+            await close_broadcast()
+
+    assert asyncio.run(round_trip(1)) == {"type": "stop_execution", "execution_id": 1}
+    assert asyncio.run(round_trip(2)) == {"type": "stop_execution", "execution_id": 2}
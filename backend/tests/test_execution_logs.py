@@ -0,0 +1,226 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.execution_logs import (
+    ExecutionLogBuffer,
+    ExecutionLogWriter,
+    append_log,
+    archive_log,
+    assemble_console_log,
+    parse_byte_range,
+    read_log_range,
+    read_log_text,
+    tail_log,
+)
+from app.models import Execution
+from app.models.execution_log import ExecutionLogChunk
+
+
+@pytest.fixture
+def execution(db):
+    execution = Execution(status="running")
+    db.add(execution)
+    db.commit()
+    return execution
+
+
+def stored_chunks(db, execution_id):
+    return (
+        db.query(ExecutionLogChunk.seq, ExecutionLogChunk.byte_offset, ExecutionLogChunk.byte_size)
+        .filter(ExecutionLogChunk.execution_id == execution_id)
+        .order_by(ExecutionLogChunk.seq)
+        .all()
+    )
+
+
+def assert_contiguous(db, execution_id, first_offset=0):
+    chunks = stored_chunks(db, execution_id)
+    assert [chunk.seq for chunk in chunks] == list(range(len(chunks)))
+    offset = first_offset
+    for chunk in chunks:
+        assert chunk.byte_offset == offset
+        offset += chunk.byte_size
+
+
+def test_append_log_numbers_chunks_and_offsets(db, execution):
+    append_log(db, execution.id, "first line\n")
+    append_log(db, execution.id, "zweite Zeile – ü\n")
+    append_log(db, execution.id, "third\n")
+
+    assert assemble_console_log(db, execution) == "first line\nzweite Zeile – ü\nthird\n"
+    assert_contiguous(db, execution.id)
+    assert read_log_range(db, execution, 0, 5) == b"first"
+
+
+def test_chunk_seq_is_unique(db, execution):
+    append_log(db, execution.id, "one\n")
+    with pytest.raises(IntegrityError):
+        buffer = ExecutionLogBuffer(execution.id)
+        buffer.append("same seq\n")
+        buffer.flush(db)
+    db.rollback()
+
+
+def test_append_log_goes_through_the_live_writer(db, execution):
+    async def stream():
+        writer = await ExecutionLogWriter.start(execution.id)
+        writer.write("kickoff\n")
+        append_log(db, execution.id, "interjection\n")
+        writer.write("more output\n")
+        await writer.close()
+        append_log(db, execution.id, "after close\n")
+
+    asyncio.run(stream())
+
+    db.expire_all()
+    assert assemble_console_log(db, execution) == "kickoff\ninterjection\nmore output\nafter close\n"
+    assert_contiguous(db, execution.id)
+
+
+def test_append_log_from_another_thread_goes_through_the_live_writer(db, execution):
+    def append_in_thread():
+        thread_db = SessionLocal()
+        try:
+            append_log(thread_db, execution.id, "from a thread\n")
+        finally:
+            thread_db.close()
+
+    async def stream():
+        writer = await ExecutionLogWriter.start(execution.id)
+        writer.write("kickoff\n")
+        await asyncio.to_thread(append_in_thread)
+        await asyncio.sleep(0)
+        writer.write("done\n")
+        await writer.close()
+
+    asyncio.run(stream())
+
+    db.expire_all()
+    assert assemble_console_log(db, execution) == "kickoff\nfrom a thread\ndone\n"
+    assert_contiguous(db, execution.id)
+
+
+def test_writer_continues_after_chunks_appended_elsewhere(db, execution):
+    async def stream():
+        writer = await ExecutionLogWriter.start(execution.id)
+        writer.write("worker output\n")
+        # Another process appends to the log before the writer's first flush
+        other = SessionLocal()
+        try:
+            buffer = ExecutionLogBuffer.resume(other, execution.id)
+            buffer.append("stopped elsewhere\n")
+            buffer.flush(other)
+        finally:
+            other.close()
+        await writer.close()
+
+    asyncio.run(stream())
+
+    db.expire_all()
+    assert assemble_console_log(db, execution) == "stopped elsewhere\nworker output\n"
+    assert_contiguous(db, execution.id)
+
+
+def test_archive_keeps_the_log_readable(db, execution):
+    for line in range(50):
+        append_log(db, execution.id, f"line {line}\n")
+    full_log = assemble_console_log(db, execution)
+
+    archive = archive_log(db, execution.id)
+
+    assert archive is not None
+    assert os.path.dirname(os.path.join(settings.EXECUTION_LOG_DIR, archive.path)) == settings.EXECUTION_LOG_DIR
+    assert archive.original_size == len(full_log.encode("utf-8"))
+    assert stored_chunks(db, execution.id) == []
+    assert assemble_console_log(db, execution) == full_log
+
+    append_log(db, execution.id, "after the archive\n")
+    assert_contiguous(db, execution.id, first_offset=archive.original_size)
+    assert tail_log(db, execution, 2)[1] == "line 49\nafter the archive\n"
+    offset = archive.original_size - len("line 49\n")
+    assert read_log_text(db, execution, offset, 100)[3] == "line 49\nafter the archive\n"
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=90-", (90, 99)),  # open-ended
+    ("bytes=-10", (90, 99)),  # suffix
+    ("bytes=-500", (0, 99)),  # suffix longer than the log
+    ("bytes=95-500", (95, 99)),  # end past EOF is clamped
+    ("BYTES = 5-5", (5, 5)),
+])
+def test_byte_range(header, expected):
+    assert parse_byte_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header", [
+    "bytes=0-9,20-29",  # multiple ranges get the whole log
+    "lines=0-9",
+    "bytes=9-0",
+    "bytes=-0",
+    "bytes=abc",
+    "bytes=5",
+])
+def test_unserved_byte_range_sends_the_whole_log(header):
+    assert parse_byte_range(header, 100) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=150-200"])
+def test_byte_range_past_the_end_is_a_416(header):
+    with pytest.raises(HTTPException) as error:
+        parse_byte_range(header, 100)
+    assert error.value.status_code == 416
+    assert error.value.headers["Content-Range"] == "bytes */100"
+
+
+def test_range_across_chunks(db, execution):
+    for content in ("alpha\n", "beta\n", "gamma\n"):
+        append_log(db, execution.id, content)
+
+    assert read_log_range(db, execution, 3, 9) == b"ha\nbet"
+    assert read_log_range(db, execution, 6, 11) == b"beta\n"
+    assert read_log_range(db, execution, 0, 100) == b"alpha\nbeta\ngamma\n"
+
+
+def test_range_across_the_archive_boundary(db, execution):
+    append_log(db, execution.id, "archived ü\n")
+    archive = archive_log(db, execution.id)
+    append_log(db, execution.id, "live\n")
+    append_log(db, execution.id, "more\n")
+    full_log = "archived ü\nlive\nmore\n".encode("utf-8")
+    size = archive.original_size
+
+    assert read_log_range(db, execution, size - 3, size + 2) == full_log[size - 3:size + 2]
+    assert read_log_range(db, execution, 0, len(full_log)) == full_log
+    assert read_log_range(db, execution, size + 3, size + 7) == full_log[size + 3:size + 7]
+    # A suffix range of the whole log, as the endpoint serves it
+    start, end = parse_byte_range("bytes=-8", len(full_log))
+    assert read_log_range(db, execution, start, end + 1) == full_log[-8:]
+
+
+def test_raw_log_endpoint_answers_ranges(db, execution):
+    pytest.importorskip("crewai")
+    from fastapi.testclient import TestClient
+
+    from main import app
+
+    append_log(db, execution.id, "0123456789\n")
+    client = TestClient(app)
+    url = f"/api/v1/executions/{execution.id}/log/raw"
+
+    partial = client.get(url, headers={"Range": "bytes=-4"})
+    assert partial.status_code == 206
+    assert partial.headers["Content-Range"] == "bytes 7-10/11"
+    assert partial.content == b"789\n"
+
+    whole = client.get(url, headers={"Range": "bytes=0-1,4-5"})
+    assert whole.status_code == 200
+    assert whole.content == b"0123456789\n"
+
+    assert client.get(url, headers={"Range": "bytes=11-"}).status_code == 416
@@ -0,0 +1,128 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+
+from app.core import execution_plans
+from app.core.execution_plans import ExecutionPlanCache
+from app.models import Agent, Process, Task, Tool
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """A fresh cache that the ORM event listeners invalidate."""
+    cache = ExecutionPlanCache(max_size=8)
+    monkeypatch.setattr(execution_plans, "plan_cache", cache)
+    return cache
+
+
+def add_process(db, name="Research", goal="Research {{topic}}", description="Write about {{topic}} for {{audience}}"):
+    tool = Tool(name=f"{name} search", description="search", tool_type="builtin", category="web_search")
+    db.add(tool)
+    db.flush()
+    agent = Agent(name=f"{name} agent", role="Researcher", goal=goal, backstory="backstory", tools=[tool.id])
+    task = Task(name=f"{name} task", description=description, expected_output="A report")
+    db.add_all([agent, task])
+    db.flush()
+    process = Process(
+        name=name,
+        process_type="sequential",
+        configuration={"steps": [{"agent_id": agent.id, "task_id": task.id}]},
+    )
+    db.add(process)
+    db.commit()
+    return process, agent, task, tool
+
+
+def cached(cache, db, process):
+    return cache.get(db, process)[1]
+
+
+@pytest.mark.parametrize("edit", [
+    lambda agent, task, tool: setattr(agent, "goal", "Research {{topic}} in depth"),
+    lambda agent, task, tool: setattr(task, "expected_output", "A short report"),
+    lambda agent, task, tool: setattr(tool, "description", "web search"),
+], ids=["agent", "task", "tool"])
+def test_editing_a_referenced_row_drops_the_plan(db, cache, edit):
+    process, agent, task, tool = add_process(db)
+    other = add_process(db, name="Other")[0]
+    cache.get(db, process)
+    cache.get(db, other)
+
+    edit(agent, task, tool)
+    db.commit()
+
+    assert not cached(cache, db, process)
+    # Plans that don't use the row stay
+    assert cached(cache, db, other)
+    assert cache.metrics()["invalidations"] == 1
+
+
+def test_deleting_a_referenced_row_drops_the_plan(db, cache):
+    process, agent, task, tool = add_process(db)
+    cache.get(db, process)
+
+    db.delete(tool)
+    db.commit()
+
+    assert not cached(cache, db, process)
+
+
+def test_recompiled_plan_sees_the_edit(db, cache):
+    process, agent, task, tool = add_process(db)
+    cache.get(db, process)
+
+    agent.goal = "Summarize {{topic}}"
+    db.commit()
+
+    plan, was_cached = cache.get(db, process)
+    assert not was_cached
+    assert plan.resolved.agents[agent.id].goal == "Summarize {{topic}}"
+
+
+def test_process_update_changes_the_key(db, cache):
+    process = add_process(db)[0]
+    first = cache.get(db, process)[0]
+
+    # Written past the ORM, as by another worker, so only the key can tell
+    db.execute(update(Process).where(Process.id == process.id).values(updated_at=datetime(2030, 1, 1)))
+    db.commit()
+    db.refresh(process)
+
+    second, was_cached = cache.get(db, process)
+    assert not was_cached
+    assert second.version != first.version
+
+
+def test_least_recently_used_plan_is_evicted(db, monkeypatch):
+    cache = ExecutionPlanCache(max_size=2)
+    monkeypatch.setattr(execution_plans, "plan_cache", cache)
+    first, second, third = (add_process(db, name=name)[0] for name in ("First", "Second", "Third"))
+
+    cache.get(db, first)
+    cache.get(db, second)
+    cache.get(db, first)  # second is now the least recently used
+    cache.get(db, third)
+
+    assert cache.metrics()["size"] == 2
+    assert cached(cache, db, first)
+    assert cached(cache, db, third)
+    assert not cached(cache, db, second)
+
+
+def test_zero_size_disables_caching(db, monkeypatch):
+    cache = ExecutionPlanCache(max_size=0)
+    monkeypatch.setattr(execution_plans, "plan_cache", cache)
+    process = add_process(db)[0]
+    cache.get(db, process)
+    assert not cached(cache, db, process)
+    assert cache.metrics()["size"] == 0
+
+
+def test_plan_lists_the_variables_its_texts_use(db, cache):
+    process = add_process(db)[0]
+    plan = cache.get(db, process)[0]
+
+    assert plan.variable_names == {"topic", "audience"}
+    # What execute_process reports as missing
+    assert plan.variable_names.difference({"topic": "AI"}) == {"audience"}
@@ -0,0 +1,237 @@
+import asyncio
+import concurrent.futures
+import os
+import random
+import sys
+import threading
+import time
+
+import pytest
+
+from app.core.execution_pool import CrewExecutionPool, ExecutionPoolFull, ThreadInterrupt, WorkerCrashed
+
+
+@pytest.fixture
+def pool():
+    pool = CrewExecutionPool(max_concurrency=2, max_queue_size=3)
+    yield pool
+    pool.shutdown()
+
+
+def test_admits_up_to_max_concurrency_then_queues(pool):
+    async def scenario():
+        first, second, third = pool.reserve(1), pool.reserve(2), pool.reserve(3)
+        assert first.done() and second.done()
+        assert not third.done()
+        assert pool.queue_position(3) == 1
+        assert pool.can_admit()
+
+        pool.release(1)
+        assert third.done()
+        assert pool.queue_position(3) is None
+        return pool.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert metrics["running"] == 2
+    assert metrics["admitted_total"] == 3
+
+
+def test_queue_is_ordered_by_priority_then_arrival(pool):
+    async def scenario():
+        pool.reserve(1)
+        pool.reserve(2)
+        low = pool.reserve(3, priority=0)
+        high = pool.reserve(4, priority=5)
+        later_low = pool.reserve(5, priority=0)
+        assert [pool.queue_position(execution_id) for execution_id in (4, 3, 5)] == [1, 2, 3]
+
+        pool.release(1)
+        assert high.done() and not low.done()
+        pool.release(2)
+        assert low.done() and not later_low.done()
+
+    asyncio.run(scenario())
+
+
+def test_rejects_when_queue_is_full(pool):
+    async def scenario():
+        for execution_id in range(1, 6):
+            pool.reserve(execution_id)
+        assert not pool.can_admit()
+        with pytest.raises(ExecutionPoolFull):
+            pool.reserve(6)
+        assert pool.metrics()["rejected_total"] == 1
+
+        # Leaving the queue makes room again
+        pool.release(5)
+        assert pool.can_admit()
+        pool.reserve(6)
+
+    asyncio.run(scenario())
+
+
+def test_releasing_a_queued_execution_cancels_its_admission(pool):
+    async def scenario():
+        pool.reserve(1)
+        pool.reserve(2)
+        queued = pool.reserve(3)
+        pool.release(3)
+        assert queued.cancelled()
+        assert pool.queue_depth == 0
+
+    asyncio.run(scenario())
+
+
+def test_abandoned_execution_frees_its_slot_but_keeps_a_worker(pool):
+    async def scenario():
+        pool.reserve(1)
+        pool.reserve(2)
+        waiting = [pool.reserve(execution_id) for execution_id in (3, 4, 5)]
+
+        pool.abandon(1)
+        assert waiting[0].done()
+        assert pool.metrics()["draining"] == 1
+        pool.abandon(2)
+        assert waiting[1].done()
+
+        # Both slots run new executions while two kickoffs still wind down, so
+        # all four workers are taken and nothing else is admitted
+        pool.abandon(3)
+        assert pool.metrics()["draining"] == 3
+        assert not waiting[2].done()
+
+        pool.release(1)
+        assert waiting[2].done()
+        return pool.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert metrics["running"] == 2
+    assert metrics["draining"] == 2
+    assert metrics["abandoned_total"] == 3
+
+
+def test_run_uses_the_shared_executor(pool):
+    async def scenario():
+        return await pool.run(sum, [1, 2, 3])
+
+    assert asyncio.run(scenario()) == 6
+
+
+class Interrupted(Exception):
+    pass
+
+
+def test_interrupt_raises_in_the_running_kickoff():
+    interrupt = ThreadInterrupt()
+    started = threading.Event()
+
+    def kickoff():
+        with interrupt.running():
+            started.set()
+            while True:
+                time.sleep(0.01)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(kickoff)
+        started.wait()
+        assert interrupt.interrupt(Interrupted)
+        with pytest.raises(Interrupted):
+            future.result(timeout=5)
+        # Only once per kickoff
+        assert not interrupt.interrupt(Interrupted)
+
+
+def test_interrupt_never_reaches_the_threads_next_job():
+    # One thread, so every next job runs where the interrupted kickoff ran
+    previous_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            for attempt in range(300):
+                interrupt = ThreadInterrupt()
+                started = threading.Event()
+
+                def kickoff(steps=random.randint(0, 3000)):
+                    with interrupt.running():
+                        started.set()
+                        for _ in range(steps):
+                            pass
+
+                def next_job():
+                    return sum(1 for _ in range(2000))
+
+                kickoff_future = executor.submit(kickoff)
+                started.wait()
+                # Land the interrupt around the moment the kickoff returns
+                for _ in range(random.randint(0, 3000)):
+                    pass
+                interrupt.interrupt(Interrupted)
+                try:
+                    kickoff_future.result()
+                except Interrupted:
+                    pass
+                assert executor.submit(next_job).result() == 2000
+                assert not interrupt.interrupt(Interrupted)
+    finally:
+        sys.setswitchinterval(previous_interval)
+
+
+# Worker process functions; module level so spawned workers can import them
+def echo_lines(lines, channel):
+    for line in lines:
+        channel.put(line)
+    channel.put(None)
+    return len(lines)
+
+
+def wait_for_stop(cancel_event, channel):
+    channel.put("started")
+    while not cancel_event.wait(0.05):
+        pass
+    channel.put(None)
+    return "stopped"
+
+
+def crash(channel):
+    os._exit(1)
+
+
+@pytest.fixture
+def process_pool():
+    pool = CrewExecutionPool(max_concurrency=1, max_queue_size=1, backend="process")
+    yield pool
+    pool.shutdown()
+
+
+def test_process_backend_relays_output(process_pool):
+    async def scenario():
+        output = []
+        result = await process_pool.run_in_process(echo_lines, ["one\n", "two\n"], on_output=output.append)
+        await asyncio.sleep(0)
+        return result, output
+
+    assert asyncio.run(scenario()) == (2, ["one\n", "two\n"])
+
+
+def test_process_backend_stops_on_cancel_event(process_pool):
+    async def scenario():
+        cancel_event = process_pool.new_cancel_event()
+        started = asyncio.Event()
+        run = asyncio.ensure_future(
+            process_pool.run_in_process(wait_for_stop, cancel_event, on_output=lambda item: started.set())
+        )
+        await asyncio.wait_for(started.wait(), 30)
+        cancel_event.set()
+        return await asyncio.wait_for(run, 30)
+
+    assert asyncio.run(scenario()) == "stopped"
+
+
+def test_crashed_worker_process_is_replaced(process_pool):
+    async def scenario():
+        with pytest.raises(WorkerCrashed):
+            await process_pool.run_in_process(crash, on_output=lambda item: None)
+        return await process_pool.run_in_process(echo_lines, ["after\n"], on_output=lambda item: None)
+
+    assert asyncio.run(scenario()) == 1
+    assert process_pool.metrics()["worker_crashes_total"] == 1
@@ -0,0 +1,177 @@
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    inspect,
+    select,
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.core.execution_logs import append_log, assemble_console_log
+from app.core.migrations import migrate, schema_is_current
+from app.core.search import is_search_object
+from app.models import Base, Execution, Process
+
+# The models as main.py created them with create_all before migrations existed
+legacy_metadata = MetaData()
+Table(
+    "agents", legacy_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(255), nullable=False),
+    Column("role", Text, nullable=False),
+    Column("goal", Text, nullable=False),
+    Column("backstory", Text, nullable=False),
+    Column("tools", JSON),
+    Column("llm_config", JSON),
+    Column("additional_params", JSON),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+)
+Table(
+    "tasks", legacy_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(255), nullable=False),
+    Column("description", Text, nullable=False),
+    Column("expected_output", Text, nullable=False),
+    Column("tools", JSON),
+    Column("context", JSON),
+    Column("additional_params", JSON),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+)
+Table(
+    "processes", legacy_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(255), nullable=False),
+    Column("description", Text),
+    Column("process_type", String(50), nullable=False),
+    Column("configuration", JSON, nullable=False),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+)
+Table(
+    "executions", legacy_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("process_id", Integer, ForeignKey("processes.id")),
+    Column("status", String(50), nullable=False),
+    Column("output_path", String(500)),
+    Column("console_log", Text),
+    Column("started_at", DateTime(timezone=True), server_default=func.now()),
+    Column("completed_at", DateTime(timezone=True)),
+)
+Table(
+    "tools", legacy_metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(255), nullable=False, unique=True),
+    Column("description", Text, nullable=False),
+    Column("tool_type", String(50), nullable=False),
+    Column("category", String(100), nullable=False),
+    Column("langchain_tool_name", String(255)),
+    Column("langchain_params", JSON),
+    Column("crewai_tool_name", String(255)),
+    Column("crewai_params", JSON),
+    Column("python_code", Text),
+    Column("custom_params", JSON),
+    Column("is_active", Boolean),
+    Column("requires_api_key", Boolean),
+    Column("api_key_name", String(100)),
+    Column("tags", JSON),
+    Column("version", String(20)),
+    Column("author", String(255)),
+    Column("created_at", DateTime(timezone=True), server_default=func.now()),
+    Column("updated_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def schema_differences(database_engine):
+    """What autogenerate would still change to match the models."""
+    with database_engine.connect() as connection:
+        context = MigrationContext.configure(connection)
+        return [
+            difference
+            for difference in compare_metadata(context, Base.metadata)
+            if not any(is_search_object(getattr(item, "name", None)) for item in difference[1:2])
+        ]
+
+
+def assert_matches_models(database_engine):
+    inspector = inspect(database_engine)
+    assert set(Base.metadata.tables) <= set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        assert {index.name for index in table.indexes} <= existing, table.name
+    assert schema_differences(database_engine) == []
+    assert schema_is_current(database_engine)
+
+
+def test_migrates_empty_database(sqlite_engine):
+    migrate(bind=sqlite_engine)
+    assert_matches_models(sqlite_engine)
+
+
+def test_upgrades_database_created_by_old_create_all(sqlite_engine):
+    legacy_metadata.create_all(sqlite_engine)
+    with sqlite_engine.begin() as connection:
+        connection.execute(
+            legacy_metadata.tables["processes"].insert(),
+            {"id": 1, "name": "Research", "process_type": "sequential", "configuration": {}},
+        )
+        connection.execute(
+            legacy_metadata.tables["executions"].insert(),
+            {"id": 1, "process_id": 1, "status": "completed", "console_log": "old log\n"},
+        )
+    assert not schema_is_current(sqlite_engine)
+
+    migrate(bind=sqlite_engine)
+
+    assert_matches_models(sqlite_engine)
+    with Session(sqlite_engine) as db:
+        assert db.get(Process, 1).name == "Research"
+        append_log(db, 1, "appended after the upgrade\n")
+        assert assemble_console_log(db, db.get(Execution, 1)) == "old log\nappended after the upgrade\n"
+
+
+def test_upgrades_database_created_by_current_create_all(sqlite_engine):
+    Base.metadata.create_all(sqlite_engine)
+    migrate(bind=sqlite_engine)
+    assert_matches_models(sqlite_engine)
+
+
+def test_refuses_to_stamp_unknown_schema(sqlite_engine):
+    legacy_metadata.tables["agents"].create(sqlite_engine)
+    with pytest.raises(RuntimeError, match="missing tables"):
+        migrate(bind=sqlite_engine)
+
+
+def test_renumbers_duplicate_log_chunk_seqs(sqlite_engine):
+    migrate("0a6985a12360", bind=sqlite_engine)
+    chunks = Base.metadata.tables["execution_log_chunks"]
+    with sqlite_engine.begin() as connection:
+        connection.execute(Base.metadata.tables["executions"].insert(), {"id": 1, "status": "completed"})
+        # Two writers that both continued from seq 1
+        connection.execute(chunks.insert(), [
+            {"execution_id": 1, "seq": 0, "byte_offset": 0, "byte_size": 2, "content": "a\n"},
+            {"execution_id": 1, "seq": 1, "byte_offset": 2, "byte_size": 2, "content": "b\n"},
+            {"execution_id": 1, "seq": 1, "byte_offset": 2, "byte_size": 3, "content": "cc\n"},
+            {"execution_id": 1, "seq": 2, "byte_offset": 4, "byte_size": 2, "content": "d\n"},
+        ])
+
+    migrate(bind=sqlite_engine)
+
+    assert_matches_models(sqlite_engine)
+    with sqlite_engine.connect() as connection:
+        rows = connection.execute(
+            select(chunks.c.seq, chunks.c.byte_offset, chunks.c.content).order_by(chunks.c.seq)
+        ).all()
+    assert rows == [(0, 0, "a\n"), (1, 2, "b\n"), (2, 4, "cc\n"), (3, 7, "d\n")]
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from app.core.output_batching import OutputBatcher, batch_chunks, merge_output_messages
+
+
+def test_batcher_sends_the_first_chunk_after_a_quiet_period_at_once():
+    batcher = OutputBatcher(window_ms=100, max_bytes=1024)
+    # Nothing sent yet
+    assert batcher.delay(now=10.0) == 0.0
+    batcher.sent(now=10.0)
+    # Output right behind it waits for the rest of the window
+    assert batcher.delay(now=10.03) == pytest.approx(0.07)
+    # After a quiet period it goes out at once again
+    assert batcher.delay(now=10.5) == 0.0
+
+
+def test_batcher_with_no_window_never_holds_output():
+    batcher = OutputBatcher(window_ms=0, max_bytes=1024)
+    batcher.sent(now=10.0)
+    assert not batcher.enabled
+    assert batcher.delay(now=10.0) == 0.0
+
+
+def output(seq, content, log_offset):
+    return {"type": "output", "seq": seq, "content": content, "log_offset": log_offset}
+
+
+def test_merged_output_keeps_the_first_offset_and_the_last_seq():
+    merged = merge_output_messages([
+        output(1, "one\n", 0),
+        output(2, "two\n", 4),
+        output(3, "three\n", 8),
+        {"type": "status", "seq": 4},
+        output(5, "four\n", 14),
+    ])
+
+    assert merged == [
+        {"type": "output", "seq": 3, "first_seq": 1, "content": "one\ntwo\nthree\n", "log_offset": 0},
+        {"type": "status", "seq": 4},
+        output(5, "four\n", 14),
+    ]
+
+
+def test_merge_splits_runs_at_max_bytes():
+    merged = merge_output_messages([output(seq, "12345", seq * 5) for seq in range(4)], max_bytes=10)
+    assert [(message["first_seq"], message["seq"], message["content"]) for message in merged] == [
+        (0, 1, "1234512345"),
+        (2, 3, "1234512345"),
+    ]
+
+
+def test_merge_skips_emptied_chunks_for_the_offset():
+    # Output the client already has is sent without content
+    merged = merge_output_messages([output(1, "", 0), output(2, "new\n", 4)])
+    assert merged == [{"type": "output", "seq": 2, "first_seq": 1, "content": "new\n", "log_offset": 4}]
+
+
+class Source:
+    """Chunks handed to batch_chunks one at a time by the test."""
+
+    def __init__(self):
+        self.queue = asyncio.Queue()
+
+    async def chunks(self):
+        while (chunk := await self.queue.get()) is not None:
+            yield chunk
+
+
+async def next_batch(batches, timeout=1):
+    return await asyncio.wait_for(batches.__anext__(), timeout)
+
+
+def test_batch_chunks_flushes_first_chunk_then_by_window():
+    async def scenario():
+        source = Source()
+        batches = batch_chunks(source.chunks(), window_ms=10_000, max_bytes=1024)
+        source.queue.put_nowait("first\n")
+        first = await next_batch(batches)
+
+        source.queue.put_nowait("second\n")
+        # Held back: it arrived within the window of the first batch
+        pending = asyncio.ensure_future(batches.__anext__())
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(asyncio.shield(pending), 0.05)
+        source.queue.put_nowait("third\n")
+        source.queue.put_nowait(None)
+        second = await asyncio.wait_for(pending, 1)
+        with pytest.raises(StopAsyncIteration):
+            await next_batch(batches)
+        return first, second
+
+    # The end of the source flushes what's held without waiting out the window
+    assert asyncio.run(scenario()) == ("first\n", "second\nthird\n")
+
+
+def test_batch_chunks_flushes_at_max_bytes():
+    async def scenario():
+        source = Source()
+        batches = batch_chunks(source.chunks(), window_ms=10_000, max_bytes=8)
+        source.queue.put_nowait("first\n")
+        first = await next_batch(batches)
+        for chunk in ("abcd", "efgh", "ijkl"):
+            source.queue.put_nowait(chunk)
+        # Sent once 8 bytes have built up, well within the window
+        second = await next_batch(batches)
+        source.queue.put_nowait(None)
+        rest = [batch async for batch in batches]
+        return first, second, rest
+
+    assert asyncio.run(scenario()) == ("first\n", "abcdefgh", ["ijkl"])
+
+
+def test_batch_chunks_passes_chunks_through_without_a_window():
+    async def scenario():
+        source = Source()
+        for chunk in ("a", "b", None):
+            source.queue.put_nowait(chunk)
+        return [batch async for batch in batch_chunks(source.chunks(), window_ms=0, max_bytes=1024)]
+
+    assert asyncio.run(scenario()) == ["a", "b"]
+
+
+def test_batch_chunks_surfaces_source_errors():
+    async def failing():
+        yield "partial\n"
+        raise RuntimeError("crew failed")
+
+    async def scenario():
+        return [batch async for batch in batch_chunks(failing(), window_ms=10_000, max_bytes=1024)]
+
+    with pytest.raises(RuntimeError, match="crew failed"):
+        asyncio.run(scenario())
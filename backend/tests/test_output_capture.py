@@ -0,0 +1,92 @@
+import asyncio
+import sys
+import threading
+
+import pytest
+
+from app.core.output_capture import LineStreamSink, LineWriter, OutputDemultiplexer, capture_output
+
+
+class ListSink(LineWriter):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.lines = []
+
+    def _deliver(self, line: str) -> None:
+        self.lines.append(line)
+
+
+@pytest.fixture(autouse=True)
+def restore_streams(monkeypatch):
+    # capture_output installs the demultiplexers on sys.stdout/sys.stderr
+    monkeypatch.setattr(sys, "stdout", sys.stdout)
+    monkeypatch.setattr(sys, "stderr", sys.stderr)
+
+
+def test_line_writer_requires_deliver():
+    with pytest.raises(TypeError, match="_deliver"):
+        LineWriter()
+
+
+def test_line_writer_delivers_complete_lines():
+    sink = ListSink(prefix="[crew] ", max_line_length=8)
+    sink.write("first li")
+    assert sink.lines == ["[crew] first li\n"]
+    sink.write("ne\n\n   \nsecond\nthi")
+    assert sink.lines == ["[crew] first li\n", "[crew] ne\n", "[crew] second\n"]
+    sink.close()
+    assert sink.lines[-1] == "[crew] thi\n"
+    assert sink.lines_emitted == 4
+
+
+def test_concurrent_captures_stay_separate():
+    sinks = {name: ListSink() for name in ("a", "b")}
+    errors = {name: ListSink() for name in ("a", "b")}
+    # Both threads write inside their captures at the same time, step by step
+    barrier = threading.Barrier(2)
+
+    def crew(name):
+        with capture_output(stdout=sinks[name], stderr=errors[name]):
+            for step in range(50):
+                barrier.wait()
+                print(f"{name} step {step}")
+                print(f"{name} warning {step}", file=sys.stderr)
+
+    threads = [threading.Thread(target=crew, args=(name,)) for name in sinks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for name in sinks:
+        assert sinks[name].lines == [f"{name} step {step}\n" for step in range(50)]
+        assert errors[name].lines == [f"{name} warning {step}\n" for step in range(50)]
+
+
+def test_output_outside_a_capture_goes_to_the_original_stream(capsys):
+    sink = ListSink()
+    with capture_output(stdout=sink):
+        print("captured")
+    assert isinstance(sys.stdout, OutputDemultiplexer)
+    print("not captured")
+
+    assert sink.lines == ["captured\n"]
+    assert capsys.readouterr().out == "not captured\n"
+
+
+def test_line_stream_sink_hands_lines_to_the_loop():
+    async def scenario():
+        queue = asyncio.Queue()
+        sink = LineStreamSink(asyncio.get_running_loop(), queue)
+
+        def crew():
+            with capture_output(stdout=sink):
+                print("from the worker thread")
+            sink.detach()
+            sink.write("dropped\n")
+
+        await asyncio.to_thread(crew)
+        await asyncio.sleep(0)
+        return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    assert asyncio.run(scenario()) == ["from the worker thread\n"]
@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.core.pagination import (
+    decode_cursor,
+    encode_cursor,
+    paginate,
+    paginate_async,
+    paginate_by_position,
+    parse_sort,
+)
+from app.models import Agent
+
+SORT_COLUMNS = {"id": Agent.id, "name": Agent.name, "created_at": Agent.created_at}
+
+
+@pytest.fixture
+def agents(db):
+    # Names and timestamps repeat, so pages have to break ties by id
+    start = datetime(2026, 1, 1)
+    rows = [
+        Agent(
+            name=f"agent {index % 4}",
+            role="role",
+            goal="goal",
+            backstory="backstory",
+            created_at=start + timedelta(seconds=index % 3),
+        )
+        for index in range(23)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def all_pages(db, sort_column, descending, limit=5):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = paginate(db.query(Agent), sort_column, Agent.id, limit, cursor, descending)
+        pages.append(rows)
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("sort", ["id", "name", "-name", "created_at", "-created_at"])
+def test_pages_cover_every_row_once_in_order(db, agents, sort):
+    sort_column, descending = parse_sort(sort, SORT_COLUMNS)
+    pages = all_pages(db, sort_column, descending)
+
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    listed = [agent for page in pages for agent in page]
+    key = lambda agent: (getattr(agent, sort_column.key), agent.id)
+    assert [agent.id for agent in listed] == [agent.id for agent in sorted(agents, key=key, reverse=descending)]
+
+
+def test_last_page_has_no_cursor(db, agents):
+    rows, cursor = paginate(db.query(Agent), Agent.id, Agent.id, 23, None, False)
+    assert len(rows) == 23
+    assert cursor is None
+
+
+def test_async_pages_match_sync_pages(db, agents):
+    async def async_pages():
+        pages, cursor = [], None
+        try:
+            async with AsyncSessionLocal() as async_db:
+                while True:
+                    rows, cursor = await paginate_async(async_db, select(Agent), Agent.name, Agent.id, 5, cursor, False)
+                    pages.append([agent.id for agent in rows])
+                    if cursor is None:
+                        return pages
+        finally:
+            # Pooled connections belong to this test's event loop
+            await async_engine.dispose()
+
+    assert asyncio.run(async_pages()) == [[agent.id for agent in page] for page in all_pages(db, Agent.name, False)]
+
+
+def test_position_pages(db, agents):
+    query = db.query(Agent).order_by(Agent.id.desc())
+    first, cursor = paginate_by_position(query, 20)
+    second, cursor_after = paginate_by_position(query, 20, cursor)
+    assert len(first) == 20 and len(second) == 3
+    assert cursor_after is None
+    assert {agent.id for agent in first + second} == {agent.id for agent in agents}
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 3, 4, 5, 6, 7, 890)
+    assert decode_cursor(encode_cursor("created_at", created_at, 42), "created_at") == (created_at, 42)
+    assert decode_cursor(encode_cursor("name", "agent", 7), "name") == ("agent", 7)
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "e30", encode_cursor("name", "agent", 7)])
+def test_invalid_cursor_is_a_400(cursor):
+    # The last one belongs to a list sorted by another column
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, "created_at")
+    assert error.value.status_code == 400
+
+
+def test_position_cursor_must_be_a_position(db):
+    with pytest.raises(HTTPException) as error:
+        paginate_by_position(db.query(Agent), 10, encode_cursor("position", -5, 0))
+    assert error.value.status_code == 400
+
+
+def test_unknown_sort_is_a_400():
+    with pytest.raises(HTTPException) as error:
+        parse_sort("-role", SORT_COLUMNS)
+    assert error.value.status_code == 400
@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.core.process_resolver import resolve_steps
+from app.models import Agent, Task, Tool
+
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def library(db):
+    tools = [Tool(name=f"tool {index}", description="tool", tool_type="builtin", category="misc") for index in range(4)]
+    db.add_all(tools)
+    db.flush()
+    agents = [
+        Agent(name=f"agent {index}", role="role", goal="goal", backstory="backstory", tools=[tools[index % 2].id])
+        for index in range(3)
+    ]
+    tasks = [
+        Task(name=f"task {index}", description="description", expected_output="output", tools=[tools[2].id])
+        for index in range(5)
+    ]
+    db.add_all(agents + tasks)
+    db.commit()
+    return {"agents": agents, "tasks": tasks, "tools": tools}
+
+
+@pytest.mark.parametrize("step_count", [1, 5])
+def test_steps_resolve_in_three_queries(db, migrated_engine, library, step_count):
+    steps = [
+        {
+            "agent_id": library["agents"][index % 3].id,
+            "task_id": library["tasks"][index].id,
+            "tools": [library["tools"][3].id],
+        }
+        for index in range(step_count)
+    ]
+    db.expire_all()
+
+    with count_statements(migrated_engine) as statements:
+        resolved = resolve_steps(db, steps)
+
+    assert len(statements) == 3
+    assert set(resolved.tasks) == {step["task_id"] for step in steps}
+    # Tools of the steps and of their agents and tasks
+    assert library["tools"][2].id in resolved.tools and library["tools"][3].id in resolved.tools
+    assert resolved.missing() == {"agents": [], "tasks": [], "tools": []}
+
+
+def test_missing_ids_are_reported(db, library):
+    agent = library["agents"][0]
+    task = library["tasks"][0]
+    steps = [
+        {"agent_id": agent.id, "task_id": task.id, "tools": [9001, "not an id"]},
+        {"agent_id": 9002, "task_id": 9003},
+        {"agent_id": agent.id},
+    ]
+
+    resolved = resolve_steps(db, steps)
+
+    assert list(resolved.agents) == [agent.id]
+    assert list(resolved.tasks) == [task.id]
+    assert resolved.missing() == {"agents": [9002], "tasks": [9003], "tools": [9001]}
+    assert resolved.tools_of([9001, library["tools"][0].id]) == [resolved.tools[library["tools"][0].id]]
+
+
+def test_no_steps_take_no_queries(db, migrated_engine):
+    with count_statements(migrated_engine) as statements:
+        resolved = resolve_steps(db, [])
+    assert statements == []
+    assert resolved.missing() == {"agents": [], "tasks": [], "tools": []}
@@ -0,0 +1,105 @@
+"""The hot list queries are answered from their indexes on a migrated SQLite database.
+
+Each query is built the way its endpoint builds it and EXPLAINed; the plan
+has to use the expected index and read rows in index order instead of
+sorting them.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from app.core.pagination import _keyset_page, encode_cursor
+from app.models import Agent, Execution, Process, Task, Tool
+
+CREATED_AT = datetime(2026, 1, 1)
+
+
+def execution_page(statement, cursor=None):
+    """A page of executions as /executions lists them."""
+    statement = statement.options(joinedload(Execution.process))
+    return _keyset_page(statement, Execution.started_at, Execution.id, 100, cursor, True)
+
+
+def library_page(model, sort, descending, later=False):
+    """A page of agents, tasks, processes or tools as their list endpoints sort them."""
+    sort_column = getattr(model, sort)
+    cursor = None
+    if later:
+        cursor = encode_cursor(sort, CREATED_AT if sort == "created_at" else "m", 1000)
+    return _keyset_page(select(model), sort_column, model.id, 100, cursor, descending)
+
+
+def tool_page(statement, cursor=None):
+    """A page of tools as /tools lists them by default (sorted by id)."""
+    return _keyset_page(statement, Tool.id, Tool.id, 100, cursor, False)
+
+
+EXECUTION_CURSOR = encode_cursor("started_at", CREATED_AT, 1000)
+TOOL_CURSOR = encode_cursor("id", 1000, 1000)
+
+# (description, statement, index the plan has to use)
+CHECKS = [
+    ("executions, first page", execution_page(select(Execution)), "ix_executions_started_at_id"),
+    ("executions, later page", execution_page(select(Execution), EXECUTION_CURSOR), "ix_executions_started_at_id"),
+    (
+        "executions of a process, first page",
+        execution_page(select(Execution).filter(Execution.process_id == 1)),
+        "ix_executions_process_started_at_id",
+    ),
+    (
+        "executions of a process, later page",
+        execution_page(select(Execution).filter(Execution.process_id == 1), EXECUTION_CURSOR),
+        "ix_executions_process_started_at_id",
+    ),
+    (
+        "executions by status",
+        execution_page(select(Execution).filter(Execution.status == "running")),
+        "ix_executions_status_started_at_id",
+    ),
+    ("tool categories", select(Tool.category).distinct(), "ix_tools_category_id"),
+    ("tool types", select(Tool.tool_type).distinct(), "ix_tools_tool_type_id"),
+    (
+        "tools in a category",
+        tool_page(select(Tool).filter(Tool.category == "web_search"), TOOL_CURSOR),
+        "ix_tools_category_id",
+    ),
+    (
+        "tools of a type",
+        tool_page(select(Tool).filter(Tool.tool_type == "crewai"), TOOL_CURSOR),
+        "ix_tools_tool_type_id",
+    ),
+]
+for model, table in ((Agent, "agents"), (Task, "tasks"), (Process, "processes")):
+    for sort, descending in (("name", False), ("created_at", True)):
+        for later in (False, True):
+            CHECKS.append((
+                f"{table} by {sort}, {'later' if later else 'first'} page",
+                library_page(model, sort, descending, later),
+                f"ix_{table}_{sort}_id",
+            ))
+for later in (False, True):
+    CHECKS.append((
+        f"tools by created_at, {'later' if later else 'first'} page",
+        library_page(Tool, "created_at", True, later),
+        "ix_tools_created_at_id",
+    ))
+
+
+def explain(connection, statement) -> str:
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    return "\n".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+
+
+def sorts_rows(plan: str) -> bool:
+    """Whether the plan sorts rows itself instead of reading them in index order."""
+    return "USE TEMP B-TREE FOR ORDER BY" in plan
+
+
+@pytest.mark.parametrize("statement, index", [check[1:] for check in CHECKS], ids=[check[0] for check in CHECKS])
+def test_query_uses_index(migrated_engine, statement, index):
+    with migrated_engine.connect() as connection:
+        plan = explain(connection, statement)
+    assert index in plan, plan
+    assert not sorts_rows(plan), plan
@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy import text
+
+from app.core import search
+from app.core.pagination import paginate_by_position
+from app.core.search import apply_search, detect_search_backend
+from app.models import Agent, Task
+
+
+@pytest.fixture
+def fts(migrated_engine, monkeypatch):
+    """Search through the FTS5 tables the migrations created."""
+    monkeypatch.setattr(search, "_backend", None)
+    assert detect_search_backend(migrated_engine) == "sqlite"
+
+
+def agent(name, role="role", goal="goal"):
+    return Agent(name=name, role=role, goal=goal, backstory="backstory")
+
+
+def task(name, description="description", expected_output="expected output"):
+    return Task(name=name, description=description, expected_output=expected_output)
+
+
+def found(db, model, terms):
+    return [row.name for row in apply_search(db.query(model), model, terms).all()]
+
+
+def fts_rowids(db, match):
+    return [row[0] for row in db.execute(text("SELECT rowid FROM agents_fts WHERE agents_fts MATCH :match"), {"match": match})]
+
+
+def test_triggers_follow_inserts_updates_and_deletes(db, fts):
+    researcher = agent("Researcher")
+    db.add(researcher)
+    db.commit()
+    assert fts_rowids(db, "researcher") == [researcher.id]
+
+    researcher.name = "Analyst"
+    db.commit()
+    assert fts_rowids(db, "researcher") == []
+    assert fts_rowids(db, "analyst") == [researcher.id]
+
+    db.delete(researcher)
+    db.commit()
+    assert fts_rowids(db, "analyst") == []
+
+
+def test_terms_match_word_prefixes(db, fts):
+    db.add_all([agent("Market researcher"), agent("Writer")])
+    db.commit()
+    assert found(db, Agent, "res") == ["Market researcher"]
+    assert found(db, Agent, "mark RES") == ["Market researcher"]
+
+
+def test_every_term_has_to_match(db, fts):
+    db.add_all([
+        agent("Market researcher", goal="find trends"),
+        agent("Market writer", goal="write reports"),
+    ])
+    db.commit()
+    assert found(db, Agent, "market trends") == ["Market researcher"]
+    assert sorted(found(db, Agent, "market")) == ["Market researcher", "Market writer"]
+    assert found(db, Agent, "market poetry") == []
+
+
+def test_name_hits_rank_above_other_columns(db, fts):
+    # Added first, so only the ranking can put the name hit ahead
+    db.add_all([
+        task("Draft", description="Write a summary of the findings"),
+        task("Summary", description="Collect the findings"),
+    ])
+    db.commit()
+    assert found(db, Task, "summary") == ["Summary", "Draft"]
+
+
+def test_substring_search_without_full_text_index(db, monkeypatch):
+    monkeypatch.setattr(search, "_backend", None)
+    db.add_all([agent("Market researcher"), agent("Writer", role="Copy editor")])
+    db.commit()
+    # Substrings inside words match too, in id order
+    assert found(db, Agent, "earch") == ["Market researcher"]
+    assert found(db, Agent, "EDIT") == ["Writer"]
+
+
+def test_search_results_page_by_position(db, fts):
+    db.add_all([agent(f"Researcher {index}") for index in range(7)] + [agent("Writer")])
+    db.commit()
+    query = apply_search(db.query(Agent), Agent, "researcher")
+
+    first, cursor = paginate_by_position(query, 5)
+    second, last_cursor = paginate_by_position(query, 5, cursor)
+
+    assert len(first) == 5 and len(second) == 2
+    assert last_cursor is None
+    assert [row.id for row in first + second] == [row.id for row in query.all()]
+    assert {row.name for row in first + second} == {f"Researcher {index}" for index in range(7)}
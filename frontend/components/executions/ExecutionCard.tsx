@@ -3,6 +3,7 @@
 import { useState } from 'react';
 import { Execution } from '@/types/execution';
 import { useExecutionStore } from '@/lib/stores/executionStore';
+import { executionsApi } from '@/lib/api/executions';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
 import { Badge } from '@/components/ui/badge';
@@ -28,6 +29,8 @@ interface ExecutionCardProps {
 export function ExecutionCard({ execution, onViewDetails }: ExecutionCardProps) {
   const { stopExecution, deleteExecution, loading } = useExecutionStore();
   const [showLog, setShowLog] = useState(false);
+  // List responses leave out the log, so fetch its tail when first shown
+  const [consoleLog, setConsoleLog] = useState<string | null>(execution.console_log ?? null);
 
   const getStatusIcon = (status: string) => {
     switch (status) {
@@ -71,6 +74,18 @@ export function ExecutionCard({ execution, onViewDetails }: ExecutionCardProps)
     }
   };
 
+  const toggleLog = async () => {
+    if (!showLog && consoleLog === null) {
+      try {
+        const tail = await executionsApi.getExecutionLogTail(execution.id, 200);
+        setConsoleLog(tail.lines.join('\n'));
+      } catch (error) {
+        console.error('Failed to load console log:', error);
+      }
+    }
+    setShowLog(!showLog);
+  };
+
   const copyToClipboard = (text: string) => {
     navigator.clipboard.writeText(text);
   };
@@ -111,7 +126,7 @@ export function ExecutionCard({ execution, onViewDetails }: ExecutionCardProps)
           </div>
         )}
 
-        {execution.console_log && (
+        {execution.status !== 'queued' && (
           <div className="space-y-2">
             <div className="flex items-center justify-between">
               <h4 className="text-sm font-medium">Console Log</h4>
@@ -119,15 +134,15 @@ export function ExecutionCard({ execution, onViewDetails }: ExecutionCardProps)
                 <Button
                   variant="ghost"
                   size="sm"
-                  onClick={() => copyToClipboard(execution.console_log || '')}
-                  disabled={!execution.console_log}
+                  onClick={() => copyToClipboard(consoleLog || '')}
+                  disabled={!consoleLog}
                 >
                   <Copy className="h-3 w-3" />
                 </Button>
                 <Button
                   variant="ghost"
                   size="sm"
-                  onClick={() => setShowLog(!showLog)}
+                  onClick={toggleLog}
                 >
                   <Eye className="h-3 w-3" />
                 </Button>
@@ -137,7 +152,7 @@ export function ExecutionCard({ execution, onViewDetails }: ExecutionCardProps)
             {showLog && (
               <div className="bg-gray-50 rounded-md p-3 max-h-40 overflow-y-auto">
                 <pre className="text-xs text-gray-700 whitespace-pre-wrap">
-                  {execution.console_log}
+                  {consoleLog || 'No output yet...'}
                 </pre>
               </div>
             )}
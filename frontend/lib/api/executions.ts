@@ -6,7 +6,8 @@ const API_BASE_URL = getApiUrl();
 export interface Execution {
   id: number;
   process_id: number;
-  status: 'running' | 'completed' | 'failed' | 'stopped' | 'pending';
+  status: 'running' | 'completed' | 'failed' | 'stopped' | 'pending' | 'queued';
+  queue_position?: number | null;
   output_path?: string;
   console_log?: string;
   started_at: string;
@@ -19,8 +20,25 @@ export interface Execution {
   };
 }
 
+export interface ExecutionLogPage {
+  execution_id: number;
+  offset: number;
+  next_offset: number;
+  total_size: number;
+  content: string;
+  complete: boolean;
+}
+
+export interface ExecutionLogTail {
+  execution_id: number;
+  offset: number;
+  next_offset: number;
+  total_size: number;
+  lines: string[];
+}
+
 export interface ExecutionFilters {
-  skip?: number;
+  cursor?: string; // X-Next-Cursor header of the previous page
   limit?: number;
 }
 
@@ -35,7 +53,7 @@ export const executionsApi = {
   // Get all executions
   async getExecutions(filters: ExecutionFilters = {}): Promise<Execution[]> {
     const params = new URLSearchParams();
-    if (filters.skip !== undefined) params.append('skip', filters.skip.toString());
+    if (filters.cursor) params.append('cursor', filters.cursor);
     if (filters.limit !== undefined) params.append('limit', filters.limit.toString());
     
     const response = await axios.get(`${API_BASE_URL}/executions/?${params.toString()}`);
@@ -48,6 +66,21 @@ export const executionsApi = {
     return response.data;
   },
 
+  // Get a page of an execution's console log starting at a byte offset
+  async getExecutionLog(id: number, offset = 0, limit?: number): Promise<ExecutionLogPage> {
+    const params = new URLSearchParams({ offset: offset.toString() });
+    if (limit !== undefined) params.append('limit', limit.toString());
+
+    const response = await axios.get(`${API_BASE_URL}/executions/${id}/log?${params.toString()}`);
+    return response.data;
+  },
+
+  // Get the last lines of an execution's console log
+  async getExecutionLogTail(id: number, lines = 100): Promise<ExecutionLogTail> {
+    const response = await axios.get(`${API_BASE_URL}/executions/${id}/log/tail?lines=${lines}`);
+    return response.data;
+  },
+
   // Update an execution
   async updateExecution(id: number, execution: ExecutionUpdate): Promise<Execution> {
     const response = await axios.put(`${API_BASE_URL}/executions/${id}`, execution);
@@ -10,7 +10,7 @@ export const processesApi = {
   async getProcesses(filters: ProcessFilters = {}): Promise<Process[]> {
     const params = new URLSearchParams();
     if (filters.search) params.append('search', filters.search);
-    if (filters.skip) params.append('skip', filters.skip.toString());
+    if (filters.cursor) params.append('cursor', filters.cursor);
     if (filters.limit) params.append('limit', filters.limit.toString());
     
     const response = await axios.get(`${API_BASE_URL}/processes?${params}`);
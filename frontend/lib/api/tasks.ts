@@ -9,7 +9,7 @@ export const tasksApi = {
   async getTasks(filters: TaskFilters = {}): Promise<Task[]> {
     const params = new URLSearchParams();
     if (filters.search) params.append('search', filters.search);
-    if (filters.skip) params.append('skip', filters.skip.toString());
+    if (filters.cursor) params.append('cursor', filters.cursor);
     if (filters.limit) params.append('limit', filters.limit.toString());
     
     const response = await axios.get(`${API_BASE_URL}/tasks?${params}`);
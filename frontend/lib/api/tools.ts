@@ -11,7 +11,7 @@ export const toolsApi = {
     if (filters.search) params.append('search', filters.search);
     if (filters.category) params.append('category', filters.category);
     if (filters.tool_type) params.append('tool_type', filters.tool_type);
-    if (filters.skip) params.append('skip', filters.skip.toString());
+    if (filters.cursor) params.append('cursor', filters.cursor);
     if (filters.limit) params.append('limit', filters.limit.toString());
     
     const response = await axios.get(`${API_BASE_URL}/tools?${params}`);
@@ -56,6 +56,14 @@ export function useExecutionStream(options: UseExecutionStreamOptions = {}): Use
   });
 
   const logIdCounter = useRef(0);
+  // seq of the last message handled, so reconnects resume from there
+  const lastSeqRef = useRef(0);
+  // Set after a stored log snapshot, which stands in for any seqs before the next message
+  const snapshotRef = useRef(false);
+  // Set while reconnecting to fetch missed messages; the old connection is ignored meanwhile
+  const resumingRef = useRef(false);
+  // useWebSocket's reconnect, which is only available after the message handler is defined
+  const reconnectRef = useRef<() => void>(() => {});
 
   const addLog = useCallback((content: string, type: ExecutionLog['type'] = 'info', isImportant = false) => {
     const log: ExecutionLog = {
@@ -114,6 +122,26 @@ export function useExecutionStream(options: UseExecutionStreamOptions = {}): Use
   const handleWebSocketMessage = useCallback((message: WebSocketMessage) => {
     console.log('Execution stream message:', message);
 
+    if (resumingRef.current) {
+      return;
+    }
+
+    if (message.seq !== undefined) {
+      if (message.seq <= lastSeqRef.current) {
+        return;
+      }
+      const firstSeq = message.first_seq ?? message.seq;
+      if (firstSeq > lastSeqRef.current + 1 && !snapshotRef.current) {
+        // The server dropped messages for this connection; resume from the last one handled
+        resumingRef.current = true;
+        addLog(`🔄 Missed messages, resuming stream...`, 'warning');
+        reconnectRef.current();
+        return;
+      }
+      snapshotRef.current = false;
+      lastSeqRef.current = message.seq;
+    }
+
     switch (message.type) {
       case 'connection_established':
         addLog(`🔌 Connected to execution stream`, 'success');
@@ -136,16 +164,28 @@ export function useExecutionStream(options: UseExecutionStreamOptions = {}): Use
         break;
 
       case 'output':
-        if (message.content) {
-          const logType = getLogTypeFromContent(message.content);
-          const isImportant = isImportantLog(message.content);
-          const progress = parseProgressFromContent(message.content);
+        // Output arriving in quick succession is batched into one message; log it line by line
+        (message.content || '').split('\n').filter(line => line.trim()).forEach(line => {
+          const progress = parseProgressFromContent(line);
           
           if (progress) {
             setState(prev => ({ ...prev, progress }));
           }
           
-          addLog(message.content.trim(), logType, isImportant);
+          addLog(line.trim(), getLogTypeFromContent(line), isImportantLog(line));
+        });
+        break;
+
+      case 'output_snapshot':
+        // Stored output sent on (re)connect when the live backlog doesn't reach back far enough
+        if (message.reset) {
+          setState(prev => ({ ...prev, logs: [] }));
+          snapshotRef.current = true;
+        }
+        if (message.content) {
+          message.content.split('\n').filter(line => line.trim()).forEach(line => {
+            addLog(line, getLogTypeFromContent(line), isImportantLog(line));
+          });
         }
         break;
 
@@ -186,16 +226,24 @@ export function useExecutionStream(options: UseExecutionStreamOptions = {}): Use
         addLog(`🛑 Execution stopped`, 'warning', true);
         break;
 
+      case 'pong':
+        break;
+
+      case 'error':
+        addLog(`⚠️ ${message.message}`, 'warning');
+        break;
+
       default:
         console.warn('Unknown message type:', message.type);
         addLog(`📩 Unknown message: ${message.type}`, 'warning');
     }
   }, [addLog, getLogTypeFromContent, isImportantLog, parseProgressFromContent, state.executionId, onComplete, onError]);
 
-  const { connect, disconnect, sendMessage, isConnected, error: connectionError } = useWebSocket({
+  const { connect, disconnect, reconnect, sendMessage, isConnected, error: connectionError } = useWebSocket({
     onMessage: handleWebSocketMessage,
     onOpen: () => {
       console.log('WebSocket connection established');
+      resumingRef.current = false;
     },
     onClose: () => {
       console.log('WebSocket connection closed');
@@ -207,9 +255,11 @@ export function useExecutionStream(options: UseExecutionStreamOptions = {}): Use
       console.error('WebSocket error:', error);
       addLog(`❌ Connection error`, 'error', true);
     },
+    resolveUrl: (url) => `${url}?since=${lastSeqRef.current}`,
     maxReconnectAttempts: 3,
     reconnectInterval: 2000,
   });
+  reconnectRef.current = reconnect;
 
   const startExecution = useCallback(async (processId: number, variables: Record<string, string> = {}) => {
     try {
@@ -223,6 +273,9 @@ export function useExecutionStream(options: UseExecutionStreamOptions = {}): Use
         progress: null,
       }));
 
+      lastSeqRef.current = 0;
+      snapshotRef.current = false;
+      resumingRef.current = false;
       addLog(`🚀 Starting execution for process ${processId}...`, 'info', true);
 
       // Start execution via REST API
@@ -260,11 +313,13 @@ export function useExecutionStream(options: UseExecutionStreamOptions = {}): Use
 
   const stopExecution = useCallback(() => {
     if (state.executionId && isConnected) {
+      // Stay connected: the server confirms with execution_stopped once the crew has halted
       sendMessage({
         type: 'stop_execution',
         execution_id: state.executionId,
       });
       addLog(`🛑 Stop signal sent`, 'warning', true);
+      return;
     }
     disconnect();
   }, [state.executionId, isConnected, sendMessage, disconnect, addLog]);
@@ -2,8 +2,13 @@ import { useEffect, useRef, useState, useCallback } from 'react';
 
 export interface WebSocketMessage {
   type: string;
+  seq?: number;
+  // First seq covered by a message merged from several
+  first_seq?: number;
   execution_id?: number;
   content?: string;
+  log_offset?: number;
+  reset?: boolean;
   error?: string;
   traceback?: string;
   message?: string;
@@ -17,6 +22,8 @@ interface UseWebSocketOptions {
   onOpen?: () => void;
   onClose?: () => void;
   onError?: (error: Event) => void;
+  // Adjust the URL on every (re)connect, e.g. to resume from the last message
+  resolveUrl?: (url: string) => string;
   autoConnect?: boolean;
   reconnectInterval?: number;
   maxReconnectAttempts?: number;
@@ -25,6 +32,7 @@ interface UseWebSocketOptions {
 interface UseWebSocketReturn {
   connect: (url: string) => void;
   disconnect: () => void;
+  reconnect: () => void;
   sendMessage: (message: any) => void;
   isConnected: boolean;
   isConnecting: boolean;
@@ -38,6 +46,7 @@ export function useWebSocket(options: UseWebSocketOptions = {}): UseWebSocketRet
     onOpen,
     onClose,
     onError,
+    resolveUrl,
     autoConnect = false,
     reconnectInterval = 3000,
     maxReconnectAttempts = 5,
@@ -73,7 +82,7 @@ export function useWebSocket(options: UseWebSocketOptions = {}): UseWebSocketRet
 
     try {
       // Convert HTTP URL to WebSocket URL
-      const wsUrl = url.replace(/^http/, 'ws');
+      const wsUrl = (resolveUrl ? resolveUrl(url) : url).replace(/^http/, 'ws');
       console.log('Connecting to WebSocket:', wsUrl);
       
       const ws = new WebSocket(wsUrl);
@@ -133,7 +142,7 @@ export function useWebSocket(options: UseWebSocketOptions = {}): UseWebSocketRet
       setError('Failed to create WebSocket connection');
       setIsConnecting(false);
     }
-  }, [onMessage, onOpen, onClose, onError, reconnectInterval, maxReconnectAttempts, reconnectAttempts]);
+  }, [onMessage, onOpen, onClose, onError, resolveUrl, reconnectInterval, maxReconnectAttempts, reconnectAttempts]);
 
   const disconnect = useCallback(() => {
     console.log('Manually disconnecting WebSocket');
@@ -150,6 +159,13 @@ export function useWebSocket(options: UseWebSocketOptions = {}): UseWebSocketRet
     setReconnectAttempts(0);
   }, [clearReconnectTimeout]);
 
+  const reconnect = useCallback(() => {
+    // Closing without a manual disconnect makes onclose connect again
+    if (wsRef.current) {
+      wsRef.current.close(4000, 'Reconnecting');
+    }
+  }, []);
+
   const sendMessage = useCallback((message: any) => {
     if (wsRef.current?.readyState === WebSocket.OPEN) {
       try {
@@ -180,6 +196,7 @@ export function useWebSocket(options: UseWebSocketOptions = {}): UseWebSocketRet
   return {
     connect,
     disconnect,
+    reconnect,
     sendMessage,
     isConnected,
     isConnecting,
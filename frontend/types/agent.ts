@@ -33,6 +33,6 @@ export interface AgentUpdate {
 
 export interface AgentFilters {
   search?: string;
-  skip?: number;
+  cursor?: string; // X-Next-Cursor header of the previous page
   limit?: number;
 } 
\ No newline at end of file
@@ -1,7 +1,8 @@
 export interface Execution {
   id: number;
   process_id: number;
-  status: 'running' | 'completed' | 'failed' | 'stopped' | 'pending';
+  status: 'running' | 'completed' | 'failed' | 'stopped' | 'pending' | 'queued';
+  queue_position?: number | null;
   output_path?: string;
   console_log?: string;
   started_at: string;
@@ -15,7 +16,7 @@ export interface Execution {
 }
 
 export interface ExecutionFilters {
-  skip?: number;
+  cursor?: string; // X-Next-Cursor header of the previous page
   limit?: number;
 }
 
@@ -24,7 +24,7 @@ export interface ProcessUpdate {
 
 export interface ProcessFilters {
   search?: string;
-  skip?: number;
+  cursor?: string; // X-Next-Cursor header of the previous page
   limit?: number;
 }
 
@@ -30,6 +30,6 @@ export interface TaskUpdate {
 
 export interface TaskFilters {
   search?: string;
-  skip?: number;
+  cursor?: string; // X-Next-Cursor header of the previous page
   limit?: number;
 } 
\ No newline at end of file
@@ -73,7 +73,7 @@ export interface ToolFilters {
   search?: string;
   category?: string;
   tool_type?: string;
-  skip?: number;
+  cursor?: string; // X-Next-Cursor header of the previous page
   limit?: number;
 }
 
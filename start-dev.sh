@@ -10,6 +10,7 @@ echo ""
 # Start backend
 echo "📡 Starting Backend (FastAPI)..."
 cd backend
+uv run python scripts/migrate.py || exit 1
 uv run uvicorn main:app --host 0.0.0.0 --port 8000 --reload &
 BACKEND_PID=$!
 cd ..